@@ -0,0 +1,108 @@
+'''
+ANSI terminal frame renderer.
+Keeps the dungeon drawn at the top of the terminal, and redraws only the cells that change.
+'''
+
+from shutil import get_terminal_size
+from typing import Optional
+
+
+ESCAPE: str = '\x1b'
+CLEAR_SCREEN: str = f'{ESCAPE}[2J'
+RESET_SCROLLING_REGION: str = f'{ESCAPE}[r'
+SAVE_CURSOR: str = f'{ESCAPE}7'
+RESTORE_CURSOR: str = f'{ESCAPE}8'
+
+
+def move_cursor(row: int, column: int) -> str:
+    ''' Returns the escape sequence that moves the cursor. Rows and columns start at 1. '''
+    return f'{ESCAPE}[{row};{column}H'
+
+
+def set_scrolling_region(top_row: int, bottom_row: int) -> str:
+    ''' Returns the escape sequence that limits scrolling to the given rows. '''
+    return f'{ESCAPE}[{top_row};{bottom_row}r'
+
+
+class AnsiFrameRenderer:
+    '''
+    ANSI terminal frame renderer.
+    The first frame clears the terminal and is drawn at the top of it.
+    The rows below the frame become a scrolling region for the rest of the game text.
+    Later frames only rewrite the span of each line that changed since the previous frame.
+    '''
+
+
+    def __init__(self):
+        self.previous_frame_lines: Optional[list[str]] = None
+        self.terminal_lines: int = 0
+
+
+    def render(self, frame: str, terminal_lines: Optional[int] = None) -> str:
+        '''
+        Returns the text to write to the terminal to display the given frame.
+        The frame is a string of newline terminated lines.
+        If the terminal's number of lines is not given, it is the size of this process's terminal.
+        '''
+        frame_lines: list[str] = frame.splitlines()
+
+        # If the frame will not fit above a scrolling region, then just print the frame.
+        if terminal_lines is None:
+            terminal_lines = get_terminal_size().lines
+        if len(frame_lines) + 2 > terminal_lines:
+            self.previous_frame_lines = None
+            return frame
+
+        # If there is no previous frame of the same shape, then draw the whole frame.
+        if (
+            self.previous_frame_lines is None or
+            len(self.previous_frame_lines) != len(frame_lines) or
+            terminal_lines != self.terminal_lines
+        ):
+            self.previous_frame_lines = frame_lines
+            self.terminal_lines = terminal_lines
+            return ''.join([
+                CLEAR_SCREEN,
+                move_cursor(1, 1),
+                frame,
+                set_scrolling_region(len(frame_lines) + 1, terminal_lines),
+                move_cursor(terminal_lines, 1),
+            ])
+
+        # Draw the changed span of each changed line.
+        updates: list[str] = []
+        for row, (previous_line, line) in enumerate(zip(self.previous_frame_lines, frame_lines)):
+            if line == previous_line:
+                continue
+            first_column: int = 0
+            while (
+                first_column < len(line) and
+                first_column < len(previous_line) and
+                line[first_column] == previous_line[first_column]
+            ):
+                first_column = first_column + 1
+            last_column: int = len(line)
+            if len(line) == len(previous_line):
+                while line[last_column - 1] == previous_line[last_column - 1]:
+                    last_column = last_column - 1
+            else:
+                line = line + f'{ESCAPE}[K'  # Clear the remains of a longer previous line.
+                last_column = len(line)
+            updates.append(move_cursor(row + 1, first_column + 1))
+            updates.append(line[first_column:last_column])
+        self.previous_frame_lines = frame_lines
+
+        if not updates:
+            return ''
+        return ''.join([SAVE_CURSOR, *updates, RESTORE_CURSOR])
+
+
+    def reset(self) -> str:
+        '''
+        Returns the text to write to the terminal to restore normal scrolling.
+        The cursor is left at the bottom of the terminal.
+        '''
+        if self.previous_frame_lines is None:
+            return ''
+        self.previous_frame_lines = None
+        return RESET_SCROLLING_REGION + move_cursor(self.terminal_lines, 1)
@@ -3,9 +3,13 @@ Dungeon interface.
 All dungeons use this, directly or indirectly, as a base class.
 '''
 
+from collections import Counter, OrderedDict
+from collections.abc import MutableMapping, Sequence, Set
 from dataclasses import dataclass
 from typing import Callable, Optional
 
+from output_sink import OutputSink, StdoutSink
+
 
 @dataclass
 class Direction:
@@ -22,29 +26,106 @@ class NavigationInfo:
     room: int             # Room in the direction of interest.
 
 
-# Scenario member funtion to call when printing a rooms contents.
+# The rooms that are visible from a room.
+# Dungeons return a set like collection, so membership tests are O(1).
+VisibleRooms = Set[int]
+
+
+# Distances, in moves, from rooms to a destination room, keyed by room.
+# Rooms that are unreachable, or beyond the field's maximum distance, are not included.
+DistanceField = dict[int, int]
+
+
+# A count per room, such as of a monster's visits, keyed by room.
+# Rooms that are not counted count as 0, as in a Counter.
+RoomCounts = MutableMapping[int, int]
+
+
+# Default number of distance fields cached by each dungeon.
+DISTANCE_FIELD_CACHE_SIZE: int = 16
+
+
+# The contents of the rooms that have contents, keyed by room.
+# Each room's content is a single character string.
+RoomContents = dict[int, str]
+
+
+# Scenario member funtion to call once per frame, to get the contents of the rooms.
 # Called like so:
 #
-# def function(self, room: int) -> Optional[str]:
+# def function(self) -> RoomContents:
 #
-# If the scenario has content in the given room, then return the content as a single character string.
-# If the scenario has no content in the given room, then return None.
-RoomContentFunction = Callable[[int], Optional[str]]
+# The scenario returns the contents of all the rooms that it has content in.
+# Where several things are in the same room, the scenario decides which one is shown.
+RoomContentsFunction = Callable[[], RoomContents]
 
 
 class Dungeon:
     ''' Dungeon interface. '''
 
 
-    def __init__(self, number_of_rooms: int, player_room: int):
+    def __init__(
+        self,
+        number_of_rooms: int,
+        player_room: int,
+        distance_field_cache_size: int = DISTANCE_FIELD_CACHE_SIZE,
+        output: Optional[OutputSink] = None,
+    ):
+        '''
+        The dungeon's text is written to the given output sink.
+        If no output sink is given, the text is written to standard output.
+        '''
         self.number_of_rooms: int = number_of_rooms
         self.player_room: int = player_room
+        self.output: OutputSink = output if output else StdoutSink()
+
+        # Distance fields, keyed by destination room and maximum distance.
+        # The least recently used field is evicted first.
+        self.distance_fields: OrderedDict[tuple[int, Optional[int]], DistanceField] = OrderedDict()
+        self.distance_field_cache_size: int = distance_field_cache_size
+
+
+    def adjacent_rooms(self, room: int) -> Sequence[int]:
+        ''' Returns the rooms that are connected to the given room by its doors. '''
 
 
     def directions_with_doors(self, room: int) -> list[Direction]:
         ''' Returns a list of directions that contain doors in the given room. '''
 
 
+    def distance_field(
+        self, destination_room: int, max_distance: Optional[int] = None
+    ) -> DistanceField:
+        '''
+        Returns the distance from each room to the given destination room.
+        If a maximum distance is given, rooms farther away than that are left out.
+        Fields are found with a breadth first search, and cached.
+        '''
+        key: tuple[int, Optional[int]] = (destination_room, max_distance)
+        distance_field: Optional[DistanceField] = self.distance_fields.get(key)
+        if distance_field is not None:
+            self.distance_fields.move_to_end(key)
+            return distance_field
+
+        distance_field = {destination_room: 0}
+        rooms_at_distance: list[int] = [destination_room]
+        distance: int = 0
+        while rooms_at_distance and (max_distance is None or distance < max_distance):
+            distance = distance + 1
+            rooms_at_next_distance: list[int] = []
+            for room in rooms_at_distance:
+                for adjacent_room in self.adjacent_rooms(room):
+                    if adjacent_room not in distance_field:
+                        distance_field[adjacent_room] = distance
+                        rooms_at_next_distance.append(adjacent_room)
+            rooms_at_distance = rooms_at_next_distance
+
+        self.distance_fields[key] = distance_field
+        if len(self.distance_fields) > self.distance_field_cache_size:
+            self.distance_fields.popitem(last = False)
+        return distance_field
+
+
     def navigation_info(self, direction: Direction, room: int) -> Optional[NavigationInfo]:
         '''
         Returns navigation information from the given room.
@@ -63,6 +144,36 @@ class Dungeon:
         '''
 
 
+    def navigate_by_distance_field(
+        self, start_room: int, destination_room: int, max_distance: Optional[int] = None
+    ) -> Optional[NavigationInfo]:
+        '''
+        Given a start and destination room,
+        returns information on how to move from the start room one step along a shortest path
+        towards the destination room.
+        Returns None if the start room is the destination room,
+        or if the destination room is unreachable or farther away than the maximum distance.
+        See distance_field().
+        '''
+        distance_field: DistanceField = self.distance_field(destination_room, max_distance)
+        distance: Optional[int] = distance_field.get(start_room)
+        if not distance:
+            return None
+        for direction in self.directions_with_doors(start_room):
+            navigation_info: Optional[NavigationInfo] = self.navigation_info(direction, start_room)
+            if distance_field.get(navigation_info.room) == distance - 1:
+                return navigation_info
+        return None
+
+
+    def room_counts(self) -> RoomCounts:
+        '''
+        Returns a new, empty count per room.
+        Dungeons may drop the counts of rooms that are no longer in use.
+        '''
+        return Counter()
+
+
     def room_in_direction(self, direction: Direction, room: int) -> Optional[int]:
         '''
         Returns the adjacent room in the given direction from the given room.
@@ -70,14 +181,20 @@ class Dungeon:
         '''
 
 
-    def rooms_visible_from_room(self, room: int) -> list[int]:
-        ''' Returns a list of all the rooms that are visible from the given room. '''
+    def rooms_visible_from_room(self, room: int) -> VisibleRooms:
+        ''' Returns the set of all the rooms that are visible from the given room. '''
+
+
+    def is_room_visible_from_room(self, room: int, other_room: int) -> bool:
+        ''' Returns True if the other room is visible from the given room. '''
+        return other_room in self.rooms_visible_from_room(room)
 
 
-    def rooms_visible_in_direction(self, direction: Direction, room: int) -> list[int]:
+    def rooms_visible_in_direction(self, direction: Direction, room: int) -> Sequence[int]:
         '''
-        Returns a list of the rooms that are visible from the given room in the given direction.
+        Returns a sequence of the rooms that are visible from the given room in the given direction.
+        The rooms are ordered from nearest to farthest.
         '''
 
-    def set_room_contents_function(self, function: RoomContentFunction) -> None:
-        ''' Sets the function to call to print a rooms contents. '''
+    def set_room_contents_function(self, function: RoomContentsFunction) -> None:
+        ''' Sets the function to call, once per frame, to get the contents of the rooms. '''
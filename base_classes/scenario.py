@@ -4,8 +4,11 @@ All scenarios use this, directly or indirectly, as a base class.
 '''
 
 from dataclasses import dataclass
+from enum import Enum
 from typing import Callable, Optional
 
+from output_sink import OutputSink, StdoutSink
+
 
 # Scenario member funtion to call when the command is invoked.
 # Called like so:
@@ -30,6 +33,39 @@ class Command:
     # See 'CommandFunction' type alias above.
 
 
+@dataclass
+class CommandTable:
+    '''
+    Command dispatch table.
+    The scenario command_table() member function returns one of these.
+    '''
+    commands: dict[str, Command]  # Commands, keyed by their lowercase invocation text.
+    menu_text: str                # The menu of commands.
+
+
+def create_command_table(commands: list[Command]) -> CommandTable:
+    ''' Returns a command dispatch table of the given commands. '''
+    return CommandTable(
+        commands = {command.invocation_text.lower(): command for command in commands},
+        menu_text = ', '.join([command.menu_text for command in commands]),
+    )
+
+
+class GameOutcome(Enum):
+    ''' How the game ended, from the player's point of view. '''
+    WIN = 'win'
+    LOSS = 'loss'
+    QUIT = 'quit'
+    UNFINISHED = 'unfinished'  # The game was stopped before it ended. e.g. A turn limit.
+
+
+@dataclass
+class GameEnding:
+    ''' How and why the game ended. '''
+    outcome: GameOutcome  # How the game ended.
+    reason: str           # Why the game ended.
+
+
 class Scenario:
     '''
     Scenario base class.
@@ -37,6 +73,11 @@ class Scenario:
     '''
 
 
+    def __init__(self, output: Optional[OutputSink] = None):
+        ''' The game's text is written to the given output sink, or if none, to standard output. '''
+        self.output: OutputSink = output if output else StdoutSink()
+
+
     def description(self) -> None:
         '''
         Describe the scenario.
@@ -58,6 +99,15 @@ class Scenario:
         '''
 
 
+    def command_table(self) -> CommandTable:
+        '''
+        Returns a dispatch table of the commands available to the player.
+        This function is called once every turn.
+        Scenarios may cache the table, as long as they rebuild it when the commands change.
+        '''
+        return create_command_table(self.commands())
+
+
     def post_player_turn(self) -> bool:
         '''
         This function is called once every turn, after the player's turn.
@@ -71,3 +121,11 @@ class Scenario:
         The game is over.
         This function is called once at the end of the game.
         '''
+
+
+    def game_ending(self) -> GameEnding:
+        '''
+        Returns how and why the game ended.
+        This function may be called once the game is over.
+        '''
+        return GameEnding(outcome = GameOutcome.QUIT, reason = 'The player quit.')
@@ -0,0 +1,168 @@
+'''
+Cold start benchmark.
+Times starting the game, to its first prompt and straight out again, for each scenario,
+and reports which game modules each start imported.
+Results may be saved as a JSON baseline, and compared against a saved baseline.
+
+Usage: python -m benchmarks.cold_start [--repeats 20] [--save FILE] [--compare FILE]
+'''
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser, Namespace
+from dataclasses import asdict, dataclass
+from random import Random
+from typing import Optional
+
+from settings import scenario_registry
+
+
+# The game script.
+GAME_SCRIPT: str = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'two-minute-dungeon.py'
+)
+
+# Modules of these packages are the game's, and are reported by name.
+GAME_PACKAGES: tuple[str, ...] = ('components.', 'scenarios.')
+
+# A start has regressed if it is this much slower than its baseline.
+REGRESSION_TOLERANCE: float = 0.2
+
+# Plays the game script given as its first argument, and then writes the names of the imported
+# modules to standard error, one per line.
+IMPORTED_MODULES_SCRIPT: str = '''
+import runpy, sys
+sys.argv = sys.argv[1:]
+try:
+    runpy.run_path(sys.argv[0], run_name = '__main__')
+finally:
+    sys.stderr.write('\\n'.join(sys.modules))
+'''
+
+
+@dataclass
+class ColdStartResult:
+    ''' The result of starting one scenario. '''
+    scenario: str
+    seed: int
+    median_milliseconds: float
+    modules: int               # Number of modules imported.
+    game_modules: list[str]    # Components and scenarios imported.
+
+
+def seed_of_scenario(name: str) -> int:
+    ''' Returns the first seed that plays the named scenario. '''
+    names: list[str] = scenario_registry.names()
+    seed: int = 0
+    while Random(seed).choice(names) != name:
+        seed = seed + 1
+    return seed
+
+
+def start_milliseconds(arguments: list[str]) -> float:
+    ''' Runs the command, with no input, and returns how long it took, in milliseconds. '''
+    start_time: float = time.perf_counter()
+    subprocess.run(
+        arguments, stdin = subprocess.DEVNULL, stdout = subprocess.DEVNULL, check = True
+    )
+    return (time.perf_counter() - start_time) * 1000
+
+
+def imported_modules(seed: int) -> list[str]:
+    ''' Returns the names of the modules imported by a game of the given seed. '''
+    process: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, '-c', IMPORTED_MODULES_SCRIPT, GAME_SCRIPT, '--seed', str(seed)],
+        stdin = subprocess.DEVNULL,
+        stdout = subprocess.DEVNULL,
+        stderr = subprocess.PIPE,
+        check = True,
+        text = True,
+    )
+    return process.stderr.splitlines()
+
+
+def run_cold_start(name: str, repeats: int) -> ColdStartResult:
+    ''' Starts the named scenario the given number of times, and returns the result. '''
+    seed: int = seed_of_scenario(name)
+    modules: list[str] = imported_modules(seed)
+    return ColdStartResult(
+        scenario = name,
+        seed = seed,
+        median_milliseconds = statistics.median(
+            start_milliseconds([sys.executable, GAME_SCRIPT, '--seed', str(seed)])
+            for _ in range(repeats)
+        ),
+        modules = len(modules),
+        game_modules = sorted(module for module in modules if module.startswith(GAME_PACKAGES)),
+    )
+
+
+def find_regressions(
+    results: list[ColdStartResult], baseline: list[ColdStartResult]
+) -> list[str]:
+    ''' Returns a description of each result that is slower than its baseline. '''
+    baseline_results: dict[str, ColdStartResult] = {result.scenario: result for result in baseline}
+    regressions: list[str] = []
+    for result in results:
+        baseline_result: Optional[ColdStartResult] = baseline_results.get(result.scenario)
+        if baseline_result is None:
+            continue
+        ratio: float = result.median_milliseconds / baseline_result.median_milliseconds
+        if ratio > 1 + REGRESSION_TOLERANCE:
+            regressions.append(
+                f'{result.scenario}: {result.median_milliseconds:.1f} ms, '
+                f'baseline {baseline_result.median_milliseconds:.1f} ms'
+            )
+    return regressions
+
+
+def main() -> None:
+    ''' Benchmark program. '''
+    argument_parser: ArgumentParser = ArgumentParser(description = 'Benchmark the cold start.')
+    argument_parser.add_argument(
+        '--scenarios', nargs = '+', choices = scenario_registry.names(),
+        default = scenario_registry.names()
+    )
+    argument_parser.add_argument(
+        '--repeats', type = int, default = 20, help = 'starts timed per scenario'
+    )
+    argument_parser.add_argument('--save', help = 'save the results as a JSON baseline file')
+    argument_parser.add_argument('--compare', help = 'compare the results to a JSON baseline file')
+    arguments: Namespace = argument_parser.parse_args()
+
+    interpreter_milliseconds: float = statistics.median(
+        start_milliseconds([sys.executable, '-c', 'pass']) for _ in range(arguments.repeats)
+    )
+    print(f'{"interpreter":16} {interpreter_milliseconds:10.1f} ms')
+
+    results: list[ColdStartResult] = []
+    for name in arguments.scenarios:
+        result: ColdStartResult = run_cold_start(name, arguments.repeats)
+        print(
+            f'{result.scenario:16} {result.median_milliseconds:10.1f} ms '
+            f'{result.modules:6} modules  {" ".join(result.game_modules)}'
+        )
+        results.append(result)
+
+    if arguments.save:
+        with open(arguments.save, 'w', encoding = 'utf-8') as baseline_file:
+            json.dump([asdict(result) for result in results], baseline_file, indent = 2)
+
+    if arguments.compare:
+        with open(arguments.compare, encoding = 'utf-8') as baseline_file:
+            baseline: list[ColdStartResult] = [
+                ColdStartResult(**result) for result in json.load(baseline_file)
+            ]
+        regressions: list[str] = find_regressions(results, baseline)
+        for regression in regressions:
+            print(f'Regression: {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+'''
+Hot path benchmarks.
+Times dungeon creation, visibility, rendering and monster turns across dungeon sizes,
+and reports operations per second and peak memory.
+Each benchmark is timed several times, taking turns with the others, and the fastest repeat
+is reported, so that other work on the machine is not reported as a regression.
+Results may be saved as a JSON baseline, and compared against a saved baseline.
+A calibration workload, which does not use the game's code, is timed with the benchmarks,
+and the results are compared relative to it, so a slower machine is not reported as a regression.
+
+Usage: python -m benchmarks.hot_paths [--sizes 7x5 100x100] [--repeats 10]
+                                      [--save FILE] [--compare FILE]
+'''
+
+import json
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser, Namespace
+from dataclasses import asdict, dataclass
+from random import Random
+from typing import Callable, Optional
+
+from character_set import UNICODE_DUNGEON_DRAWING_CHARACTER_SET
+from components.grid_dungeon import GridDungeon
+from components.roaming_monster import RoamingMonster
+from output_sink import NullSink
+
+
+# Dungeon sizes benchmarked by default, as (width, height).
+DEFAULT_SIZES: list[tuple[int, int]] = [(7, 5), (100, 100), (500, 500), (1000, 1000), (2000, 2000)]
+
+# Each benchmark is timed this many times.
+REPEATS: int = 10
+
+# Each repeat of a benchmark runs for at least this many seconds.
+MINIMUM_SECONDS: float = 0.25
+
+# A benchmark has regressed if it is this much slower than its baseline.
+REGRESSION_TOLERANCE: float = 0.2
+
+# Name of the calibration workload, which is timed at every size along with the benchmarks.
+# Results are compared to the baseline relative to the calibration, which does not use the game's
+# code, so a machine that is slower than when the baseline was saved is not reported as regressions.
+CALIBRATION: str = 'calibration'
+
+
+# A benchmark setup function.
+# Called like so:
+#
+# setup(dungeon, rng) -> operation
+#
+# Returns the operation to time. The operation is called with no arguments.
+BenchmarkSetup = Callable[[GridDungeon, Random], Callable[[], None]]
+
+
+@dataclass
+class BenchmarkResult:
+    ''' The result of one benchmark at one dungeon size. '''
+    benchmark: str
+    size: str
+    operations_per_second: float
+    peak_memory_bytes: int
+
+
+def create_dungeon_setup(dungeon: GridDungeon, rng: Random) -> Callable[[], None]:
+    '''
+    Creates the maze of a dungeon of the same size.
+    A separate dungeon is used, because the given dungeon's line of sight index must stay valid.
+    '''
+    maze: GridDungeon = GridDungeon(
+        dungeon.character_set, dungeon.dungeon_width, dungeon.dungeon_height, 0, rng = rng
+    )
+    def operation() -> None:
+        maze._create_dungeon()
+    return operation
+
+
+def rooms_visible_from_room_setup(dungeon: GridDungeon, rng: Random) -> Callable[[], None]:
+    ''' Finds the rooms visible from a random room. '''
+    rooms: list[int] = [rng.randrange(dungeon.number_of_rooms) for _ in range(1024)]
+    def operation() -> None:
+        for room in rooms:
+            dungeon.rooms_visible_from_room(room)
+    operation.batch_size = len(rooms)
+    return operation
+
+
+def print_dungeon_setup(dungeon: GridDungeon, rng: Random) -> Callable[[], None]:
+    ''' Prints the player's view of the dungeon, to a null sink. '''
+    def operation() -> None:
+        dungeon._print_dungeon(dungeon.rooms_visible_from_room(dungeon.player_room))
+    return operation
+
+
+def monster_turn_setup(dungeon: GridDungeon, rng: Random) -> Callable[[], None]:
+    ''' Runs a roaming monster's turn, with the player in a random room. '''
+    monster: RoamingMonster = RoamingMonster(
+        dungeon, dungeon.number_of_rooms - 1, rng = rng, output = dungeon.output
+    )
+    rooms: list[int] = [rng.randrange(dungeon.number_of_rooms) for _ in range(1024)]
+    def operation() -> None:
+        for room in rooms:
+            dungeon.player_room = room
+            monster.post_player_turn()
+    operation.batch_size = len(rooms)
+    return operation
+
+
+def calibration_setup(dungeon: GridDungeon, rng: Random) -> Callable[[], None]:
+    ''' Sorts random numbers, and counts them. Does not use the game's code. '''
+    numbers: list[float] = [rng.random() for _ in range(1024)]
+    def operation() -> None:
+        counts: dict[float, int] = {}
+        for number in sorted(numbers):
+            counts[number] = counts.get(number, 0) + 1
+    return operation
+
+
+# Benchmarks, by name.
+BENCHMARKS: dict[str, BenchmarkSetup] = {
+    'create_dungeon': create_dungeon_setup,
+    'rooms_visible_from_room': rooms_visible_from_room_setup,
+    'print_dungeon': print_dungeon_setup,
+    'monster_turn': monster_turn_setup,
+}
+
+
+def operations_per_second(
+    operation: Callable[[], None], batch_size: int, minimum_seconds: float
+) -> float:
+    ''' Runs the operation for at least the given time, and returns its operations per second. '''
+    operations: int = 0
+    start_time: float = time.perf_counter()
+    elapsed_time: float = 0.0
+    while elapsed_time < minimum_seconds:
+        operation()
+        operations = operations + batch_size
+        elapsed_time = time.perf_counter() - start_time
+    return operations / elapsed_time
+
+
+def run_size_benchmarks(
+    names: list[str],
+    dungeon: GridDungeon,
+    rng: Random,
+    repeats: int = REPEATS,
+    minimum_seconds: float = MINIMUM_SECONDS,
+) -> list[BenchmarkResult]:
+    '''
+    Runs the named benchmarks on the dungeon, and returns their results.
+    The benchmarks take turns, one repeat each, so each benchmark's repeats are spread out
+    over the whole run. The fastest repeat of each benchmark is its result.
+    Slower repeats were slowed by something else, such as other processes.
+    Peak memory is measured on a separate run, because tracing memory slows everything down.
+    The calibration workload is run along with the benchmarks, and its result comes first.
+    '''
+    names = [CALIBRATION, *names]
+    operations: list[Callable[[], None]] = [
+        calibration_setup(dungeon, rng) if name == CALIBRATION else BENCHMARKS[name](dungeon, rng)
+        for name in names
+    ]
+    peak_memory: list[int] = []
+    for operation in operations:
+        tracemalloc.start()
+        operation()
+        peak_memory.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    fastest: list[float] = [0.0] * len(operations)
+    for _ in range(repeats):
+        for index, operation in enumerate(operations):
+            fastest[index] = max(
+                fastest[index],
+                operations_per_second(
+                    operation, getattr(operation, 'batch_size', 1), minimum_seconds
+                ),
+            )
+
+    return [
+        BenchmarkResult(
+            benchmark = name,
+            size = f'{dungeon.dungeon_width}x{dungeon.dungeon_height}',
+            operations_per_second = fastest[index],
+            peak_memory_bytes = peak_memory[index],
+        )
+        for index, name in enumerate(names)
+    ]
+
+
+def run_benchmarks(
+    sizes: list[tuple[int, int]], names: list[str], seed: int = 0, repeats: int = REPEATS
+) -> list[BenchmarkResult]:
+    ''' Runs the named benchmarks at each dungeon size, printing the results of each size. '''
+    results: list[BenchmarkResult] = []
+    for width, height in sizes:
+        rng: Random = Random(seed)
+        dungeon: GridDungeon = create_benchmark_dungeon(width, height, rng)
+        for result in run_size_benchmarks(names, dungeon, rng, repeats):
+            print(
+                f'{result.benchmark:24} {result.size:>10} '
+                f'{result.operations_per_second:14.2f} ops/s '
+                f'{result.peak_memory_bytes / 1024:12.1f} KiB peak'
+            )
+            results.append(result)
+    return results
+
+
+def create_benchmark_dungeon(width: int, height: int, rng: Random) -> GridDungeon:
+    ''' Returns the dungeon that the benchmarks of a dungeon size are run on. '''
+    return GridDungeon(
+        UNICODE_DUNGEON_DRAWING_CHARACTER_SET, width, height, 0, rng = rng, output = NullSink()
+    )
+
+
+def find_regressions(
+    results: list[BenchmarkResult], baseline: list[BenchmarkResult]
+) -> list[str]:
+    '''
+    Returns a description of each result that is slower than its baseline,
+    relative to the calibration workload's result at the same size.
+    '''
+    baseline_results: dict[tuple[str, str], BenchmarkResult] = {
+        (result.benchmark, result.size): result for result in baseline
+    }
+
+    # How fast the machine ran at each size, relative to when the baseline was saved.
+    machine_speeds: dict[str, float] = {}
+    for result in results:
+        baseline_calibration: Optional[BenchmarkResult] = baseline_results.get(
+            (CALIBRATION, result.size)
+        )
+        if result.benchmark == CALIBRATION and baseline_calibration is not None:
+            machine_speeds[result.size] = (
+                result.operations_per_second / baseline_calibration.operations_per_second
+            )
+
+    regressions: list[str] = []
+    for result in results:
+        baseline_result: Optional[BenchmarkResult] = baseline_results.get(
+            (result.benchmark, result.size)
+        )
+        if result.benchmark == CALIBRATION or baseline_result is None:
+            continue
+        expected: float = (
+            baseline_result.operations_per_second * machine_speeds.get(result.size, 1.0)
+        )
+        if result.operations_per_second < expected * (1 - REGRESSION_TOLERANCE):
+            regressions.append(
+                f'{result.benchmark} {result.size}: '
+                f'{result.operations_per_second:.2f} ops/s, '
+                f'baseline {baseline_result.operations_per_second:.2f} ops/s, '
+                f'{expected:.2f} ops/s at this machine speed'
+            )
+    return regressions
+
+
+def parse_size(text: str) -> tuple[int, int]:
+    ''' Parses a WIDTHxHEIGHT dungeon size. '''
+    width, height = text.lower().split('x')
+    return (int(width), int(height))
+
+
+def main() -> None:
+    ''' Benchmark program. '''
+    argument_parser: ArgumentParser = ArgumentParser(description = 'Benchmark the hot paths.')
+    argument_parser.add_argument(
+        '--sizes', nargs = '+', type = parse_size, default = DEFAULT_SIZES,
+        help = 'dungeon sizes, as WIDTHxHEIGHT'
+    )
+    argument_parser.add_argument(
+        '--benchmarks', nargs = '+', choices = list(BENCHMARKS), default = list(BENCHMARKS)
+    )
+    argument_parser.add_argument('--seed', type = int, default = 0)
+    argument_parser.add_argument(
+        '--repeats', type = int, default = REPEATS,
+        help = 'time each benchmark this many times, and report the fastest'
+    )
+    argument_parser.add_argument('--save', help = 'save the results as a JSON baseline file')
+    argument_parser.add_argument('--compare', help = 'compare the results to a JSON baseline file')
+    arguments: Namespace = argument_parser.parse_args()
+
+    results: list[BenchmarkResult] = run_benchmarks(
+        arguments.sizes, arguments.benchmarks, arguments.seed, arguments.repeats
+    )
+
+    if arguments.save:
+        with open(arguments.save, 'w', encoding = 'utf-8') as baseline_file:
+            json.dump([asdict(result) for result in results], baseline_file, indent = 2)
+
+    if arguments.compare:
+        with open(arguments.compare, encoding = 'utf-8') as baseline_file:
+            baseline: list[BenchmarkResult] = [
+                BenchmarkResult(**result) for result in json.load(baseline_file)
+            ]
+        regressions: list[str] = find_regressions(results, baseline)
+        for regression in regressions:
+            print(f'Regression: {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+'''
+Maze generator benchmarks.
+Times each maze generator across dungeon sizes, and reports mazes per second, peak memory,
+and the shape of the mazes: the share of rooms that are dead ends, and the mean line of sight.
+Also streams a tall maze with Eller's algorithm, to show that its memory does not grow with height.
+Results may be saved as a JSON baseline, and compared against a saved baseline.
+
+Usage: python -m benchmarks.maze_generators [--sizes 7x5 100x100] [--stream 1000x10000]
+                                            [--save FILE] [--compare FILE]
+'''
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser, Namespace
+from dataclasses import asdict, dataclass
+from random import Random
+from typing import Optional
+
+from benchmarks.hot_paths import parse_size
+from character_set import UNICODE_DUNGEON_DRAWING_CHARACTER_SET
+from components.grid_dungeon import GRID_DOOR_MASK_DIRECTIONS, GridDungeon, MazeGenerator
+from components.maze_generators import MAZE_GENERATORS, write_eller_maze
+
+
+# Dungeon sizes benchmarked by default, as (width, height).
+DEFAULT_SIZES: list[tuple[int, int]] = [(7, 5), (100, 100), (500, 500)]
+
+# Each benchmark is repeated for at least this many seconds.
+MINIMUM_SECONDS: float = 0.5
+
+# A benchmark has regressed if it is this much slower than its baseline.
+REGRESSION_TOLERANCE: float = 0.2
+
+
+@dataclass
+class MazeBenchmarkResult:
+    ''' The result of one maze generator at one dungeon size. '''
+    generator: str
+    size: str
+    mazes_per_second: float
+    peak_memory_bytes: int
+    dead_ends: float           # The share of rooms with a single door.
+    mean_line_of_sight: float  # The mean number of other rooms visible from a room.
+
+
+def maze_shape(rooms: bytearray, dungeon_width: int, dungeon_height: int) -> tuple[float, float]:
+    ''' Returns the share of the maze's rooms that are dead ends, and its mean line of sight. '''
+    number_of_rooms: int = dungeon_width * dungeon_height
+    dead_ends: int = sum(1 for door_mask in rooms if len(GRID_DOOR_MASK_DIRECTIONS[door_mask]) == 1)
+
+    # The dungeon indexes the lines of sight through the maze.
+    dungeon: GridDungeon = GridDungeon(
+        UNICODE_DUNGEON_DRAWING_CHARACTER_SET, dungeon_width, dungeon_height, 0, rooms = rooms
+    )
+    rooms_visible: int = sum(sum(lengths) for lengths in dungeon.corridor_lengths)
+    return dead_ends / number_of_rooms, rooms_visible / number_of_rooms
+
+
+def run_maze_benchmark(
+    name: str,
+    dungeon_width: int,
+    dungeon_height: int,
+    seed: int = 0,
+    minimum_seconds: float = MINIMUM_SECONDS,
+) -> MazeBenchmarkResult:
+    '''
+    Runs one maze generator at one size, and returns its result.
+    Peak memory is measured on a separate run, because tracing memory slows everything down.
+    '''
+    maze_generator: MazeGenerator = MAZE_GENERATORS[name]
+    rng: Random = Random(seed)
+    number_of_rooms: int = dungeon_width * dungeon_height
+
+    tracemalloc.start()
+    rooms: bytearray = bytearray(number_of_rooms)
+    maze_generator(rooms, dungeon_width, dungeon_height, rng)
+    _, peak_memory_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    dead_ends, mean_line_of_sight = maze_shape(rooms, dungeon_width, dungeon_height)
+
+    mazes: int = 0
+    start_time: float = time.perf_counter()
+    elapsed_time: float = 0.0
+    while elapsed_time < minimum_seconds:
+        maze_generator(bytearray(number_of_rooms), dungeon_width, dungeon_height, rng)
+        mazes = mazes + 1
+        elapsed_time = time.perf_counter() - start_time
+
+    return MazeBenchmarkResult(
+        generator = name,
+        size = f'{dungeon_width}x{dungeon_height}',
+        mazes_per_second = mazes / elapsed_time,
+        peak_memory_bytes = peak_memory_bytes,
+        dead_ends = dead_ends,
+        mean_line_of_sight = mean_line_of_sight,
+    )
+
+
+def run_maze_benchmarks(
+    sizes: list[tuple[int, int]], names: list[str], seed: int = 0
+) -> list[MazeBenchmarkResult]:
+    ''' Runs the named generators at each dungeon size, printing each result as it completes. '''
+    results: list[MazeBenchmarkResult] = []
+    for width, height in sizes:
+        for name in names:
+            result: MazeBenchmarkResult = run_maze_benchmark(name, width, height, seed)
+            print(
+                f'{result.generator:24} {result.size:>10} '
+                f'{result.mazes_per_second:12.2f} mazes/s '
+                f'{result.peak_memory_bytes / 1024:12.1f} KiB peak '
+                f'{100 * result.dead_ends:6.1f}% dead ends '
+                f'{result.mean_line_of_sight:6.2f} rooms in sight'
+            )
+            results.append(result)
+    return results
+
+
+def run_stream_benchmark(dungeon_width: int, dungeon_height: int, seed: int = 0) -> None:
+    '''
+    Streams a maze generated with Eller's algorithm to the null device,
+    and prints the rows per second and the peak memory.
+    '''
+    tracemalloc.start()
+    write_eller_maze(os.devnull, dungeon_width, dungeon_height, Random(seed))
+    _, peak_memory_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start_time: float = time.perf_counter()
+    write_eller_maze(os.devnull, dungeon_width, dungeon_height, Random(seed))
+    elapsed_time: float = time.perf_counter() - start_time
+
+    print(
+        f'{"eller streamed":24} {f"{dungeon_width}x{dungeon_height}":>10} '
+        f'{dungeon_height / elapsed_time:12.2f} rows/s '
+        f'{peak_memory_bytes / 1024:12.1f} KiB peak'
+    )
+
+
+def find_regressions(
+    results: list[MazeBenchmarkResult], baseline: list[MazeBenchmarkResult]
+) -> list[str]:
+    ''' Returns a description of each result that is slower than its baseline. '''
+    baseline_results: dict[tuple[str, str], MazeBenchmarkResult] = {
+        (result.generator, result.size): result for result in baseline
+    }
+    regressions: list[str] = []
+    for result in results:
+        baseline_result: Optional[MazeBenchmarkResult] = baseline_results.get(
+            (result.generator, result.size)
+        )
+        if baseline_result is None:
+            continue
+        ratio: float = result.mazes_per_second / baseline_result.mazes_per_second
+        if ratio < 1 - REGRESSION_TOLERANCE:
+            regressions.append(
+                f'{result.generator} {result.size}: '
+                f'{result.mazes_per_second:.2f} mazes/s, '
+                f'baseline {baseline_result.mazes_per_second:.2f} mazes/s'
+            )
+    return regressions
+
+
+def main() -> None:
+    ''' Benchmark program. '''
+    argument_parser: ArgumentParser = ArgumentParser(
+        description = 'Benchmark the maze generators.'
+    )
+    argument_parser.add_argument(
+        '--sizes', nargs = '+', type = parse_size, default = DEFAULT_SIZES,
+        help = 'dungeon sizes, as WIDTHxHEIGHT'
+    )
+    argument_parser.add_argument(
+        '--generators', nargs = '+', choices = list(MAZE_GENERATORS),
+        default = list(MAZE_GENERATORS)
+    )
+    argument_parser.add_argument(
+        '--stream', type = parse_size,
+        help = "also stream a maze of this size, as WIDTHxHEIGHT, with Eller's algorithm"
+    )
+    argument_parser.add_argument('--seed', type = int, default = 0)
+    argument_parser.add_argument('--save', help = 'save the results as a JSON baseline file')
+    argument_parser.add_argument('--compare', help = 'compare the results to a JSON baseline file')
+    arguments: Namespace = argument_parser.parse_args()
+
+    results: list[MazeBenchmarkResult] = run_maze_benchmarks(
+        arguments.sizes, arguments.generators, arguments.seed
+    )
+    if arguments.stream:
+        run_stream_benchmark(*arguments.stream, arguments.seed)
+
+    if arguments.save:
+        with open(arguments.save, 'w', encoding = 'utf-8') as baseline_file:
+            json.dump([asdict(result) for result in results], baseline_file, indent = 2)
+
+    if arguments.compare:
+        with open(arguments.compare, encoding = 'utf-8') as baseline_file:
+            baseline: list[MazeBenchmarkResult] = [
+                MazeBenchmarkResult(**result) for result in json.load(baseline_file)
+            ]
+        regressions: list[str] = find_regressions(results, baseline)
+        for regression in regressions:
+            print(f'Regression: {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,9 +3,12 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen = True)
 class DungeonDrawingCharacterSet:
-    ''' Character set used to draw the dungeon. '''
+    '''
+    Character set used to draw the dungeon.
+    Character sets are frozen, so they can key the tables computed from them.
+    '''
     up_and_down: str
     up_down_and_left: str
     up_down_left_and_right: str
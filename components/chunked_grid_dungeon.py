@@ -0,0 +1,488 @@
+'''
+Chunked grid dungeon.
+An endless grid dungeon, generated one chunk at a time, as it is explored.
+'''
+
+import os
+from array import array
+from collections import Counter, OrderedDict
+from collections.abc import Container, Iterator, MutableMapping
+from dataclasses import dataclass
+from random import Random
+from typing import Optional
+from weakref import WeakValueDictionary
+
+from base_classes.dungeon import RoomContents, RoomContentsFunction, RoomCounts
+from character_set import DungeonDrawingCharacterSet
+from components.grid_dungeon import (
+    GRID_DIRECTION_DOOR, GridDirection, GridDungeon, GridVisibleRooms, MazeGenerator,
+    carve_recursive_backtracker,
+)
+from output_sink import OutputSink
+
+
+@dataclass
+class DungeonChunk:
+    ''' A square chunk of the dungeon. '''
+    rooms: bytearray               # One door mask per room, including the doors to other chunks.
+    corridor_lengths: list[array]  # Line of sight index within the chunk, indexed by direction.
+
+
+class ChunkStore:
+    '''
+    The chunks of a chunked grid dungeon, indexed like the door masks of a grid dungeon.
+    Chunks are generated when one of their rooms is first looked up.
+    The least recently used chunks are evicted, and, if a spill directory is given,
+    written there to be read back instead of generated again.
+    Chunks are generated only from the seed and their coordinates,
+    so evicted chunks come back exactly as they were.
+    Room counts kept per chunk are dropped when their chunk is evicted.
+    '''
+
+
+    def __init__(
+        self,
+        character_set: DungeonDrawingCharacterSet,
+        seed: int,
+        chunk_size: int,
+        dungeon_width: int,
+        dungeon_height: int,
+        cache_size: int,
+        spill_directory: Optional[str] = None,
+        maze_generator: MazeGenerator = carve_recursive_backtracker,
+    ):
+        self.character_set: DungeonDrawingCharacterSet = character_set
+        self.seed: int = seed
+        self.chunk_size: int = chunk_size
+        self.dungeon_width: int = dungeon_width
+        self.chunks_wide: int = dungeon_width // chunk_size
+        self.chunks_high: int = dungeon_height // chunk_size
+        self.cache_size: int = cache_size
+        self.spill_directory: Optional[str] = spill_directory
+        self.maze_generator: MazeGenerator = maze_generator  # Carves each chunk.
+
+        # The loaded chunks, keyed by chunk coordinates. The least recently used chunk is first.
+        self.chunks: OrderedDict[tuple[int, int], DungeonChunk] = OrderedDict()
+        self.chunks_generated: int = 0
+
+        # The room counts kept per chunk, keyed by id, while they are in use. See ChunkRoomCounts.
+        # Room counts are mappings, so they are not hashable, and cannot be kept in a WeakSet.
+        self.room_counts: WeakValueDictionary[int, ChunkRoomCounts] = WeakValueDictionary()
+
+
+    def __getitem__(self, room: int) -> int:
+        ''' Returns the door mask of the given room. '''
+        chunk, local_room = self.chunk_and_local_room(room)
+        return chunk.rooms[local_room]
+
+
+    def chunk_key(self, room: int) -> tuple[int, int]:
+        ''' Returns the chunk coordinates of the chunk that the given room is in. '''
+        y, x = divmod(room, self.dungeon_width)
+        return x // self.chunk_size, y // self.chunk_size
+
+
+    def chunk_and_local_room(self, room: int) -> tuple[DungeonChunk, int]:
+        ''' Returns the chunk that the given room is in, and the room's index in the chunk. '''
+        chunk_size: int = self.chunk_size
+        y, x = divmod(room, self.dungeon_width)
+        chunk_y, local_y = divmod(y, chunk_size)
+        chunk_x, local_x = divmod(x, chunk_size)
+        return self.chunk(chunk_x, chunk_y), local_x + local_y * chunk_size
+
+
+    def chunk(self, chunk_x: int, chunk_y: int) -> DungeonChunk:
+        ''' Returns the chunk at the given chunk coordinates, loading it if necessary. '''
+        key: tuple[int, int] = (chunk_x, chunk_y)
+        chunk: Optional[DungeonChunk] = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        chunk = self._read_chunk(chunk_x, chunk_y)
+        if chunk is None:
+            chunk = self._generate_chunk(chunk_x, chunk_y)
+        self.chunks[key] = chunk
+
+        if len(self.chunks) > self.cache_size:
+            evicted_key, evicted_chunk = self.chunks.popitem(last = False)
+            self._write_chunk(*evicted_key, evicted_chunk)
+            for room_counts in self.room_counts.values():
+                room_counts.forget_chunk(evicted_key)
+        return chunk
+
+
+    def _generate_chunk(self, chunk_x: int, chunk_y: int) -> DungeonChunk:
+        '''
+        Generate the chunk at the given chunk coordinates.
+        The chunk is carved as a small grid dungeon, then doors are cut through its borders.
+        '''
+        chunk_size: int = self.chunk_size
+        chunk_dungeon: GridDungeon = GridDungeon(
+            self.character_set,
+            chunk_size,
+            chunk_size,
+            0,
+            rng = Random(f'{self.seed}:chunk:{chunk_x}:{chunk_y}'),
+            maze_generator = self.maze_generator,
+        )
+        rooms: bytearray = chunk_dungeon.rooms
+
+        # The border doors are added after the chunk's line of sight index is made,
+        # so the index stops at the chunk's borders. See ChunkedGridDungeon._corridor_length().
+        if chunk_y > 0:
+            x: int = self._border_door_position(chunk_x, chunk_y - 1, GridDirection.SOUTH)
+            rooms[x] |= GRID_DIRECTION_DOOR[GridDirection.NORTH]
+        if chunk_y < self.chunks_high - 1:
+            x = self._border_door_position(chunk_x, chunk_y, GridDirection.SOUTH)
+            rooms[x + (chunk_size - 1) * chunk_size] |= GRID_DIRECTION_DOOR[GridDirection.SOUTH]
+        if chunk_x > 0:
+            y: int = self._border_door_position(chunk_x - 1, chunk_y, GridDirection.EAST)
+            rooms[y * chunk_size] |= GRID_DIRECTION_DOOR[GridDirection.WEST]
+        if chunk_x < self.chunks_wide - 1:
+            y = self._border_door_position(chunk_x, chunk_y, GridDirection.EAST)
+            rooms[chunk_size - 1 + y * chunk_size] |= GRID_DIRECTION_DOOR[GridDirection.EAST]
+
+        self.chunks_generated = self.chunks_generated + 1
+        return DungeonChunk(rooms = rooms, corridor_lengths = chunk_dungeon.corridor_lengths)
+
+
+    def _border_door_position(
+        self, chunk_x: int, chunk_y: int, grid_direction: GridDirection
+    ) -> int:
+        '''
+        Returns the position, along the given chunk's South or East border, of the border's door.
+        Each border is decided only by the seed and the border's coordinates,
+        so both of the chunks it separates agree on it, whichever is generated first.
+        Every pair of adjacent chunks shares a door, so the whole dungeon is connected.
+        '''
+        return Random(
+            f'{self.seed}:border:{chunk_x}:{chunk_y}:{grid_direction.name}'
+        ).randrange(self.chunk_size)
+
+
+    def _chunk_path(self, chunk_x: int, chunk_y: int) -> str:
+        ''' Returns the path of the spill file of the chunk at the given chunk coordinates. '''
+        return os.path.join(self.spill_directory, f'{self.seed}_{chunk_x}_{chunk_y}.chunk')
+
+
+    def _read_chunk(self, chunk_x: int, chunk_y: int) -> Optional[DungeonChunk]:
+        ''' Returns the chunk at the given chunk coordinates, if it was spilled to disk. '''
+        if self.spill_directory is None:
+            return None
+        try:
+            with open(self._chunk_path(chunk_x, chunk_y), 'rb') as chunk_file:
+                data: bytes = chunk_file.read()
+        except FileNotFoundError:
+            return None
+
+        # The door masks, then the corridor lengths in each direction.
+        number_of_rooms: int = self.chunk_size * self.chunk_size
+        corridor_lengths: list[array] = []
+        offset: int = number_of_rooms
+        for _ in GridDirection:
+            lengths: array = array('I')
+            lengths.frombytes(data[offset:offset + lengths.itemsize * number_of_rooms])
+            corridor_lengths.append(lengths)
+            offset = offset + lengths.itemsize * number_of_rooms
+        return DungeonChunk(
+            rooms = bytearray(data[:number_of_rooms]), corridor_lengths = corridor_lengths
+        )
+
+
+    def _write_chunk(self, chunk_x: int, chunk_y: int, chunk: DungeonChunk) -> None:
+        ''' Spill the chunk to disk, if there is a spill directory, and it is not there already. '''
+        if self.spill_directory is None:
+            return
+        path: str = self._chunk_path(chunk_x, chunk_y)
+        if os.path.exists(path):
+            return
+        with open(path, 'wb') as chunk_file:
+            chunk_file.write(chunk.rooms)
+            for lengths in chunk.corridor_lengths:
+                chunk_file.write(lengths.tobytes())
+
+
+class ChunkRoomCounts(MutableMapping):
+    '''
+    A count per room of a chunked grid dungeon, kept per chunk.
+    The counts of a chunk are dropped when the chunk is evicted, so, like the chunks,
+    they are bounded by the chunks in use, not by how much of the dungeon was explored.
+    Rooms that are not counted count as 0.
+    '''
+
+
+    def __init__(self, chunk_store: ChunkStore):
+        self.chunk_store: ChunkStore = chunk_store
+
+        # The counts of the rooms in each chunk, keyed by chunk coordinates.
+        self.chunk_counts: dict[tuple[int, int], Counter] = {}
+
+
+    def __getitem__(self, room: int) -> int:
+        counts: Optional[Counter] = self.chunk_counts.get(self.chunk_store.chunk_key(room))
+        return counts[room] if counts is not None else 0
+
+
+    def __setitem__(self, room: int, count: int) -> None:
+        key: tuple[int, int] = self.chunk_store.chunk_key(room)
+        counts: Optional[Counter] = self.chunk_counts.get(key)
+        if counts is None:
+            counts = Counter()
+            self.chunk_counts[key] = counts
+        counts[room] = count
+
+
+    def __delitem__(self, room: int) -> None:
+        counts: Optional[Counter] = self.chunk_counts.get(self.chunk_store.chunk_key(room))
+        if counts is None or room not in counts:
+            raise KeyError(room)
+        del counts[room]
+
+
+    def __contains__(self, room: object) -> bool:
+        if not isinstance(room, int):
+            return False
+        counts: Optional[Counter] = self.chunk_counts.get(self.chunk_store.chunk_key(room))
+        return counts is not None and room in counts
+
+
+    def __iter__(self) -> Iterator[int]:
+        for counts in self.chunk_counts.values():
+            yield from counts
+
+
+    def __len__(self) -> int:
+        return sum(len(counts) for counts in self.chunk_counts.values())
+
+
+    def forget_chunk(self, key: tuple[int, int]) -> None:
+        ''' Drops the counts of the rooms in the chunk at the given chunk coordinates. '''
+        self.chunk_counts.pop(key, None)
+
+
+class ViewportVisibleRooms(Container):
+    ''' The visible rooms of the dungeon, seen through the viewport, indexed by viewport room. '''
+
+
+    def __init__(
+        self,
+        visible_rooms: Container[int],
+        origin_room: int,
+        dungeon_width: int,
+        viewport_width: int,
+    ):
+        self.visible_rooms: Container[int] = visible_rooms
+        self.origin_room: int = origin_room  # The dungeon room at the viewport's North-West corner.
+        self.dungeon_width: int = dungeon_width
+        self.viewport_width: int = viewport_width
+
+
+    def __contains__(self, viewport_room: int) -> bool:
+        y, x = divmod(viewport_room, self.viewport_width)
+        return self.origin_room + x + y * self.dungeon_width in self.visible_rooms
+
+
+class ChunkedGridDungeon(GridDungeon):
+    '''
+    Chunked grid dungeon.
+    A grid dungeon that is too large to create, split into square chunks.
+    Chunks are generated from the seed and their coordinates, when a room in them is looked up,
+    such as when the player or a monster comes near. Only the most recently used chunks are kept,
+    so memory is bounded by the chunks in use, not by how much of the dungeon was explored.
+    Each chunk is a maze, with a door to each adjacent chunk.
+    Only a viewport around the player is drawn.
+    Pathfinding must use a maximum distance, as the dungeon is too large to search.
+    '''
+
+    def __init__(
+        self,
+        character_set: DungeonDrawingCharacterSet,
+        chunk_size: int = 16,
+        chunks_wide: int = 1 << 16,
+        chunks_high: int = 1 << 16,
+        viewport_width: int = 15,
+        viewport_height: int = 9,
+        cache_size: int = 64,
+        spill_directory: Optional[str] = None,
+        seed: Optional[int] = None,
+        ansi_terminal: bool = False,
+        rng: Optional[Random] = None,
+        output: Optional[OutputSink] = None,
+        maze_generator: MazeGenerator = carve_recursive_backtracker,
+    ):
+        '''
+        The player starts in the middle of the dungeon.
+        If no seed is given, it is drawn from the random number generator.
+        Each chunk is carved by the maze generator. See components.maze_generators.
+        '''
+        self.chunk_size: int = chunk_size
+        self.cache_size: int = cache_size
+        self.spill_directory: Optional[str] = spill_directory
+        self.seed: Optional[int] = seed
+        dungeon_width: int = chunk_size * chunks_wide
+        dungeon_height: int = chunk_size * chunks_high
+        super().__init__(
+            character_set,
+            dungeon_width,
+            dungeon_height,
+            dungeon_width // 2 + dungeon_height // 2 * dungeon_width,
+            ansi_terminal = ansi_terminal,
+            rng = rng,
+            output = output,
+            maze_generator = maze_generator,
+        )
+
+        # The viewport is drawn as a small grid dungeon, refilled from the chunks every frame.
+        self.viewport_width: int = min(viewport_width, dungeon_width)
+        self.viewport_height: int = min(viewport_height, dungeon_height)
+        self.viewport: GridDungeon = GridDungeon(
+            character_set,
+            self.viewport_width,
+            self.viewport_height,
+            0,
+            rooms = bytearray(self.viewport_width * self.viewport_height),
+        )
+        self.viewport_room_contents: RoomContents = {}
+        self.viewport.set_room_contents_function(self._viewport_room_contents)
+
+        # The offsets of one step in each direction, within a chunk, indexed by direction.
+        self.chunk_room_offsets: list[int] = [-chunk_size, chunk_size, 1, -1]
+
+
+    def description(self) -> None:
+        ''' Describe the scenario. '''
+        self.output.write_line('- You are in an endless dungeon.')
+
+
+    def is_room_visible_from_room(self, room: int, other_room: int) -> bool:
+        ''' Returns True if the other room is visible from the given room. '''
+        return other_room in self._rooms_visible_from_room(room)
+
+
+    def room_counts(self) -> RoomCounts:
+        '''
+        Returns a new, empty count per room.
+        The counts are kept per chunk, and dropped when their chunk is evicted.
+        '''
+        room_counts: ChunkRoomCounts = ChunkRoomCounts(self.rooms)
+        self.rooms.room_counts[id(room_counts)] = room_counts
+        return room_counts
+
+
+    def rooms_apart(self, room: int, other_room: int) -> int:
+        ''' Returns how many rooms apart the given rooms are, in a straight line, through walls. '''
+        return max(
+            abs(self._room_x(room) - self._room_x(other_room)),
+            abs(self._room_y(room) - self._room_y(other_room)),
+        )
+
+
+    def _create_dungeon(self) -> None:
+        ''' Create the chunk store. Chunks are generated as they are needed. '''
+        if self.seed is None:
+            self.seed = self.rng.getrandbits(64)
+        self.rooms = ChunkStore(
+            self.character_set,
+            self.seed,
+            self.chunk_size,
+            self.dungeon_width,
+            self.dungeon_height,
+            self.cache_size,
+            self.spill_directory,
+            self.maze_generator,
+        )
+
+
+    def _index_corridors(self) -> None:
+        ''' The lines of sight are indexed per chunk, when each chunk is generated. '''
+
+
+    def _corridor_length(self, grid_direction: GridDirection, room: int) -> int:
+        '''
+        Returns the number of rooms visible from the given room in the given direction.
+        The chunks' line of sight indexes are joined through the doors in their borders.
+        '''
+        step: int = self._room_in_direction(grid_direction, 0)  # Room offset of one step.
+        chunk_step: int = self.chunk_room_offsets[grid_direction]
+        door: int = GRID_DIRECTION_DOOR[grid_direction]
+        corridor_length: int = 0
+        while True:
+            chunk, local_room = self.rooms.chunk_and_local_room(room)
+            chunk_corridor_length: int = chunk.corridor_lengths[grid_direction][local_room]
+            corridor_length = corridor_length + chunk_corridor_length
+            room = room + step * chunk_corridor_length
+            local_room = local_room + chunk_step * chunk_corridor_length
+
+            # Within a chunk, a corridor only stops at a door if the door is in the chunk's border.
+            if not chunk.rooms[local_room] & door:
+                return corridor_length
+            corridor_length = corridor_length + 1
+            room = room + step
+
+
+    def _rooms_visible_in_direction(self, grid_direction: GridDirection, room: int) -> range:
+        '''
+        Returns a range of the rooms that are visible from the given room in the given direction.
+        '''
+        step: int = self._room_in_direction(grid_direction, 0)  # Room offset of one step.
+        corridor_length: int = self._corridor_length(grid_direction, room)
+        return range(room + step, room + step * (corridor_length + 1), step)
+
+
+    def _rooms_visible_from_room(self, room: int) -> GridVisibleRooms:
+        ''' Returns the set of all the rooms that are visible from the given room. '''
+        return GridVisibleRooms(
+            room = room,
+            dungeon_width = self.dungeon_width,
+            north = self._corridor_length(GridDirection.NORTH, room),
+            south = self._corridor_length(GridDirection.SOUTH, room),
+            east = self._corridor_length(GridDirection.EAST, room),
+            west = self._corridor_length(GridDirection.WEST, room),
+        )
+
+
+    def _viewport_origin(self) -> tuple[int, int]:
+        ''' Returns the coordinates of the viewport's North-West room, centered on the player. '''
+        x: int = self._room_x(self.player_room) - self.viewport_width // 2
+        y: int = self._room_y(self.player_room) - self.viewport_height // 2
+        x = max(0, min(x, self.dungeon_width - self.viewport_width))
+        y = max(0, min(y, self.dungeon_height - self.viewport_height))
+        return x, y
+
+
+    _viewport_room_contents: RoomContentsFunction
+    def _viewport_room_contents(self) -> RoomContents:
+        ''' Returns the contents of the viewport's rooms, indexed by viewport room. '''
+        return self.viewport_room_contents
+
+
+    def _draw_dungeon(self, visible_rooms: Container[int]) -> str:
+        '''
+        Draw the viewport, and return it as a single string.
+        Hide the room details of rooms that are not visible.
+        '''
+        origin_x, origin_y = self._viewport_origin()
+        origin_room: int = self._room_at_x_y(origin_x, origin_y)
+        viewport_width: int = self.viewport_width
+
+        # Copy the door masks of the rooms in view into the viewport.
+        viewport_rooms: bytearray = self.viewport.rooms
+        for viewport_room in range(len(viewport_rooms)):
+            y, x = divmod(viewport_room, viewport_width)
+            viewport_rooms[viewport_room] = self.rooms[origin_room + x + y * self.dungeon_width]
+
+        # Move the contents of the rooms in view into the viewport.
+        self.viewport_room_contents = {}
+        for room, contents in self.room_contents_function().items():
+            x = self._room_x(room) - origin_x
+            y = self._room_y(room) - origin_y
+            if 0 <= x < viewport_width and 0 <= y < self.viewport_height:
+                self.viewport_room_contents[x + y * viewport_width] = contents
+
+        return self.viewport._draw_dungeon(ViewportVisibleRooms(
+            visible_rooms = visible_rooms,
+            origin_room = origin_room,
+            dungeon_width = self.dungeon_width,
+            viewport_width = viewport_width,
+        ))
@@ -3,14 +3,20 @@ Grid dungeon.
 Allows the player to navigate a grid dungeon.
 '''
 
+from array import array
+from collections.abc import Container, Iterator, Sequence, Set
 from dataclasses import dataclass
 from enum import IntEnum
-from random import choice
-from typing import Optional
+from random import Random
+from typing import Callable, Optional
 
-from base_classes.dungeon import Direction, Dungeon, NavigationInfo, RoomContentFunction
+from ansi_terminal import AnsiFrameRenderer
+from base_classes.dungeon import (
+    Direction, Dungeon, NavigationInfo, RoomContents, RoomContentsFunction, VisibleRooms
+)
 from base_classes.scenario import Command, CommandFunction
 from character_set import DungeonDrawingCharacterSet
+from output_sink import OutputSink
 
 
 class GridDirection(IntEnum):
@@ -21,7 +27,7 @@ class GridDirection(IntEnum):
     WEST = 3
 
 
-@dataclass
+@dataclass(frozen = True)
 class GridDungeonsElements:
     ''' Elements of the dungeon. '''
     empty_room: str
@@ -84,6 +90,399 @@ GRID_DIRECTION_OPPOSITE: dict[str, str] = {
     GridDirection.WEST: GridDirection.EAST,
 }
 
+# Door bits. Each room's doors are stored as a mask of these bits.
+GRID_DIRECTION_DOOR: dict[GridDirection, int] = {
+    GridDirection.NORTH: 1 << GridDirection.NORTH,
+    GridDirection.SOUTH: 1 << GridDirection.SOUTH,
+    GridDirection.EAST: 1 << GridDirection.EAST,
+    GridDirection.WEST: 1 << GridDirection.WEST,
+}
+
+# Door bits of the walls that are drawn with each room, its East and South walls.
+GRID_EAST_DOOR: int = GRID_DIRECTION_DOOR[GridDirection.EAST]
+GRID_SOUTH_DOOR: int = GRID_DIRECTION_DOOR[GridDirection.SOUTH]
+
+# Translation tables from a room's door mask to 1 if it has an East or a South door, or 0.
+# Used with bytes.translate(), to find the doors of a whole row of rooms at once.
+GRID_EAST_DOOR_BITS: bytes = bytes(
+    1 if door_mask & GRID_EAST_DOOR else 0 for door_mask in range(256)
+)
+GRID_SOUTH_DOOR_BITS: bytes = bytes(
+    1 if door_mask & GRID_SOUTH_DOOR else 0 for door_mask in range(256)
+)
+
+# Tile codes. A tile's code is the code of the first tile of its table, plus its table index.
+# See GridDungeonTiles.
+GRID_TILE_ROOM: int = 0
+GRID_TILE_EAST_WALL: int = 2
+GRID_TILE_SOUTH_WALL: int = 10
+GRID_TILE_SOUTH_EAST_CORNER: int = 18
+GRID_TILE_NORTH_EDGE_CORNER: int = 34
+GRID_TILE_SOUTH_EDGE_CORNER: int = 38
+GRID_TILE_WEST_EDGE_CORNER: int = 42
+GRID_TILE_EAST_EDGE_CORNER: int = 46
+GRID_TILE_VERTICAL_EDGE: int = 50
+GRID_TILE_HORIZONTAL_EDGE: int = 51
+GRID_TILE_NORTHWEST_CORNER: int = 52
+GRID_TILE_NORTHEAST_CORNER: int = 53
+GRID_TILE_SOUTHWEST_CORNER: int = 54
+GRID_TILE_SOUTHEAST_CORNER: int = 55
+GRID_TILE_LINE_BREAK: int = 56
+
+# Table of the directions that contain doors, indexed by a room's door mask.
+GRID_DOOR_MASK_DIRECTIONS: list[tuple[GridDirection, ...]] = [
+    tuple(
+        grid_direction
+        for grid_direction in [
+            GridDirection.NORTH, GridDirection.SOUTH, GridDirection.EAST, GridDirection.WEST,
+        ]
+        if door_mask & GRID_DIRECTION_DOOR[grid_direction]
+    )
+    for door_mask in range(16)
+]
+
+# The dungeon interface's directions, shared by all grid dungeons.
+GRID_DUNGEON_DIRECTION: dict[GridDirection, Direction] = {
+    grid_direction: Direction(id = grid_direction, name = GRID_DIRECTION_NAME[grid_direction])
+    for grid_direction in GridDirection
+}
+
+# Table of the dungeon interface's directions that contain doors, indexed by a room's door mask.
+GRID_DOOR_MASK_DUNGEON_DIRECTIONS: list[tuple[Direction, ...]] = [
+    tuple(GRID_DUNGEON_DIRECTION[grid_direction] for grid_direction in grid_directions)
+    for grid_directions in GRID_DOOR_MASK_DIRECTIONS
+]
+
+
+@dataclass(frozen = True)
+class GridDungeonTiles:
+    '''
+    Tile lookup tables of a character set.
+    Every wall and corner position has a table of its tiles,
+    indexed by the visibility of the rooms beside it, and for walls, by whether there is a door.
+    The tables are computed once per character set, and shared by all the dungeons drawn with it.
+    '''
+    elements: GridDungeonsElements
+
+    # Room tiles. Bit 0 = The room is visible.
+    rooms: tuple[str, ...]
+
+    # East wall tiles.
+    # Bit 0 = The room is visible. Bit 1 = The room to the East is visible.
+    # Bit 2 = There is a door.
+    east_walls: tuple[str, ...]
+
+    # South wall tiles.
+    # Bit 0 = The room is visible. Bit 1 = The room to the South is visible.
+    # Bit 2 = There is a door.
+    south_walls: tuple[str, ...]
+
+    # Internal Southeast corner tiles.
+    # Bit 0 = The room is visible. Bit 1 = The room to the South is visible.
+    # Bit 2 = The room to the East is visible. Bit 3 = The room to the Southeast is visible.
+    south_east_corners: tuple[str, ...]
+
+    # Corner tiles of the North and South edges, East of a room.
+    # Bit 0 = The room is visible. Bit 1 = The room to the East is visible.
+    north_edge_corners: tuple[str, ...]
+    south_edge_corners: tuple[str, ...]
+
+    # Corner tiles of the West and East edges, South of a room.
+    # Bit 0 = The room is visible. Bit 1 = The room to the South is visible.
+    west_edge_corners: tuple[str, ...]
+    east_edge_corners: tuple[str, ...]
+
+    # Every tile, indexed by tile code. See GRID_TILE_ROOM and the other tile codes.
+    glyphs: tuple[str, ...]
+
+
+def _create_grid_dungeon_tiles(character_set: DungeonDrawingCharacterSet) -> GridDungeonTiles:
+    ''' Returns the tile lookup tables of the character set. '''
+    elements: GridDungeonsElements = GridDungeonsElements(
+        empty_room = 3 * ' ',
+        hidden_room = 3 * ' ',
+        vertical_door = ' ',
+        vertical_wall = character_set.up_and_down,
+        hidden_vertical_door_or_wall = ' ',
+        horizontal_door = 3 * ' ',
+        horizontal_wall = 3 * character_set.left_and_right,
+        hidden_horizontal_door_or_wall = 3 * ' ',
+        hidden_vertical_corner = character_set.up_and_down,
+        hidden_horizontal_corner = character_set.left_and_right,
+        all_hidden_corners = ' ',
+        southeast_corner = character_set.up_and_left,
+        northeast_corner = character_set.down_and_left,
+        northeast_and_southeast_corners = character_set.up_down_and_left,
+        southwest_corner = character_set.up_and_right,
+        southeast_and_southwest_corners = character_set.up_left_and_right,
+        northeast_and_southwest_corners = character_set.up_down_left_and_right,
+        northeast_southeast_and_southwest_corners = character_set.up_down_left_and_right,
+        northwest_corner = character_set.down_and_right,
+        northwest_and_southeast_corners = character_set.up_down_left_and_right,
+        northeast_and_northwest_corners = character_set.down_left_and_right,
+        northeast_northwest_and_southeast_corners = character_set.up_down_left_and_right,
+        northwest_and_southwest_corners = character_set.up_down_and_right,
+        northwest_southeast_and_southwest_corners = character_set.up_down_left_and_right,
+        northeast_northwest_and_southwest_corners = character_set.up_down_left_and_right,
+        all_corners = character_set.up_down_left_and_right,
+    )
+
+    def wall_tiles(hidden_wall: str, wall: str, door: str) -> tuple[str, ...]:
+        ''' Returns the tiles of a wall, which is shown if either room beside it is visible. '''
+        return tuple(
+            (door if index & 4 else wall) if index & 3 else hidden_wall for index in range(8)
+        )
+
+    def edge_corner_tiles(hidden_corner: str, corner: str) -> tuple[str, ...]:
+        ''' Returns the tiles of an edge corner, shown if either room beside it is visible. '''
+        return (hidden_corner, corner, corner, corner)
+
+    rooms: tuple[str, ...] = (elements.hidden_room, elements.empty_room)
+    east_walls: tuple[str, ...] = wall_tiles(
+        elements.hidden_vertical_door_or_wall, elements.vertical_wall, elements.vertical_door
+    )
+    south_walls: tuple[str, ...] = wall_tiles(
+        elements.hidden_horizontal_door_or_wall, elements.horizontal_wall, elements.horizontal_door
+    )
+    south_east_corners: tuple[str, ...] = (
+        elements.all_hidden_corners,
+        elements.southeast_corner,
+        elements.northeast_corner,
+        elements.northeast_and_southeast_corners,
+        elements.southwest_corner,
+        elements.southeast_and_southwest_corners,
+        elements.northeast_and_southwest_corners,
+        elements.northeast_southeast_and_southwest_corners,
+        elements.northwest_corner,
+        elements.northwest_and_southeast_corners,
+        elements.northeast_and_northwest_corners,
+        elements.northeast_northwest_and_southeast_corners,
+        elements.northwest_and_southwest_corners,
+        elements.northwest_southeast_and_southwest_corners,
+        elements.northeast_northwest_and_southwest_corners,
+        elements.all_corners,
+    )
+    north_edge_corners: tuple[str, ...] = edge_corner_tiles(
+        elements.hidden_horizontal_corner, elements.northeast_and_northwest_corners
+    )
+    south_edge_corners: tuple[str, ...] = edge_corner_tiles(
+        elements.hidden_horizontal_corner, elements.southeast_and_southwest_corners
+    )
+    west_edge_corners: tuple[str, ...] = edge_corner_tiles(
+        elements.hidden_vertical_corner, elements.northwest_and_southwest_corners
+    )
+    east_edge_corners: tuple[str, ...] = edge_corner_tiles(
+        elements.hidden_vertical_corner, elements.northeast_and_southeast_corners
+    )
+
+    return GridDungeonTiles(
+        elements = elements,
+        rooms = rooms,
+        east_walls = east_walls,
+        south_walls = south_walls,
+        south_east_corners = south_east_corners,
+        north_edge_corners = north_edge_corners,
+        south_edge_corners = south_edge_corners,
+        west_edge_corners = west_edge_corners,
+        east_edge_corners = east_edge_corners,
+        # In the order of the tile codes.
+        glyphs = (
+            rooms + east_walls + south_walls + south_east_corners +
+            north_edge_corners + south_edge_corners + west_edge_corners + east_edge_corners + (
+                elements.vertical_wall,
+                elements.horizontal_wall,
+                elements.northwest_corner,
+                elements.northeast_corner,
+                elements.southwest_corner,
+                elements.southeast_corner,
+                '\n',
+            )
+        ),
+    )
+
+
+# Tile lookup tables, keyed by character set. See grid_dungeon_tiles().
+GRID_DUNGEON_TILES: dict[DungeonDrawingCharacterSet, GridDungeonTiles] = {}
+
+
+def grid_dungeon_tiles(character_set: DungeonDrawingCharacterSet) -> GridDungeonTiles:
+    ''' Returns the shared tile lookup tables of the character set, computed the first time. '''
+    tiles: Optional[GridDungeonTiles] = GRID_DUNGEON_TILES.get(character_set)
+    if tiles is None:
+        tiles = _create_grid_dungeon_tiles(character_set)
+        GRID_DUNGEON_TILES[character_set] = tiles
+    return tiles
+
+
+# Tables of the offsets to the rooms through the doors, indexed by a room's door mask,
+# keyed by dungeon width. See grid_door_mask_room_offsets().
+GRID_DOOR_MASK_ROOM_OFFSETS: dict[int, tuple[tuple[int, ...], ...]] = {}
+
+
+def grid_door_mask_room_offsets(dungeon_width: int) -> tuple[tuple[int, ...], ...]:
+    '''
+    Returns the shared table of the offsets to the rooms through the doors, for the dungeon width.
+    The table is indexed by a room's door mask, and computed the first time.
+    '''
+    offsets: Optional[tuple[tuple[int, ...], ...]] = GRID_DOOR_MASK_ROOM_OFFSETS.get(dungeon_width)
+    if offsets is None:
+        direction_offsets: dict[GridDirection, int] = {
+            GridDirection.NORTH: -dungeon_width,
+            GridDirection.SOUTH: dungeon_width,
+            GridDirection.EAST: 1,
+            GridDirection.WEST: -1,
+        }
+        offsets = tuple(
+            tuple(direction_offsets[grid_direction] for grid_direction in grid_directions)
+            for grid_directions in GRID_DOOR_MASK_DIRECTIONS
+        )
+        GRID_DOOR_MASK_ROOM_OFFSETS[dungeon_width] = offsets
+    return offsets
+
+
+def tile_code_row(base_code: int, *weighted_bits: tuple[int, bytes]) -> bytes:
+    '''
+    Returns a row of tile codes: the base code, plus the sum of the weighted rows of bits.
+    e.g. tile_code_row(GRID_TILE_ROOM, (1, visible)) returns the room codes of a row of rooms.
+    The rows are summed as big integers with one byte per digit, so a whole row is summed at once.
+    No code reaches 256, so no digit carries into the next.
+    '''
+    length: int = len(weighted_bits[0][1])
+    codes: int = int.from_bytes(bytes((base_code,)) * length, 'big')
+    for weight, bits in weighted_bits:
+        codes += weight * int.from_bytes(bits, 'big')
+    return codes.to_bytes(length, 'big')
+
+
+def tile_code_line(west_edge: int, tiles: bytes, tiles_between: bytes, east_edge: int) -> bytes:
+    '''
+    Returns the tile codes of a line of the frame, ending with a line break.
+    Each of the tiles, one per room, is followed by one of the tiles between them,
+    except for the last, which is followed by the East edge.
+    '''
+    line: bytearray = bytearray(2 * len(tiles) + 2)
+    line[0] = west_edge
+    line[1:-2:2] = tiles
+    line[2:-3:2] = tiles_between
+    line[-2] = east_edge
+    line[-1] = GRID_TILE_LINE_BREAK
+    return bytes(line)
+
+
+# Carves a maze's doors into the door masks of a dungeon's rooms, which start with no doors.
+# Every room must be reachable from every other room.
+# Called like so:
+#
+# maze_generator(rooms, dungeon_width, dungeon_height, rng)
+MazeGenerator = Callable[[bytearray, int, int, Random], None]
+
+
+def carve_recursive_backtracker(
+    rooms: bytearray, dungeon_width: int, dungeon_height: int, rng: Random
+) -> None:
+    '''
+    Carve out the internal passages of the dungeon, starting in the center of the dungeon.
+    This is a recursive backtracker that keeps its path on an explicit stack,
+    so the size of the dungeon is not limited by the interpreter's recursion limit.
+    The random choices are made exactly as the recursive version made them,
+    so a given random state produces the same dungeon layout.
+    Its mazes have long, winding corridors, and few dead ends.
+    '''
+    choice = rng.choice
+    number_of_rooms: int = dungeon_width * dungeon_height
+    max_x: int = dungeon_width - 1
+    first_room_of_last_row: int = number_of_rooms - dungeon_width
+
+    # The offsets of the adjacent rooms, indexed by direction.
+    room_offsets: list[int] = [-dungeon_width, dungeon_width, 1, -1]
+
+    # Rooms that have been reached by the carver.
+    mapped: bytearray = bytearray(number_of_rooms)
+
+    room: int = number_of_rooms // 2
+    mapped[room] = True
+    path: list[int] = [room]
+    while path:
+        room = path[-1]
+
+        # Which adjacent rooms are unmapped?
+        # This runs several times per room, so the edge checks are inlined.
+        x: int = room % dungeon_width
+        unmapped_directions: list[GridDirection] = []
+        if room >= dungeon_width and not mapped[room - dungeon_width]:
+            unmapped_directions.append(GridDirection.NORTH)
+        if room < first_room_of_last_row and not mapped[room + dungeon_width]:
+            unmapped_directions.append(GridDirection.SOUTH)
+        if x < max_x and not mapped[room + 1]:
+            unmapped_directions.append(GridDirection.EAST)
+        if x > 0 and not mapped[room - 1]:
+            unmapped_directions.append(GridDirection.WEST)
+
+        # If there are no unmapped adjacent rooms, then backtrack.
+        if not unmapped_directions:
+            path.pop()
+            continue
+
+        # Carve a door into a random unmapped adjacent room, and continue from there.
+        unmapped_direction: GridDirection = choice(unmapped_directions)
+        next_room: int = room + room_offsets[unmapped_direction]
+        rooms[room] |= GRID_DIRECTION_DOOR[unmapped_direction]
+        rooms[next_room] |= GRID_DIRECTION_DOOR[GRID_DIRECTION_OPPOSITE[unmapped_direction]]
+        mapped[next_room] = True
+        path.append(next_room)
+
+
+class GridVisibleRooms(Set):
+    '''
+    The rooms visible from a room in a grid dungeon.
+    Only the extents of the visible corridors are stored, so creation and membership tests are O(1).
+    '''
+
+
+    def __init__(
+        self, room: int, dungeon_width: int, north: int, south: int, east: int, west: int
+    ):
+        self.room: int = room
+        self.dungeon_width: int = dungeon_width
+        self.north: int = north  # Number of rooms visible to the North.
+        self.south: int = south  # Number of rooms visible to the South.
+        self.east: int = east    # Number of rooms visible to the East.
+        self.west: int = west    # Number of rooms visible to the West.
+
+
+    def __contains__(self, room: int) -> bool:
+        offset: int = room - self.room
+
+        # Is the room in the visible part of this room's row?
+        if -self.west <= offset <= self.east:
+            return True
+
+        # Is the room in the visible part of this room's column?
+        if offset % self.dungeon_width:
+            return False
+        return -self.north <= offset // self.dungeon_width <= self.south
+
+
+    def __iter__(self) -> Iterator[int]:
+        ''' Iterates over this room, then the rooms to the North, South, East and West. '''
+        yield self.room
+        yield from range(
+            self.room - self.dungeon_width,
+            self.room - self.dungeon_width * (self.north + 1),
+            -self.dungeon_width
+        )
+        yield from range(
+            self.room + self.dungeon_width,
+            self.room + self.dungeon_width * (self.south + 1),
+            self.dungeon_width
+        )
+        yield from range(self.room + 1, self.room + self.east + 1)
+        yield from range(self.room - 1, self.room - self.west - 1, -1)
+
+
+    def __len__(self) -> int:
+        return 1 + self.north + self.south + self.east + self.west
+
 
 class GridDungeon(Dungeon):
     ''' Grid dungeon mixin. '''
@@ -94,10 +493,22 @@ class GridDungeon(Dungeon):
         dungeon_width: int,
         dungeon_height: int,
         player_room: int,
+        ansi_terminal: bool = False,
+        rng: Optional[Random] = None,
+        rooms: Optional[bytearray] = None,
+        corridor_lengths: Optional[list[array]] = None,
+        output: Optional[OutputSink] = None,
+        maze_generator: MazeGenerator = carve_recursive_backtracker,
     ):
+        '''
+        If rooms are given, one door mask per room, the dungeon is made of them instead of carved.
+        If their line of sight index is given too, it is used instead of being indexed again.
+        Otherwise, the dungeon is carved by the maze generator. See components.maze_generators.
+        '''
         super().__init__(
             number_of_rooms = dungeon_width * dungeon_height,
-            player_room = player_room
+            player_room = player_room,
+            output = output,
         )
         self.character_set: DungeonDrawingCharacterSet = character_set
         self.dungeon_width: int = dungeon_width
@@ -106,79 +517,55 @@ class GridDungeon(Dungeon):
         self.max_x: int = self.dungeon_width - 1
         self.max_y: int = self.dungeon_height - 1
 
-        self.dungeon_elements: GridDungeonsElements = GridDungeonsElements(
-            empty_room = 3 * ' ',
-            hidden_room = 3 * ' ',
-            vertical_door = ' ',
-            vertical_wall = self.character_set.up_and_down,
-            hidden_vertical_door_or_wall = ' ',
-            horizontal_door = 3 * ' ',
-            horizontal_wall = 3 * self.character_set.left_and_right,
-            hidden_horizontal_door_or_wall = 3 * ' ',
-            hidden_vertical_corner = self.character_set.up_and_down,
-            hidden_horizontal_corner = self.character_set.left_and_right,
-            all_hidden_corners = ' ',
-            southeast_corner = self.character_set.up_and_left,
-            northeast_corner = self.character_set.down_and_left,
-            northeast_and_southeast_corners = self.character_set.up_down_and_left,
-            southwest_corner = self.character_set.up_and_right,
-            southeast_and_southwest_corners = self.character_set.up_left_and_right,
-            northeast_and_southwest_corners = self.character_set.up_down_left_and_right,
-            northeast_southeast_and_southwest_corners = self.character_set.up_down_left_and_right,
-            northwest_corner = self.character_set.down_and_right,
-            northwest_and_southeast_corners = self.character_set.up_down_left_and_right,
-            northeast_and_northwest_corners = self.character_set.down_left_and_right,
-            northeast_northwest_and_southeast_corners = self.character_set.up_down_left_and_right,
-            northwest_and_southwest_corners = self.character_set.up_down_and_right,
-            northwest_southeast_and_southwest_corners = self.character_set.up_down_left_and_right,
-            northeast_northwest_and_southwest_corners = self.character_set.up_down_left_and_right,
-            all_corners = self.character_set.up_down_left_and_right,
+        # The random number generator used to create the dungeon, and the maze generator.
+        self.rng: Random = rng if rng else Random()
+        self.maze_generator: MazeGenerator = maze_generator
+
+        # The tiles are shared by all the dungeons drawn with the same character set.
+        self.tiles: GridDungeonTiles = grid_dungeon_tiles(self.character_set)
+
+        # If drawing on an ANSI terminal, only the changes between frames are drawn.
+        self.ansi_frame_renderer: Optional[AnsiFrameRenderer] = (
+            AnsiFrameRenderer() if ansi_terminal else None
         )
 
-        # Table of sungeon room internal Southeast corner characters.
-        # The index to this table is composed as follows:
-        # Bit 0 = The current room is visible.
-        # Bit 1 = The room to the South is visible.
-        # Bit 2 = The room to the East is visible.
-        # Bit 3 = The room to the Southeast is visible.
-        self.south_east_corners: list[str] = [
-            self.dungeon_elements.all_hidden_corners,
-            self.dungeon_elements.southeast_corner,
-            self.dungeon_elements.northeast_corner,
-            self.dungeon_elements.northeast_and_southeast_corners,
-            self.dungeon_elements.southwest_corner,
-            self.dungeon_elements.southeast_and_southwest_corners,
-            self.dungeon_elements.northeast_and_southwest_corners,
-            self.dungeon_elements.northeast_southeast_and_southwest_corners,
-            self.dungeon_elements.northwest_corner,
-            self.dungeon_elements.northwest_and_southeast_corners,
-            self.dungeon_elements.northeast_and_northwest_corners,
-            self.dungeon_elements.northeast_northwest_and_southeast_corners,
-            self.dungeon_elements.northwest_and_southwest_corners,
-            self.dungeon_elements.northwest_southeast_and_southwest_corners,
-            self.dungeon_elements.northeast_northwest_and_southwest_corners,
-            self.dungeon_elements.all_corners,
-        ]
+        self.room_contents_function: RoomContentsFunction = self.room_contents
+        # One door mask per room. See GRID_DIRECTION_DOOR.
+        self.rooms: bytearray = bytearray()
+        if rooms is None:
+            self._create_dungeon()
+        else:
+            self.rooms = rooms
+
+        # Table of the offsets to the rooms through the doors, indexed by a room's door mask.
+        # The table is shared by all the dungeons of the same width.
+        self.door_mask_room_offsets: tuple[tuple[int, ...], ...] = grid_door_mask_room_offsets(
+            self.dungeon_width
+        )
 
-        self.room_contents_function: RoomContentFunction = self.room_contents
-        self.rooms: list[int] = []
-        self._create_dungeon()
+        # Line of sight index.
+        # The number of rooms visible from each room in each direction, indexed by direction.
+        self.corridor_lengths: list[array] = []
+        if rooms is None or corridor_lengths is None:
+            self._index_corridors()
+        else:
+            self.corridor_lengths = corridor_lengths
 
 
     def description(self) -> None:
         ''' Describe the scenario. '''
-        print('- You are in a dungeon.')
+        self.output.write_line('- You are in a dungeon.')
 
 
     def display(self) -> None:
         ''' Display the game. '''
-        self._print_dungeon(self._rooms_visible_from_room(self.player_room))
+        self._print_dungeon(self.rooms_visible_from_room(self.player_room))
 
 
     def commands(self) -> list[Command]:
         ''' Return a list of additional commands. '''
         commands: list[Command] = []
-        directions: list[GridDirection] = self._directions_with_doors(self.player_room)
+        directions: tuple[GridDirection, ...] = self._directions_with_doors(self.player_room)
         if GridDirection.NORTH in directions:
             commands.append(self._create__command(GridDirection.NORTH, self._move_north_command))
         if GridDirection.SOUTH in directions:
@@ -196,14 +583,19 @@ class GridDungeon(Dungeon):
         This function is called once at the end of the game.
         '''
         self._print_dungeon(range(self.number_of_rooms))
+        if self.ansi_frame_renderer:
+            self.output.write(self.ansi_frame_renderer.reset())
+            self.output.write_line()
+
+
+    def adjacent_rooms(self, room: int) -> Sequence[int]:
+        ''' Returns the rooms that are connected to the given room by its doors. '''
+        return [room + offset for offset in self.door_mask_room_offsets[self.rooms[room]]]
 
 
     def directions_with_doors(self, room: int) -> list[Direction]:
         ''' Returns a list of directions that contain doors in the given room. '''
-        return [
-            Direction(id = grid_direction, name = GRID_DIRECTION_NAME[grid_direction])
-            for grid_direction in self._directions_with_doors(room)
-        ]
+        return list(GRID_DOOR_MASK_DUNGEON_DIRECTIONS[self.rooms[room]])
 
 
     def navigation_info(self, direction: Direction, room: int) -> Optional[NavigationInfo]:
@@ -227,10 +619,7 @@ class GridDungeon(Dungeon):
         '''
         for door_direction in self._directions_with_doors(start_room):
             if destination_room in self._rooms_visible_in_direction(door_direction, start_room):
-                return self.navigation_info(
-                    Direction(id = door_direction, name = GRID_DIRECTION_NAME[door_direction]),
-                    start_room
-                )
+                return self.navigation_info(GRID_DUNGEON_DIRECTION[door_direction], start_room)
         return None
 
 
@@ -241,38 +630,62 @@ class GridDungeon(Dungeon):
         return None
 
 
-    def rooms_visible_from_room(self, room: int) -> list[int]:
-        ''' Returns a list of all the rooms that are visible from the given room. '''
+    def rooms_visible_from_room(self, room: int) -> VisibleRooms:
+        ''' Returns the set of all the rooms that are visible from the given room. '''
         return self._rooms_visible_from_room(room)
 
 
-    def rooms_visible_in_direction(self, direction: Direction, room: int) -> list[int]:
+    def is_room_visible_from_room(self, room: int, other_room: int) -> bool:
+        '''
+        Returns True if the other room is visible from the given room.
+        Only the line of sight index of the corridor towards the other room is read,
+        so nothing is allocated.
         '''
-        Returns a list of the rooms that are visible from the given room in the given direction.
+        offset: int = other_room - room
+        dungeon_width: int = self.dungeon_width
+
+        # Is the other room in this room's column?
+        if not offset % dungeon_width:
+            if offset < 0:
+                return -offset // dungeon_width <= self.corridor_lengths[GridDirection.NORTH][room]
+            return offset // dungeon_width <= self.corridor_lengths[GridDirection.SOUTH][room]
+
+        # Is the other room in this room's row?
+        if room // dungeon_width != other_room // dungeon_width:
+            return False
+        if offset < 0:
+            return -offset <= self.corridor_lengths[GridDirection.WEST][room]
+        return offset <= self.corridor_lengths[GridDirection.EAST][room]
+
+
+    def rooms_visible_in_direction(self, direction: Direction, room: int) -> Sequence[int]:
+        '''
+        Returns a sequence of the rooms that are visible from the given room in the given direction.
         '''
         return self._rooms_visible_in_direction(direction.id, room)
 
 
-    def set_room_contents_function(self, function: RoomContentFunction) -> None:
-        ''' Sets the function to call to print a rooms contents. '''
+    def set_room_contents_function(self, function: RoomContentsFunction) -> None:
+        ''' Sets the function to call, once per frame, to get the contents of the rooms. '''
         self.room_contents_function = function
 
 
-    room_contents: RoomContentFunction
-    def room_contents(self, room: int) -> Optional[str]:
-        ''' Returns the given room's contents, as a single character string. '''
-        return 'P' if room == self.player_room else None
+    room_contents: RoomContentsFunction
+    def room_contents(self) -> RoomContents:
+        ''' Returns the contents of the rooms. '''
+        room_contents: RoomContents = {}
+        self.add_room_contents(room_contents)
+        return room_contents
 
 
-    def _directions_with_doors(self, room: int) -> list[GridDirection]:
-        ''' Returns a list of directions that contain doors in the given room. '''
-        door_directions: list[GridDirection] = []
-        for grid_direction in [
-            GridDirection.NORTH, GridDirection.SOUTH, GridDirection.EAST, GridDirection.WEST,
-        ]:
-            if self.rooms[room]['doors'][grid_direction]:
-                door_directions.append(grid_direction)
-        return door_directions
+    def add_room_contents(self, room_contents: RoomContents) -> None:
+        ''' Adds the player to the room contents, unless the room already has contents. '''
+        room_contents.setdefault(self.player_room, 'P')
+
+
+    def _directions_with_doors(self, room: int) -> tuple[GridDirection, ...]:
+        ''' Returns the directions that contain doors in the given room. '''
+        return GRID_DOOR_MASK_DIRECTIONS[self.rooms[room]]
 
 
     def _room_in_direction(self, grid_direction: GridDirection, room: int) -> int:
@@ -291,23 +704,25 @@ class GridDungeon(Dungeon):
         return next_room
 
 
-    def _rooms_visible_in_direction(self, grid_direction: GridDirection, room: int) -> list[int]:
+    def _rooms_visible_in_direction(self, grid_direction: GridDirection, room: int) -> range:
         '''
-        Returns a list of the rooms that are visible from the given room in the given direction.
+        Returns a range of the rooms that are visible from the given room in the given direction.
         '''
-        visible_rooms: list[int] = []
-        while self.rooms[room]['doors'][grid_direction]:
-            room = self._room_in_direction(grid_direction, room)
-            visible_rooms.append(room)
-        return visible_rooms
-
-
-    def _rooms_visible_from_room(self, room: int) -> list[int]:
-        ''' Returns a list of all the rooms that are visible from the given room. '''
-        visible_rooms: list[int] = [room]
-        for door_direction in self._directions_with_doors(room):
-            visible_rooms.extend(self._rooms_visible_in_direction(door_direction, room))
-        return visible_rooms
+        step: int = self._room_in_direction(grid_direction, 0)  # Room offset of one step.
+        corridor_length: int = self.corridor_lengths[grid_direction][room]
+        return range(room + step, room + step * (corridor_length + 1), step)
+
+
+    def _rooms_visible_from_room(self, room: int) -> GridVisibleRooms:
+        ''' Returns the set of all the rooms that are visible from the given room. '''
+        return GridVisibleRooms(
+            room = room,
+            dungeon_width = self.dungeon_width,
+            north = self.corridor_lengths[GridDirection.NORTH][room],
+            south = self.corridor_lengths[GridDirection.SOUTH][room],
+            east = self.corridor_lengths[GridDirection.EAST][room],
+            west = self.corridor_lengths[GridDirection.WEST][room],
+        )
 
 
     def _create__command(self, grid_direction: GridDirection, function: CommandFunction) -> Command:
@@ -321,7 +736,7 @@ class GridDungeon(Dungeon):
 
     def _move(self, grid_direction: GridDirection):
         ''' The player moves. '''
-        print(f'You move {GRID_DIRECTION_NAME[grid_direction]}.')
+        self.output.write_line(f'You move {GRID_DIRECTION_NAME[grid_direction]}.')
         self.player_room = self._room_in_direction(grid_direction, self.player_room)
         return True
 
@@ -375,246 +790,175 @@ class GridDungeon(Dungeon):
         )
 
 
-    def _create_door_in_direction(self, grid_direction: GridDirection, room: int) -> None:
+    def _index_corridors(self) -> None:
         '''
-        Create a door in the given direction of the given room.
-        This will not create a door through the edge of the dungeon.
+        Index the lines of sight through the dungeon.
+        For each room, count the rooms visible through the doors in each direction.
         '''
-        if not self._is_room_on_edge(grid_direction, room):
-            self.rooms[room]['doors'][grid_direction] = True
-            next_room: int = self._room_in_direction(grid_direction, room)
-            self.rooms[next_room]['doors'][GRID_DIRECTION_OPPOSITE[grid_direction]] = True
-
-
-    def _is_room_in_direction_mapped(self, grid_direction: GridDirection, room: int) -> bool:
-        '''
-        Returns True if the adjacent room in the given direction from the given room is mapped.
-        Returns True if the given room is on the given edge of the dungeon.
-        '''
-        return (
-            self._is_room_on_edge(grid_direction, room) or
-            self.rooms[self._room_in_direction(grid_direction, room)]['mapped']
-        )
-
-
-    def _unmapped_directions(self, room: int) -> list[GridDirection]:
-        ''' Returns a list of directions to unmapped rooms from the given room. '''
-        unmapped_directions: list[GridDirection] = []
-        for grid_direction in [
-            GridDirection.NORTH, GridDirection.SOUTH, GridDirection.EAST, GridDirection.WEST
-        ]:
-            if not self._is_room_in_direction_mapped(grid_direction, room):
-                unmapped_directions.append(grid_direction)
-        return unmapped_directions
-
-
-    def _carve_dungeon(self, room: int) -> None:
-        ''' Carve out the internal passages of the dungeon. '''
-        self.rooms[room]['mapped'] = True
-        unmapped_directions: list[GridDirection] = self._unmapped_directions(room)
-        while unmapped_directions:
-            unmapped_direction: GridDirection = choice(unmapped_directions)
-            self._create_door_in_direction(unmapped_direction, room)
-            self._carve_dungeon(self._room_in_direction(unmapped_direction, room))
-            unmapped_directions = self._unmapped_directions(room)
-
-
-    def _default_room(self) -> dict[dict[GridDirection, bool], bool]:
-        ''' Returns a default room for dungeon creation. '''
-        # Upon creation, rooms have no doors and are unmapped.
-        return {
-            'doors': {
-                GridDirection.NORTH: False,
-                GridDirection.SOUTH: False,
-                GridDirection.EAST: False,
-                GridDirection.WEST: False,
-            },
-            'mapped': False,
-        }
+        rooms: bytearray = self.rooms
+        dungeon_width: int = self.dungeon_width
+        north_door: int = GRID_DIRECTION_DOOR[GridDirection.NORTH]
+        south_door: int = GRID_DIRECTION_DOOR[GridDirection.SOUTH]
+        east_door: int = GRID_DIRECTION_DOOR[GridDirection.EAST]
+        west_door: int = GRID_DIRECTION_DOOR[GridDirection.WEST]
+
+        self.corridor_lengths = [array('I', bytes(4 * self.number_of_rooms)) for _ in GridDirection]
+        north: array = self.corridor_lengths[GridDirection.NORTH]
+        south: array = self.corridor_lengths[GridDirection.SOUTH]
+        east: array = self.corridor_lengths[GridDirection.EAST]
+        west: array = self.corridor_lengths[GridDirection.WEST]
+
+        # North and West corridor lengths build on the rooms before them.
+        for room in range(self.number_of_rooms):
+            doors: int = rooms[room]
+            if doors & north_door:
+                north[room] = north[room - dungeon_width] + 1
+            if doors & west_door:
+                west[room] = west[room - 1] + 1
+
+        # South and East corridor lengths build on the rooms after them.
+        for room in range(self.number_of_rooms - 1, -1, -1):
+            doors = rooms[room]
+            if doors & south_door:
+                south[room] = south[room + dungeon_width] + 1
+            if doors & east_door:
+                east[room] = east[room + 1] + 1
 
 
     def _create_dungeon(self) -> None:
         ''' Create the maze. '''
         # Initially, all rooms in the dungeon will have no doors.
-        # _carve_dungeon() will create the doors.
-        for _ in range(self.number_of_rooms):
-            self.rooms.append(self._default_room())
-        self._carve_dungeon(self.number_of_rooms // 2)  # Start in the center of the dungeon.
-
-
-    def _print_dungeon_north_edge(self, visible_rooms: list[int]) -> None:
-        '''
-        Print the North edge of the dungeon.
-        Hide the corner details of rooms that are not visible.
-        '''
-        # Print the North-West corner.
-        print(self.dungeon_elements.northwest_corner, end='')
-
-        # For all but the most Easterly room ...
-        for x in range(self.max_x):
-
-            # Print the North wall.
-            print(self.dungeon_elements.horizontal_wall, end='')
-
-            # Print the North-East corner.
-            is_room_visible: bool = self._room_at_x_y(x, 0) in visible_rooms
-            is_room_to_the_east_visible: bool = self._room_at_x_y(x + 1, 0) in visible_rooms
-            if is_room_visible or is_room_to_the_east_visible:
-                print(self.dungeon_elements.northeast_and_northwest_corners, end='')
-            else:
-                print(self.dungeon_elements.hidden_horizontal_corner, end='')
-
-        # For the most Easterly room, print the North wall and the North-East corner.
-        print(self.dungeon_elements.horizontal_wall, end='')
-        print(self.dungeon_elements.northeast_corner)
-
-
-    def _print_room_contents(self, room: int, is_room_visible: bool) -> None:
-        '''
-        Print the contents of the given room.
-        Hide the contents of rooms that are not visible.
-        '''
-        if is_room_visible:
-            contents = self.room_contents_function(room)
-            print(f' {contents if contents else " "} ', end = '')
-        else:
-            print(self.dungeon_elements.hidden_room, end='')
-
-
-    def _print_row_contents_and_vertical_walls(self, y: int, visible_rooms: list[int]) -> None:
+        # The maze generator will create the doors.
+        self.rooms = bytearray(self.number_of_rooms)
+        self.maze_generator(self.rooms, self.dungeon_width, self.dungeon_height, self.rng)
+
+
+    def _room_visibility(self, visible_rooms: Container[int]) -> bytearray:
+        ''' Returns the visibility of every room, one byte per room: 1 if it is visible, or 0. '''
+        if isinstance(visible_rooms, GridVisibleRooms):
+            # Mark the visible parts of the room's row and column.
+            visibility: bytearray = bytearray(self.number_of_rooms)
+            room: int = visible_rooms.room
+            visibility[room - visible_rooms.west:room + visible_rooms.east + 1] = bytes(
+                (1,)
+            ) * (visible_rooms.west + visible_rooms.east + 1)
+            visibility[
+                room - visible_rooms.north * self.dungeon_width:
+                room + visible_rooms.south * self.dungeon_width + 1:
+                self.dungeon_width
+            ] = bytes((1,)) * (visible_rooms.north + visible_rooms.south + 1)
+            return visibility
+        if visible_rooms == range(self.number_of_rooms):
+            return bytearray((1,)) * self.number_of_rooms
+        return bytearray(room in visible_rooms for room in range(self.number_of_rooms))
+
+
+    def _tile_codes(self, visibility: bytes) -> bytes:
         '''
-        Print the contents and vertical walls of the rooms in a single row of the dungeon.
-        Hide the room content and wall details of rooms that are not visible.
+        Stage one of drawing the dungeon.
+        Returns the tile code of every tile of the frame, line by line,
+        from the visibility of each room, and its doors. See GRID_TILE_ROOM.
+        Hide the details of rooms that are not visible.
         '''
-        # Print the West edge.
-        print(self.dungeon_elements.vertical_wall, end='')
-
-        # For all but the most Easterly room ...
-        for x in range(self.max_x):
-
-            # Print the room contents.
-            room: int = self._room_at_x_y(x, y)
-            is_room_visible: bool = room in visible_rooms
-            self._print_room_contents(room, is_room_visible)
-
-            # Print the East wall.
-            is_room_to_the_east_visible: bool = self._room_at_x_y(x + 1, y) in visible_rooms
-            if is_room_visible or is_room_to_the_east_visible:
-                if self.rooms[room]['doors'][GridDirection.EAST]:
-                    print(self.dungeon_elements.vertical_door, end='')
-                else:
-                    print(self.dungeon_elements.vertical_wall, end='')
-            else:
-                print(self.dungeon_elements.hidden_vertical_door_or_wall, end='')
-
-        # For the most Easterly room, print the room contents and the East edge.
-        room = self._room_at_x_y(self.max_x, y)
-        is_room_visible = room in visible_rooms
-        self._print_room_contents(room, is_room_visible)
-        print(self.dungeon_elements.vertical_wall)
-
-
-    def _print_room_south_wall(
-        self, room, is_room_visible: bool, is_room_to_the_south_visible: bool
-    ) -> None:
+        width: int = self.dungeon_width
+        horizontal_edges: bytes = bytes((GRID_TILE_HORIZONTAL_EDGE,)) * width
+        lines: list[bytes] = []
+
+        # The North edge.
+        visible: bytes = visibility[:width]
+        lines.append(tile_code_line(
+            GRID_TILE_NORTHWEST_CORNER,
+            horizontal_edges,
+            tile_code_row(GRID_TILE_NORTH_EDGE_CORNER, (1, visible[:-1]), (2, visible[1:])),
+            GRID_TILE_NORTHEAST_CORNER,
+        ))
+
+        for y in range(self.dungeon_height):
+            row: int = self._room_at_x_y(0, y)
+            rooms: bytes = self.rooms[row:row + width]
+            visible = visibility[row:row + width]
+
+            # The room contents, and the vertical walls.
+            lines.append(tile_code_line(
+                GRID_TILE_VERTICAL_EDGE,
+                tile_code_row(GRID_TILE_ROOM, (1, visible)),
+                tile_code_row(
+                    GRID_TILE_EAST_WALL,
+                    (1, visible[:-1]),
+                    (2, visible[1:]),
+                    (4, rooms[:-1].translate(GRID_EAST_DOOR_BITS)),
+                ),
+                GRID_TILE_VERTICAL_EDGE,
+            ))
+            if y == self.max_y:
+                break
+
+            # The horizontal walls and the corners, between this row and the row to the South.
+            visible_to_the_south: bytes = visibility[row + width:row + 2 * width]
+            lines.append(tile_code_line(
+                GRID_TILE_WEST_EDGE_CORNER + visible[0] + 2 * visible_to_the_south[0],
+                tile_code_row(
+                    GRID_TILE_SOUTH_WALL,
+                    (1, visible),
+                    (2, visible_to_the_south),
+                    (4, rooms.translate(GRID_SOUTH_DOOR_BITS)),
+                ),
+                tile_code_row(
+                    GRID_TILE_SOUTH_EAST_CORNER,
+                    (1, visible[:-1]),
+                    (2, visible_to_the_south[:-1]),
+                    (4, visible[1:]),
+                    (8, visible_to_the_south[1:]),
+                ),
+                GRID_TILE_EAST_EDGE_CORNER + visible[-1] + 2 * visible_to_the_south[-1],
+            ))
+
+        # The South edge.
+        lines.append(tile_code_line(
+            GRID_TILE_SOUTHWEST_CORNER,
+            horizontal_edges,
+            tile_code_row(GRID_TILE_SOUTH_EDGE_CORNER, (1, visible[:-1]), (2, visible[1:])),
+            GRID_TILE_SOUTHEAST_CORNER,
+        ))
+        return b''.join(lines)
+
+
+    def _draw_tile_codes(
+        self, tile_codes: bytes, visibility: bytes, room_contents: RoomContents
+    ) -> str:
         '''
-        Print the South wall of the given room.
-        Hide the wall details of rooms that are not visible.
+        Stage two of drawing the dungeon.
+        Returns the frame as a single string, with the tile of each tile code,
+        and the contents of the visible rooms.
         '''
-        if is_room_visible or is_room_to_the_south_visible:
-            if self.rooms[room]['doors'][GridDirection.SOUTH]:
-                print(self.dungeon_elements.horizontal_door, end='')
-            else:
-                print(self.dungeon_elements.horizontal_wall, end='')
-        else:
-            print(self.dungeon_elements.hidden_horizontal_door_or_wall, end='')
-
-
-    def _print_row_horizontal_walls_and_corners(self, y: int, visible_rooms: list[int]) -> None:
-        '''
-        Print the horizontal walls and Southern corners of the rooms in a single row of the dungeon.
-        Hide the wall and corner details of rooms that are not visible.
-        '''
-        # Print the South-West edge corner.
-        is_room_visible: bool = self._room_at_x_y(0, y) in visible_rooms
-        is_room_to_the_south_visible: bool = self._room_at_x_y(0, y + 1) in visible_rooms
-        if is_room_visible or is_room_to_the_south_visible:
-            print(self.dungeon_elements.northwest_and_southwest_corners, end='')
-        else:
-            print(self.dungeon_elements.hidden_vertical_corner, end='')
-
-        # For all but the most Easterly room ...
-        for x in range(self.max_x):
-
-            # Determine the visibility of the room and its South and East neighbors.
-            room: int = self._room_at_x_y(x, y)
-            is_room_visible = room in visible_rooms
-            is_room_to_the_south_visible = self._room_at_x_y(x, y + 1) in visible_rooms
-            is_room_to_the_east_visible: bool = self._room_at_x_y(x + 1, y) in visible_rooms
-            is_room_to_the_south_east_visible: bool = (
-                self._room_at_x_y(x + 1, y + 1) in visible_rooms
-            )
-
-            # Print the South door or wall.
-            self._print_room_south_wall(room, is_room_visible, is_room_to_the_south_visible)
-
-            # Print the South-East corner.
-            corner_index: int = (
-                (1 if is_room_visible else 0) +
-                (2 if is_room_to_the_south_visible else 0) +
-                (4 if is_room_to_the_east_visible else 0) +
-                (8 if is_room_to_the_south_east_visible else 0)
-            )
-            print(self.south_east_corners[corner_index], end='')
-
-        # For the most Easterly room, print the South wall and the South-East corner.
-        room = self._room_at_x_y(self.max_x, y)
-        is_room_visible = room in visible_rooms
-        is_room_to_the_south_visible = self._room_at_x_y(self.max_x, y + 1) in visible_rooms
-        self._print_room_south_wall(room, is_room_visible, is_room_to_the_south_visible)
-        if is_room_visible or is_room_to_the_south_visible:
-            print(self.dungeon_elements.northeast_and_southeast_corners)
-        else:
-            print(self.dungeon_elements.hidden_vertical_corner)
+        frame: list[str] = list(map(self.tiles.glyphs.__getitem__, tile_codes))
+        line_length: int = 2 * self.dungeon_width + 2
+        for room, contents in room_contents.items():
+            if visibility[room]:
+                frame[(2 * self._room_y(room) + 1) * line_length + 2 * self._room_x(room) + 1] = (
+                    f' {contents} '
+                )
+        return ''.join(frame)
 
 
-    def _print_dungeon_south_edge(self, visible_rooms: list[int]) -> None:
+    def _draw_dungeon(self, visible_rooms: Container[int]) -> str:
         '''
-        Print the South edge of the dungeon.
-        Hide the corner details of rooms that are not visible.
+        Draw the dungeon, and return it as a single string.
+        Hide the room details of rooms that are not visible.
+        The tile codes of the whole frame are computed first, and then replaced by their tiles.
         '''
-        # Print the South-West corner.
-        print(self.dungeon_elements.southwest_corner, end='')
-
-        # For all but the most Easterly room ...
-        for x in range(self.max_x):
-
-            # Print the South wall.
-            print(self.dungeon_elements.horizontal_wall, end='')
-
-            # Print the South-East corner.
-            is_room_visible: bool = self._room_at_x_y(x, self.max_y) in visible_rooms
-            is_room_to_the_east_visible: bool = (
-                self._room_at_x_y(x + 1, self.max_y) in visible_rooms
-            )
-            if is_room_visible or is_room_to_the_east_visible:
-                print(self.dungeon_elements.southeast_and_southwest_corners, end='')
-            else:
-                print(self.dungeon_elements.hidden_horizontal_corner, end='')
-
-        # For the most Easterly room, print the South wall and the South-East corner.
-        print(self.dungeon_elements.horizontal_wall, end='')
-        print(self.dungeon_elements.southeast_corner)
+        visibility: bytearray = self._room_visibility(visible_rooms)
+        return self._draw_tile_codes(
+            self._tile_codes(visibility), visibility, self.room_contents_function()
+        )
 
 
-    def _print_dungeon(self, visible_rooms: list[int]) -> None:
+    def _print_dungeon(self, visible_rooms: Container[int]) -> None:
         '''
-        Print the dungeon.
+        Print the dungeon, with a single write to the output sink.
         Hide the room details of rooms that are not visible.
         '''
-        self._print_dungeon_north_edge(visible_rooms)
-        for y in range(self.max_y):
-            self._print_row_contents_and_vertical_walls(y, visible_rooms)
-            self._print_row_horizontal_walls_and_corners(y, visible_rooms)
-        self._print_row_contents_and_vertical_walls(self.max_y, visible_rooms)
-        self._print_dungeon_south_edge(visible_rooms)
+        frame: str = self._draw_dungeon(visible_rooms)
+        if self.ansi_frame_renderer:
+            frame = self.ansi_frame_renderer.render(frame, self.output.terminal_lines())
+        self.output.write(frame)
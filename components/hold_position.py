@@ -3,7 +3,10 @@ Hold position.
 Allows the player to hold position.
 '''
 
+from typing import Optional
+
 from base_classes.scenario import Command, CommandFunction
+from output_sink import OutputSink, StdoutSink
 
 
 class HoldPosition:
@@ -13,6 +16,10 @@ class HoldPosition:
     '''
 
 
+    def __init__(self, output: Optional[OutputSink] = None):
+        self.output: OutputSink = output if output else StdoutSink()
+
+
     def commands(self) -> list[Command]:
         ''' Returns a list of commands available to the player. '''
         return [Command(
@@ -25,5 +32,5 @@ class HoldPosition:
     _hold_position_command: CommandFunction
     def _hold_position_command(self) -> bool:
         ''' The player holds position. '''
-        print('You hold position.')
+        self.output.write_line('You hold position.')
         return True
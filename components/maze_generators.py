@@ -0,0 +1,218 @@
+'''
+Maze generators.
+Alternatives to the recursive backtracker, for carving grid dungeons.
+Each generator carves a perfect maze: there is exactly one path between any two rooms.
+The generators differ in the shape of their mazes, their speed, and the memory they need.
+'''
+
+from collections.abc import Iterator
+from random import Random
+
+from components.grid_dungeon import (
+    GRID_DIRECTION_DOOR, GRID_DIRECTION_OPPOSITE, GridDirection, MazeGenerator,
+    carve_recursive_backtracker,
+)
+
+
+NORTH_DOOR: int = GRID_DIRECTION_DOOR[GridDirection.NORTH]
+SOUTH_DOOR: int = GRID_DIRECTION_DOOR[GridDirection.SOUTH]
+EAST_DOOR: int = GRID_DIRECTION_DOOR[GridDirection.EAST]
+WEST_DOOR: int = GRID_DIRECTION_DOOR[GridDirection.WEST]
+
+
+def carve_kruskal(rooms: bytearray, dungeon_width: int, dungeon_height: int, rng: Random) -> None:
+    '''
+    Carve the dungeon with Kruskal's algorithm.
+    Every internal wall is visited in a random order,
+    and a door is cut through it if the rooms on either side are not yet connected.
+    Connected rooms are tracked with a union-find forest.
+    Its mazes have many short dead ends, and no bias in any direction.
+    '''
+    number_of_rooms: int = dungeon_width * dungeon_height
+    max_x: int = dungeon_width - 1
+
+    # The internal walls, as the room to their West or North, times 2, plus 1 for a South wall.
+    walls: list[int] = [2 * room + 1 for room in range(number_of_rooms - dungeon_width)]
+    walls.extend(2 * room for room in range(number_of_rooms) if room % dungeon_width < max_x)
+    rng.shuffle(walls)
+
+    # Union-find forest. Each room's parent, which is itself for the root of a set of rooms.
+    parents: list[int] = list(range(number_of_rooms))
+
+    doors_needed: int = number_of_rooms - 1
+    for wall in walls:
+        if not doors_needed:
+            break
+        room, is_south_wall = divmod(wall, 2)
+        next_room: int = room + dungeon_width if is_south_wall else room + 1
+
+        # Find the roots of both rooms, halving the paths to them on the way.
+        root: int = room
+        while parents[root] != root:
+            parents[root] = parents[parents[root]]
+            root = parents[root]
+        next_root: int = next_room
+        while parents[next_root] != next_root:
+            parents[next_root] = parents[parents[next_root]]
+            next_root = parents[next_root]
+        if root == next_root:
+            continue
+
+        # Join the sets, and cut the door.
+        parents[next_root] = root
+        if is_south_wall:
+            rooms[room] |= SOUTH_DOOR
+            rooms[next_room] |= NORTH_DOOR
+        else:
+            rooms[room] |= EAST_DOOR
+            rooms[next_room] |= WEST_DOOR
+        doors_needed = doors_needed - 1
+
+
+def carve_wilson(rooms: bytearray, dungeon_width: int, dungeon_height: int, rng: Random) -> None:
+    '''
+    Carve the dungeon with Wilson's algorithm.
+    From each room that is not yet in the maze, a random walk is taken until it reaches the maze.
+    The walk's loops are erased, by remembering only the last direction taken from each room,
+    and its path is carved into the maze.
+    Its mazes are chosen uniformly from all the possible mazes. The first walks are long,
+    as the maze starts as a single room, so it is slower than the other generators.
+    '''
+    choice = rng.choice
+    number_of_rooms: int = dungeon_width * dungeon_height
+    max_x: int = dungeon_width - 1
+    first_room_of_last_row: int = number_of_rooms - dungeon_width
+
+    # The offsets of the adjacent rooms, indexed by direction.
+    room_offsets: list[int] = [-dungeon_width, dungeon_width, 1, -1]
+
+    # Rooms that are in the maze.
+    in_maze: bytearray = bytearray(number_of_rooms)
+    in_maze[rng.randrange(number_of_rooms)] = True
+
+    # The direction last taken from each room by the current walk.
+    walk_directions: bytearray = bytearray(number_of_rooms)
+
+    for start_room in range(number_of_rooms):
+        if in_maze[start_room]:
+            continue
+
+        # Walk randomly until the maze is reached.
+        room: int = start_room
+        while not in_maze[room]:
+            x: int = room % dungeon_width
+            directions: list[GridDirection] = []
+            if room >= dungeon_width:
+                directions.append(GridDirection.NORTH)
+            if room < first_room_of_last_row:
+                directions.append(GridDirection.SOUTH)
+            if x < max_x:
+                directions.append(GridDirection.EAST)
+            if x > 0:
+                directions.append(GridDirection.WEST)
+            direction: GridDirection = choice(directions)
+            walk_directions[room] = direction
+            room = room + room_offsets[direction]
+
+        # Carve the loop erased walk into the maze.
+        room = start_room
+        while not in_maze[room]:
+            walk_direction: int = walk_directions[room]
+            next_room: int = room + room_offsets[walk_direction]
+            rooms[room] |= GRID_DIRECTION_DOOR[walk_direction]
+            rooms[next_room] |= GRID_DIRECTION_DOOR[GRID_DIRECTION_OPPOSITE[walk_direction]]
+            in_maze[room] = True
+            room = next_room
+
+
+def eller_rows(dungeon_width: int, dungeon_height: int, rng: Random) -> Iterator[bytearray]:
+    '''
+    Generates a maze with Eller's algorithm, one row at a time, from North to South.
+    Yields the door masks of each row of rooms, as soon as the row is complete.
+    Only the sets of the current row's rooms are kept, so memory is proportional to the width,
+    not the height, and mazes of any height can be streamed, such as to a file.
+    Its mazes have mostly short corridors, and no bias in any direction.
+    '''
+    getrandbits = rng.getrandbits
+
+    # The set of each room in the row. Rooms in the same set are connected,
+    # through this row or the rows before it.
+    room_sets: list[int] = list(range(dungeon_width))
+
+    # The rooms in the row of each set, keyed by set.
+    set_rooms: dict[int, list[int]] = {x: [x] for x in range(dungeon_width)}
+    next_set: int = dungeon_width
+
+    row: bytearray = bytearray(dungeon_width)
+    for y in range(dungeon_height):
+        is_last_row: bool = y == dungeon_height - 1
+
+        # Randomly join adjacent rooms of different sets.
+        # All of them are joined in the last row, so the whole maze is connected.
+        for x in range(dungeon_width - 1):
+            room_set: int = room_sets[x]
+            east_set: int = room_sets[x + 1]
+            if room_set == east_set or not (is_last_row or getrandbits(1)):
+                continue
+            row[x] |= EAST_DOOR
+            row[x + 1] |= WEST_DOOR
+
+            # The smaller set is merged into the larger.
+            if len(set_rooms[room_set]) < len(set_rooms[east_set]):
+                room_set, east_set = east_set, room_set
+            merged_rooms: list[int] = set_rooms.pop(east_set)
+            for merged_x in merged_rooms:
+                room_sets[merged_x] = room_set
+            set_rooms[room_set].extend(merged_rooms)
+
+        if is_last_row:
+            yield row
+            return
+
+        # Cut at least one door South from each set, so that every set continues.
+        next_row: bytearray = bytearray(dungeon_width)
+        next_set_rooms: dict[int, list[int]] = {}
+        for room_set, set_xs in set_rooms.items():
+            south_xs: list[int] = [x for x in set_xs if getrandbits(1)]
+            if not south_xs:
+                south_xs = [set_xs[rng.randrange(len(set_xs))]]
+            for x in south_xs:
+                row[x] |= SOUTH_DOOR
+                next_row[x] = NORTH_DOOR
+            next_set_rooms[room_set] = south_xs
+        yield row
+
+        # The rooms in the next row without a North door start sets of their own.
+        for x in range(dungeon_width):
+            if not next_row[x]:
+                room_sets[x] = next_set
+                next_set_rooms[next_set] = [x]
+                next_set = next_set + 1
+        set_rooms = next_set_rooms
+        row = next_row
+
+
+def carve_eller(rooms: bytearray, dungeon_width: int, dungeon_height: int, rng: Random) -> None:
+    ''' Carve the dungeon with Eller's algorithm. See eller_rows(). '''
+    for y, row in enumerate(eller_rows(dungeon_width, dungeon_height, rng)):
+        rooms[y * dungeon_width:(y + 1) * dungeon_width] = row
+
+
+def write_eller_maze(path: str, dungeon_width: int, dungeon_height: int, rng: Random) -> None:
+    '''
+    Write a maze generated with Eller's algorithm to the file, one row at a time,
+    without holding the whole maze in memory.
+    The file holds one door mask per room, row by row, the same as GridDungeon.rooms.
+    '''
+    with open(path, 'wb') as maze_file:
+        for row in eller_rows(dungeon_width, dungeon_height, rng):
+            maze_file.write(row)
+
+
+# Maze generators, by name.
+MAZE_GENERATORS: dict[str, MazeGenerator] = {
+    'recursive_backtracker': carve_recursive_backtracker,
+    'kruskal': carve_kruskal,
+    'wilson': carve_wilson,
+    'eller': carve_eller,
+}
@@ -0,0 +1,222 @@
+'''
+Monster horde.
+Many monsters roam the dungeon, hunting the player.
+'''
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from random import Random
+from typing import Optional
+
+from base_classes.dungeon import (
+    Dungeon, NavigationInfo, RoomContents, RoomCounts, VisibleRooms
+)
+from output_sink import OutputSink, StdoutSink
+
+
+@dataclass
+class HordeMonster:
+    ''' A monster in the horde. '''
+    room: int                                          # The room the monster is in.
+    health: int                                        # Hits needed to defeat the monster.
+    last_saw_player_in_room: Optional[int] = None      # Where the monster last saw the player.
+
+
+class MonsterHorde:
+    '''
+    Monster horde.
+    Each monster behaves like a roaming monster.
+    The monsters are indexed by room, so rooms can be checked for monsters in O(1).
+    The horde shares one sparse count of room visits, so the whole horde spreads out.
+    Line of sight is checked once per turn, from the player, for all the monsters at once.
+    Monsters that have seen the player follow a shared distance field to the player's room,
+    while they are within the pursuit distance, so they chase the player around corners.
+    '''
+
+
+    def __init__(
+        self,
+        dungeon: Dungeon,
+        monster_rooms: list[int],
+        monster_health: int = 1,
+        rng: Optional[Random] = None,
+        pursuit_distance: int = 16,
+        output: Optional[OutputSink] = None,
+    ):
+        self.dungeon: Dungeon = dungeon
+        self.rng: Random = rng if rng else Random()
+        self.output: OutputSink = output if output else StdoutSink()
+
+        # How far, in moves, monsters that have seen the player track the player.
+        self.pursuit_distance: int = pursuit_distance
+
+        # The monsters in each room. Rooms without monsters are not in the index.
+        self.monsters_per_room: dict[int, list[HordeMonster]] = {}
+
+        # How many times the horde has visited each room. Unvisited rooms are not counted.
+        self.visits_per_room: RoomCounts = dungeon.room_counts()
+
+        for room in monster_rooms:
+            self._add_monster(HordeMonster(room = room, health = monster_health))
+            self.visits_per_room[room] += 1
+
+
+    def description(self) -> None:
+        ''' Describe the scenario. '''
+        self.output.write_line(
+            f'- A horde of {self.number_of_monsters()} monsters roams this dungeon.'
+        )
+        self.output.write_line('  If a monster catches you, you will lose.')
+
+
+    def number_of_monsters(self) -> int:
+        ''' Returns the number of monsters in the horde. '''
+        return sum(len(monsters) for monsters in self.monsters_per_room.values())
+
+
+    def add_room_contents(self, room_contents: RoomContents) -> None:
+        ''' Adds the monsters to the room contents, unless the rooms already have contents. '''
+        for room in self.monsters_per_room:
+            room_contents.setdefault(room, 'M')
+
+
+    def visible_monster_rooms(self, visible_rooms: VisibleRooms) -> list[int]:
+        ''' Returns the rooms with monsters, out of the given visible rooms. '''
+        # Check whichever is smaller, the visible rooms or the rooms with monsters.
+        if len(visible_rooms) < len(self.monsters_per_room):
+            return [room for room in visible_rooms if room in self.monsters_per_room]
+        return [room for room in self.monsters_per_room if room in visible_rooms]
+
+
+    def nearest_visible_monster(self) -> Optional[HordeMonster]:
+        ''' Returns the monster nearest to the player, of those the player can see. '''
+        player_room: int = self.dungeon.player_room
+        if player_room in self.monsters_per_room:
+            return self.monsters_per_room[player_room][0]
+        nearest_monster: Optional[HordeMonster] = None
+        nearest_distance: int = 0
+        for direction in self.dungeon.directions_with_doors(player_room):
+            visible_rooms: Sequence[int] = self.dungeon.rooms_visible_in_direction(
+                direction, player_room
+            )
+            for distance, room in enumerate(visible_rooms):
+                if nearest_monster and distance >= nearest_distance:
+                    break
+                if room in self.monsters_per_room:
+                    nearest_monster = self.monsters_per_room[room][0]
+                    nearest_distance = distance
+                    break
+        return nearest_monster
+
+
+    def remove_monster(self, monster: HordeMonster) -> None:
+        ''' Removes the monster from the horde. '''
+        monsters: list[HordeMonster] = self.monsters_per_room[monster.room]
+        monsters.remove(monster)
+        if not monsters:
+            del self.monsters_per_room[monster.room]
+
+
+    def post_player_turn(self) -> bool:
+        '''
+        Runs after the command function is run.
+        Handles the monsters' turns.
+        '''
+        player_room: int = self.dungeon.player_room
+
+        # Line of sight is symmetric, so the monsters that see the player are those the player sees.
+        visible_rooms: VisibleRooms = self.dungeon.rooms_visible_from_room(player_room)
+        sighted_monster_rooms: set[int] = set(self.visible_monster_rooms(visible_rooms))
+        sighted_monster_rooms.discard(player_room)
+
+        monsters_that_see_player: int = 0
+        for monster in [
+            monster for monsters in self.monsters_per_room.values() for monster in monsters
+        ]:
+            # If the monster is in the same room as the player, it does not move.
+            if monster.room == player_room:
+                continue
+
+            # If the monster sees the player ...
+            if monster.room in sighted_monster_rooms:
+                move_information: Optional[NavigationInfo] = (
+                    self.dungeon.navigate_towards_destination(monster.room, player_room)
+                )
+                monster.last_saw_player_in_room = player_room
+                monsters_that_see_player = monsters_that_see_player + 1
+
+            # The monster does not see the player, but remembers where it saw the player last ...
+            elif monster.last_saw_player_in_room is not None:
+                # If the player is close enough, the monster tracks the player,
+                # along the distance field shared by the whole horde.
+                move_information = self.dungeon.navigate_by_distance_field(
+                    monster.room, player_room, self.pursuit_distance
+                )
+                if move_information is not None:
+                    monster.last_saw_player_in_room = player_room
+                else:
+                    move_information = self.dungeon.navigate_towards_destination(
+                        monster.room, monster.last_saw_player_in_room
+                    )
+
+            # The monster does not see the player, nor remembers where it saw the player last ...
+            else:
+                next_room: Optional[int] = self._least_visited_room(monster.room)
+                if next_room is not None:
+                    self._move_monster(monster, next_room)
+                continue
+
+            if move_information is not None:
+                self._move_monster(monster, move_information.room)
+
+        if monsters_that_see_player == 1:
+            self.output.write_line('A monster sees you, and moves towards you.')
+        elif monsters_that_see_player:
+            self.output.write_line(
+                f'{monsters_that_see_player} monsters see you, and move towards you.'
+            )
+
+        # If a monster is in the same room as the player ...
+        if player_room in self.monsters_per_room:
+            self.output.write_line('A monster catches you. You lose.')
+            return False
+
+        return True
+
+
+    def _add_monster(self, monster: HordeMonster) -> None:
+        ''' Adds the monster to the room index. '''
+        self.monsters_per_room.setdefault(monster.room, []).append(monster)
+
+
+    def _move_monster(self, monster: HordeMonster, room: int) -> None:
+        ''' Moves the monster to the given room. '''
+        self.remove_monster(monster)
+        monster.room = room
+        self._add_monster(monster)
+
+        # If the monster is in the room where it remembers last seeing the player,
+        # then the monster forgets where it last saw the player.
+        if monster.room == monster.last_saw_player_in_room:
+            monster.last_saw_player_in_room = None
+
+        self.visits_per_room[room] += 1
+
+
+    def _least_visited_room(self, room: int) -> Optional[int]:
+        '''
+        Returns a random room, out of the least visited rooms adjacent to the given room.
+        The horde prefers the roads less traveled.
+        '''
+        adjacent_rooms: Sequence[int] = self.dungeon.adjacent_rooms(room)
+        if not adjacent_rooms:
+            return None
+        visits_per_room: RoomCounts = self.visits_per_room
+        lowest_number_of_visits: int = min([
+            visits_per_room[adjacent_room] for adjacent_room in adjacent_rooms
+        ])
+        return self.rng.choice([
+            adjacent_room
+            for adjacent_room in adjacent_rooms
+            if visits_per_room[adjacent_room] == lowest_number_of_visits
+        ])
@@ -0,0 +1,198 @@
+'''
+NumPy grid dungeon.
+A grid dungeon that uses NumPy arrays for whole-grid work, such as rendering and visibility.
+Intended for large dungeons and batch analysis. Requires NumPy.
+'''
+
+from array import array
+from collections.abc import Container
+from random import Random
+from typing import Optional
+
+import numpy as np
+
+from character_set import DungeonDrawingCharacterSet
+from components.grid_dungeon import (
+    GRID_DIRECTION_DOOR, GRID_TILE_EAST_EDGE_CORNER, GRID_TILE_EAST_WALL,
+    GRID_TILE_HORIZONTAL_EDGE, GRID_TILE_LINE_BREAK, GRID_TILE_NORTH_EDGE_CORNER,
+    GRID_TILE_NORTHEAST_CORNER, GRID_TILE_NORTHWEST_CORNER, GRID_TILE_ROOM,
+    GRID_TILE_SOUTH_EAST_CORNER, GRID_TILE_SOUTH_EDGE_CORNER, GRID_TILE_SOUTH_WALL,
+    GRID_TILE_SOUTHEAST_CORNER, GRID_TILE_SOUTHWEST_CORNER, GRID_TILE_VERTICAL_EDGE,
+    GRID_TILE_WEST_EDGE_CORNER, GridDirection, GridDungeon, MazeGenerator,
+    carve_recursive_backtracker,
+)
+from output_sink import OutputSink
+
+
+class NumpyGridDungeon(GridDungeon):
+    '''
+    NumPy grid dungeon.
+    The doors are also kept as boolean arrays:
+    east_doors[y, x] is True if there is a door between rooms (x, y) and (x + 1, y).
+    south_doors[y, x] is True if there is a door between rooms (x, y) and (x, y + 1).
+    Single room queries use the inherited door masks.
+    Visibility masks, the line of sight index and tile codes are computed for the whole grid
+    at once.
+    '''
+
+    def __init__(
+        self,
+        character_set: DungeonDrawingCharacterSet,
+        dungeon_width: int,
+        dungeon_height: int,
+        player_room: int,
+        ansi_terminal: bool = False,
+        rng: Optional[Random] = None,
+        rooms: Optional[bytearray] = None,
+        corridor_lengths: Optional[list[array]] = None,
+        output: Optional[OutputSink] = None,
+        maze_generator: MazeGenerator = carve_recursive_backtracker,
+    ):
+        ''' The door arrays are indexed from the door masks, however the dungeon was made. '''
+        super().__init__(
+            character_set,
+            dungeon_width,
+            dungeon_height,
+            player_room,
+            ansi_terminal = ansi_terminal,
+            rng = rng,
+            rooms = rooms,
+            corridor_lengths = corridor_lengths,
+            output = output,
+            maze_generator = maze_generator,
+        )
+
+        # If the line of sight index was given, the doors were not indexed with it.
+        if rooms is not None and corridor_lengths is not None:
+            self._index_doors()
+
+
+    def visibility_mask(self, visible_rooms: Container[int]) -> np.ndarray:
+        ''' Returns a boolean array, indexed by [y, x], of the given visible rooms. '''
+        return self.visibility_array(self._room_visibility(visible_rooms)).astype(bool)
+
+
+    def visibility_array(self, visibility: bytes) -> np.ndarray:
+        ''' Returns the visibility of each room, 1 or 0, as an array indexed by [y, x]. '''
+        return np.frombuffer(visibility, dtype = np.uint8).reshape(
+            self.dungeon_height, self.dungeon_width
+        )
+
+
+    def south_east_corner_indexes(self, mask: np.ndarray) -> np.ndarray:
+        '''
+        Returns the indexes of the internal corners' tiles, indexed by [y, x].
+        See GridDungeonTiles.south_east_corners for how the indexes are composed.
+        '''
+        return (
+            mask[:-1, :-1].astype(np.uint8) +
+            2 * mask[1:, :-1] +
+            4 * mask[:-1, 1:] +
+            8 * mask[1:, 1:]
+        )
+
+
+    def _index_doors(self) -> None:
+        ''' Index the door arrays, from the door masks. '''
+        door_masks: np.ndarray = np.frombuffer(self.rooms, dtype = np.uint8).reshape(
+            self.dungeon_height, self.dungeon_width
+        )
+        self.east_doors: np.ndarray = (
+            door_masks[:, :-1] & GRID_DIRECTION_DOOR[GridDirection.EAST]
+        ) != 0
+        self.south_doors: np.ndarray = (
+            door_masks[:-1, :] & GRID_DIRECTION_DOOR[GridDirection.SOUTH]
+        ) != 0
+
+
+    def _index_corridors(self) -> None:
+        '''
+        Index the door arrays, and the lines of sight through the dungeon.
+        Each corridor length is the distance back to the nearest wall,
+        found with a running maximum of wall positions.
+        '''
+        self._index_doors()
+
+        height: int = self.dungeon_height
+        width: int = self.dungeon_width
+        x: np.ndarray = np.broadcast_to(np.arange(width), (height, width))
+        y: np.ndarray = np.broadcast_to(np.arange(height)[:, np.newaxis], (height, width))
+
+        # A door on one side of a room is the matching door on the other side of its neighbor.
+        west_doors: np.ndarray = np.zeros((height, width), dtype = bool)
+        west_doors[:, 1:] = self.east_doors
+        east_doors: np.ndarray = np.zeros((height, width), dtype = bool)
+        east_doors[:, :-1] = self.east_doors
+        north_doors: np.ndarray = np.zeros((height, width), dtype = bool)
+        north_doors[1:, :] = self.south_doors
+        south_doors: np.ndarray = np.zeros((height, width), dtype = bool)
+        south_doors[:-1, :] = self.south_doors
+
+        # East and South corridors are counted the same way, on the flipped grid.
+        west: np.ndarray = x - np.maximum.accumulate(np.where(west_doors, 0, x), axis = 1)
+        north: np.ndarray = y - np.maximum.accumulate(np.where(north_doors, 0, y), axis = 0)
+        east: np.ndarray = (
+            x - np.maximum.accumulate(np.where(east_doors[:, ::-1], 0, x), axis = 1)
+        )[:, ::-1]
+        south: np.ndarray = (
+            y - np.maximum.accumulate(np.where(south_doors[::-1, :], 0, y), axis = 0)
+        )[::-1, :]
+
+        lengths: dict[GridDirection, np.ndarray] = {
+            GridDirection.NORTH: north,
+            GridDirection.SOUTH: south,
+            GridDirection.EAST: east,
+            GridDirection.WEST: west,
+        }
+        self.corridor_lengths = [
+            array('I', lengths[grid_direction].astype(np.uint32).tobytes())
+            for grid_direction in GridDirection
+        ]
+
+
+    def _tile_codes(self, visibility: bytes) -> bytes:
+        '''
+        Stage one of drawing the dungeon.
+        Returns the tile code of every tile of the frame, line by line,
+        from the visibility of each room, and its doors. See GRID_TILE_ROOM.
+        Hide the details of rooms that are not visible.
+        The codes are assembled as an array, one per wall, corner and room.
+        '''
+        height: int = self.dungeon_height
+        width: int = self.dungeon_width
+        visible: np.ndarray = self.visibility_array(visibility)
+
+        codes: np.ndarray = np.empty((2 * height + 1, 2 * width + 2), dtype = np.uint8)
+        codes[:, -1] = GRID_TILE_LINE_BREAK
+
+        # The North edge.
+        codes[0, 0] = GRID_TILE_NORTHWEST_CORNER
+        codes[0, 1:-2:2] = GRID_TILE_HORIZONTAL_EDGE
+        codes[0, 2:-3:2] = GRID_TILE_NORTH_EDGE_CORNER + visible[0, :-1] + 2 * visible[0, 1:]
+        codes[0, -2] = GRID_TILE_NORTHEAST_CORNER
+
+        # The room contents and vertical walls.
+        codes[1::2, 0] = GRID_TILE_VERTICAL_EDGE
+        codes[1::2, 1:-2:2] = GRID_TILE_ROOM + visible
+        codes[1::2, 2:-3:2] = (
+            GRID_TILE_EAST_WALL + visible[:, :-1] + 2 * visible[:, 1:] + 4 * self.east_doors
+        )
+        codes[1::2, -2] = GRID_TILE_VERTICAL_EDGE
+
+        # The horizontal walls and internal corners.
+        codes[2:-1:2, 0] = GRID_TILE_WEST_EDGE_CORNER + visible[:-1, 0] + 2 * visible[1:, 0]
+        codes[2:-1:2, 1:-2:2] = (
+            GRID_TILE_SOUTH_WALL + visible[:-1, :] + 2 * visible[1:, :] + 4 * self.south_doors
+        )
+        codes[2:-1:2, 2:-3:2] = (
+            GRID_TILE_SOUTH_EAST_CORNER + self.south_east_corner_indexes(visible.astype(bool))
+        )
+        codes[2:-1:2, -2] = GRID_TILE_EAST_EDGE_CORNER + visible[:-1, -1] + 2 * visible[1:, -1]
+
+        # The South edge.
+        codes[-1, 0] = GRID_TILE_SOUTHWEST_CORNER
+        codes[-1, 1:-2:2] = GRID_TILE_HORIZONTAL_EDGE
+        codes[-1, 2:-3:2] = GRID_TILE_SOUTH_EDGE_CORNER + visible[-1, :-1] + 2 * visible[-1, 1:]
+        codes[-1, -2] = GRID_TILE_SOUTHEAST_CORNER
+
+        return codes.tobytes()
@@ -3,7 +3,10 @@ Quit the game.
 Allows the player to quit the game.
 '''
 
+from typing import Optional
+
 from base_classes.scenario import Command, CommandFunction
+from output_sink import OutputSink, StdoutSink
 
 
 class Quit:
@@ -13,6 +16,10 @@ class Quit:
     '''
 
 
+    def __init__(self, output: Optional[OutputSink] = None):
+        self.output: OutputSink = output if output else StdoutSink()
+
+
     def commands(self) -> list[Command]:
         ''' Returns a list of commands available to the player. '''
         return [Command(
@@ -25,5 +32,5 @@ class Quit:
     _quit_game_command: CommandFunction
     def _quit_game_command(self) -> bool:
         ''' The player quits the game. '''
-        print('You quit the game.')
+        self.output.write_line('You quit the game.')
         return False
@@ -3,38 +3,52 @@ Roaming monster scenario.
 A roaming monster wanders through the grid maze.
 '''
 
-from random import choice
+from collections.abc import Sequence
+from random import Random
 from typing import Optional
 
-from base_classes.dungeon import Direction, Dungeon, NavigationInfo
+from base_classes.dungeon import Dungeon, NavigationInfo, RoomContents, RoomCounts
+from output_sink import OutputSink, StdoutSink
 
 
 class RoamingMonster:
     ''' Roaming monster. '''
 
 
-    def __init__(self, dungeon: Dungeon, monster_room: int, monster_health: int = 1):
+    def __init__(
+        self,
+        dungeon: Dungeon,
+        monster_room: int,
+        monster_health: int = 1,
+        rng: Optional[Random] = None,
+        pursuit_distance: int = 16,
+        output: Optional[OutputSink] = None,
+    ):
         self.dungeon: Dungeon = dungeon
+        self.rng: Random = rng if rng else Random()
+        self.output: OutputSink = output if output else StdoutSink()
         self.monster_room: int = monster_room
         self.monster_health: int = monster_health
 
+        # How far, in moves, the monster tracks the player's trail by distance field.
+        self.pursuit_distance: int = pursuit_distance
+
         self.monster_last_saw_player_in_room: Optional[int] = None
 
         # Record how many times the monster has visited each room.
-        self.visits_per_room: list[int] = []
-        for _ in range(self.dungeon.number_of_rooms):
-            self.visits_per_room.append(0)
+        # Unvisited rooms are not counted, so the count stays small in very large dungeons.
+        self.visits_per_room: RoomCounts = dungeon.room_counts()
         self.visits_per_room[self.monster_room] = 1
 
 
     def description(self) -> None:
         ''' Describe the scenario. '''
-        print('- A monster roams this dungeon. If it catches you, you will lose.')
+        self.output.write_line('- A monster roams this dungeon. If it catches you, you will lose.')
 
 
-    def room_contents(self, room: int) -> Optional[str]:
-        ''' Returns the given room's contents. Single character string. '''
-        return 'M' if room == self.monster_room else None
+    def add_room_contents(self, room_contents: RoomContents) -> None:
+        ''' Adds the monster to the room contents, unless the room already has contents. '''
+        room_contents.setdefault(self.monster_room, 'M')
 
 
     def post_player_turn(self) -> bool:
@@ -44,54 +58,48 @@ class RoamingMonster:
         '''
         # If the monster is in the same room as the player ...
         if self.monster_room == self.dungeon.player_room:
-            print('The monster does not move.')
+            self.output.write_line('The monster does not move.')
 
         # The monster is in a different room as the player ...
         else:
             # Can the monster see the player?
-            visible_rooms: list[int] = self.dungeon.rooms_visible_from_room(self.monster_room)
-            is_player_visible: bool = self.dungeon.player_room in visible_rooms
+            is_player_visible: bool = self.dungeon.is_room_visible_from_room(
+                self.monster_room, self.dungeon.player_room
+            )
 
             # If the monster sees the player ...
             if is_player_visible:
                 move_information: NavigationInfo = self.dungeon.navigate_towards_destination(
                     self.monster_room, self.dungeon.player_room
                 )
-                print(f'The monster sees you. The monster moves {move_information.name}.')
+                self.output.write_line(
+                    f'The monster sees you. The monster moves {move_information.name}.'
+                )
 
                 # The monster remembers where he last saw the player.
                 self.monster_last_saw_player_in_room = self.dungeon.player_room
+                self.monster_room = move_information.room
 
             # The monster does not see the player, but remembers where it saw the player last ...
+            # The field to that room is cached, so following it takes O(1) per turn.
             elif self.monster_last_saw_player_in_room:
-                move_information: NavigationInfo = self.dungeon.navigate_towards_destination(
-                    self.monster_room, self.monster_last_saw_player_in_room
+                move_information: Optional[NavigationInfo] = (
+                    self.dungeon.navigate_by_distance_field(
+                        self.monster_room,
+                        self.monster_last_saw_player_in_room,
+                        self.pursuit_distance,
+                    )
                 )
+                if move_information is None:
+                    move_information = self.dungeon.navigate_towards_destination(
+                        self.monster_room, self.monster_last_saw_player_in_room
+                    )
+                self.monster_room = move_information.room
 
             # The monster does not see the player, nor remembers where it saw the player last ...
+            # The monster wanders, so only the room it moves to is needed, not how it gets there.
             else:
-                # Which directions can the monster move?
-                directions: list[Direction] = self.dungeon.directions_with_doors(self.monster_room)
-                navigation_info_list: list[NavigationInfo] = [
-                    self.dungeon.navigation_info(direction, self.monster_room)
-                    for direction in directions
-                ]
-
-                # Sort the direction list by monster visits, ascending.
-                # The monster prefers the roads less traveled.
-                navigation_info_list.sort(
-                    key = lambda navigation_info: self.visits_per_room[navigation_info.room]
-                )
-                lowest_number_of_visits: int = self.visits_per_room[navigation_info_list[0].room]
-                move_information_list: list[NavigationInfo] = [
-                    navigation_info
-                    for navigation_info in navigation_info_list
-                    if self.visits_per_room[navigation_info.room] == lowest_number_of_visits
-                ]
-                move_information: NavigationInfo = choice(move_information_list)
-
-            # Move the monster.
-            self.monster_room = move_information.room
+                self.monster_room = self._least_visited_room()
 
             # If the monster is in the room where he remembers last seeing the player,
             # then the monster forgets where he last saw the player.
@@ -103,7 +111,24 @@ class RoamingMonster:
 
         # If the monster is in the same room as the player ...
         if self.monster_room == self.dungeon.player_room:
-            print('The monster catches you. You lose.')
+            self.output.write_line('The monster catches you. You lose.')
             return False
 
         return True
+
+
+    def _least_visited_room(self) -> int:
+        '''
+        Returns a random room, out of the least visited rooms adjacent to the monster.
+        The monster prefers the roads less traveled.
+        '''
+        visits_per_room: RoomCounts = self.visits_per_room
+        adjacent_rooms: Sequence[int] = self.dungeon.adjacent_rooms(self.monster_room)
+        lowest_number_of_visits: int = min([
+            visits_per_room[adjacent_room] for adjacent_room in adjacent_rooms
+        ])
+        return self.rng.choice([
+            adjacent_room
+            for adjacent_room in adjacent_rooms
+            if visits_per_room[adjacent_room] == lowest_number_of_visits
+        ])
@@ -4,25 +4,31 @@ You can place the rune in a room and teleport to it at any time.
 '''
 
 from typing import Optional
-from base_classes.dungeon import Dungeon
 
+from base_classes.dungeon import Dungeon, RoomContents
 from base_classes.scenario import Command, CommandFunction
+from output_sink import OutputSink, StdoutSink
 
 
 class TeleportRune:
     ''' Teleportation rune scenario. '''
 
 
-    def __init__(self, dungeon: Dungeon):
+    def __init__(self, dungeon: Dungeon, output: Optional[OutputSink] = None):
         self.dungeon = dungeon
+        self.output: OutputSink = output if output else StdoutSink()
         self.teleport_room: Optional[int] = None
 
 
     def description(self) -> None:
         ''' Describe the scenario. '''
-        print('- You have one teleportation rune.')
-        print('  You can place the rune in a room, and then teleport back to it later.')
-        print('  When you teleport to the rune, you automatically pick it up for later use.')
+        self.output.write_line('- You have one teleportation rune.')
+        self.output.write_line(
+            '  You can place the rune in a room, and then teleport back to it later.'
+        )
+        self.output.write_line(
+            '  When you teleport to the rune, you automatically pick it up for later use.'
+        )
 
 
     def commands(self) -> list[Command]:
@@ -39,15 +45,16 @@ class TeleportRune:
         return commands
 
 
-    def room_contents(self, room: int) -> Optional[str]:
-        ''' Returns the given room's contents, as a single character string. '''
-        return 'T' if room == self.teleport_room else None
+    def add_room_contents(self, room_contents: RoomContents) -> None:
+        ''' Adds the rune to the room contents, unless the room already has contents. '''
+        if self.teleport_room is not None:
+            room_contents.setdefault(self.teleport_room, 'T')
 
 
     _place_rune_command: CommandFunction
     def _place_rune_command(self) -> bool:
         ''' Function to place a teleport rune. '''
-        print('You place the teleport rune.')
+        self.output.write_line('You place the teleport rune.')
         self.teleport_room = self.dungeon.player_room
         return True
 
@@ -55,7 +62,7 @@ class TeleportRune:
     _teleport_command: CommandFunction
     def _teleport_command(self) -> bool:
         ''' Function to teleport to the rune. '''
-        print('You teleport to the rune.')
+        self.output.write_line('You teleport to the rune.')
         self.dungeon.player_room = self.teleport_room
         self.teleport_room = None
         return True
@@ -0,0 +1,64 @@
+'''
+Game loop.
+Plays a scenario's turns, reading the player's commands with a coroutine.
+The same loop plays the game in a terminal, and in every session of the game server.
+'''
+
+from typing import Awaitable, Callable, Coroutine, Optional, TypeVar
+
+from base_classes.scenario import Command, CommandTable, Scenario
+
+
+# Coroutine that prompts the player for a command, and returns the text the player enters.
+# Called like so:
+#
+# text = await read_command(prompt)
+#
+# The turn's text is still held by the scenario's output sink,
+# so the coroutine flushes the sink, with the prompt, once per turn.
+# Returns None if the player is gone. e.g. The connection closed.
+ReadCommand = Callable[[str], Awaitable[Optional[str]]]
+
+
+Result = TypeVar('Result')
+
+
+async def play_turns(scenario: Scenario, read_command: ReadCommand) -> int:
+    '''
+    Plays the scenario's turns, until the game ends or the player is gone.
+    The loop is suspended only while the player's command is read,
+    so each turn runs to completion without interruption.
+    Returns the number of commands the player invoked.
+    '''
+    turns: int = 0
+    while True:
+        scenario.display()
+        command_table: CommandTable = scenario.command_table()
+        if not command_table.commands:
+            break
+        scenario.output.write_line(f'Commands: {command_table.menu_text}')
+        user_choice: Optional[str] = await read_command('Command? ')
+        if user_choice is None:
+            break
+        command: Optional[Command] = command_table.commands.get(user_choice.lower())
+        if not command:
+            scenario.output.write_line('Invalid command.')
+            continue
+        turns = turns + 1
+        if not command.function() or not scenario.post_player_turn():
+            break
+    return turns
+
+
+def run_without_event_loop(coroutine: Coroutine[None, None, Result]) -> Result:
+    '''
+    Runs a coroutine that never suspends, such as a turn loop that reads commands synchronously,
+    and returns its result. No event loop is needed, so the terminal game does not import asyncio.
+    Raises a RuntimeError if the coroutine suspends.
+    '''
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coroutine.close()
+    raise RuntimeError('The coroutine suspended, so it needs an event loop.')
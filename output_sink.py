@@ -0,0 +1,98 @@
+'''
+Output sinks.
+Game text is written to an output sink, instead of printed,
+so it can be batched, discarded, or routed to a player's connection.
+'''
+
+import sys
+from typing import Optional, TextIO
+
+
+class OutputSink:
+    '''
+    Output sink interface.
+    All output sinks use this, directly or indirectly, as a base class.
+    '''
+
+
+    def write(self, text: str) -> None:
+        ''' Writes the text. '''
+
+
+    def write_line(self, text: str = '') -> None:
+        ''' Writes the text, and a new line. '''
+        self.write(f'{text}\n')
+
+
+    def flush(self) -> None:
+        '''
+        Sends any text that the sink holds to its destination.
+        The game loop flushes once per turn, before reading the player's command.
+        '''
+
+
+    def terminal_lines(self) -> Optional[int]:
+        '''
+        Returns the number of lines of the terminal that the text is displayed on,
+        or None if it is this process's own terminal.
+        '''
+        return None
+
+
+class StdoutSink(OutputSink):
+    '''
+    Writes straight to standard output.
+    Standard output is looked up on every write, so it may be redirected.
+    '''
+
+
+    def write(self, text: str) -> None:
+        ''' Writes the text to standard output. '''
+        sys.stdout.write(text)
+
+
+    def flush(self) -> None:
+        ''' Flushes standard output. '''
+        sys.stdout.flush()
+
+
+class BufferedSink(OutputSink):
+    '''
+    Holds the text in memory, and sends it all with a single write when flushed.
+    A turn's dozens of writes cost one write to the stream.
+    '''
+
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        ''' The text is flushed to the given stream, or if none, to standard output. '''
+        self.stream: Optional[TextIO] = stream
+        self.parts: list[str] = []
+
+
+    def write(self, text: str) -> None:
+        ''' Holds the text until the next flush. '''
+        self.parts.append(text)
+
+
+    def flush(self) -> None:
+        ''' Sends the held text to the stream. '''
+        if self.parts:
+            text: str = ''.join(self.parts)
+            self.parts.clear()
+            self._send(text)
+
+
+    def discard(self) -> None:
+        ''' Discards the held text, without sending it. '''
+        self.parts.clear()
+
+
+    def _send(self, text: str) -> None:
+        ''' Write the text to the stream. '''
+        stream: TextIO = self.stream if self.stream else sys.stdout
+        stream.write(text)
+        stream.flush()
+
+
+class NullSink(OutputSink):
+    ''' Discards everything written to it. Used for simulations, which are never displayed. '''
@@ -0,0 +1,168 @@
+'''
+Turn profiler.
+Opt-in instrumentation that records the wall time of each phase of each turn,
+and counts the dungeon queries made during each turn.
+'''
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Callable
+
+from base_classes.dungeon import Dungeon
+from base_classes.scenario import Command, CommandTable, Scenario
+
+
+# Phases of a turn, in the order they run.
+PHASES: list[str] = ['display', 'commands', 'command', 'post_player_turn']
+
+# Dungeon interface member functions that are counted as queries.
+DUNGEON_QUERIES: list[str] = [
+    'adjacent_rooms',
+    'directions_with_doors',
+    'distance_field',
+    'is_room_visible_from_room',
+    'navigation_info',
+    'navigate_by_distance_field',
+    'navigate_towards_destination',
+    'room_in_direction',
+    'rooms_visible_from_room',
+    'rooms_visible_in_direction',
+]
+
+
+@dataclass
+class TurnProfile:
+    ''' Timing and query counts of a single turn. '''
+    phase_seconds: dict[str, float] = field(default_factory = dict)  # Wall time of each phase.
+    queries: Counter = field(default_factory = Counter)              # Calls of each query.
+
+
+class TurnProfiler:
+    '''
+    Turn profiler.
+    Instruments a scenario by replacing its member functions, and those of its dungeons,
+    with timed or counted versions. Nothing is instrumented unless instrument() is called.
+    Each call to display() starts a new turn.
+    '''
+
+
+    def __init__(self):
+        self.turns: list[TurnProfile] = []
+
+
+    def instrument(self, scenario: Scenario) -> None:
+        ''' Instruments the given scenario, and the dungeons it holds. '''
+        self._time_member_function(scenario, 'display', start_turn = True)
+        self._time_member_function(scenario, 'post_player_turn')
+        self._instrument_command_table(scenario)
+        self._summarize_after_game_over(scenario)
+        for value in list(vars(scenario).values()):
+            if isinstance(value, Dungeon):
+                for query in DUNGEON_QUERIES:
+                    self._count_member_function(value, query)
+
+
+    def summary(self) -> list[str]:
+        ''' Returns the lines of a summary of all the turns. '''
+        lines: list[str] = [f'Turns: {len(self.turns)}']
+        for phase in PHASES:
+            phase_seconds: list[float] = [
+                turn.phase_seconds[phase] for turn in self.turns if phase in turn.phase_seconds
+            ]
+            if phase_seconds:
+                lines.append(
+                    f'{phase:18} '
+                    f'total {1000 * sum(phase_seconds):9.3f} ms, '
+                    f'mean {1000 * sum(phase_seconds) / len(phase_seconds):9.3f} ms, '
+                    f'max {1000 * max(phase_seconds):9.3f} ms'
+                )
+        queries: Counter = Counter()
+        for turn in self.turns:
+            queries.update(turn.queries)
+        for query, calls in sorted(queries.items()):
+            calls_per_turn: float = calls / max(1, len(self.turns))
+            lines.append(f'{query:30} {calls:8} calls, {calls_per_turn:8.2f} per turn')
+        return lines
+
+
+    def _current_turn(self) -> TurnProfile:
+        ''' Returns the profile of the current turn. '''
+        if not self.turns:
+            self.turns.append(TurnProfile())
+        return self.turns[-1]
+
+
+    def _record(self, phase: str, seconds: float) -> None:
+        ''' Adds the wall time of a phase to the current turn. '''
+        phase_seconds: dict[str, float] = self._current_turn().phase_seconds
+        phase_seconds[phase] = phase_seconds.get(phase, 0.0) + seconds
+
+
+    def _timed(self, phase: str, function: Callable, start_turn: bool = False) -> Callable:
+        ''' Returns a version of the function that records its wall time as the given phase. '''
+        @wraps(function)
+        def timed_function(*args, **kwargs):
+            if start_turn:
+                self.turns.append(TurnProfile())
+            start_time: float = time.perf_counter()
+            result = function(*args, **kwargs)
+            self._record(phase, time.perf_counter() - start_time)
+            return result
+        return timed_function
+
+
+    def _time_member_function(self, instance: object, name: str, start_turn: bool = False) -> None:
+        ''' Replaces the named member function of the instance with a timed version. '''
+        setattr(instance, name, self._timed(name, getattr(instance, name), start_turn))
+
+
+    def _instrument_command_table(self, scenario: Scenario) -> None:
+        '''
+        Times the scenario's command table function as the commands phase,
+        and the command functions in the tables it returns as the command phase.
+        '''
+        command_table_function: Callable[[], CommandTable] = self._timed(
+            'commands', scenario.command_table
+        )
+
+        @wraps(command_table_function)
+        def instrumented_command_table() -> CommandTable:
+            command_table: CommandTable = command_table_function()
+            return CommandTable(
+                commands = {
+                    key: Command(
+                        invocation_text = command.invocation_text,
+                        menu_text = command.menu_text,
+                        function = self._timed('command', command.function),
+                    )
+                    for key, command in command_table.commands.items()
+                },
+                menu_text = command_table.menu_text,
+            )
+        scenario.command_table = instrumented_command_table
+
+
+    def _summarize_after_game_over(self, scenario: Scenario) -> None:
+        ''' Prints the summary after the scenario's game over. '''
+        game_over_function: Callable[[], None] = scenario.game_over
+
+        @wraps(game_over_function)
+        def game_over_and_summary() -> None:
+            game_over_function()
+            scenario.output.write_line('Turn profile:')
+            for line in self.summary():
+                scenario.output.write_line(f'  {line}')
+        scenario.game_over = game_over_and_summary
+
+
+    def _count_member_function(self, instance: object, name: str) -> None:
+        ''' Replaces the named member function of the instance with a counted version. '''
+        function: Callable = getattr(instance, name)
+
+        @wraps(function)
+        def counted_function(*args, **kwargs):
+            self._current_turn().queries[name] += 1
+            return function(*args, **kwargs)
+        setattr(instance, name, counted_function)
@@ -0,0 +1,120 @@
+'''
+Scenario registry.
+Scenarios are registered by name, with the module and class that implement them.
+A scenario's module is only imported when the scenario is first created,
+so starting a game loads only the chosen scenario, and the components that it uses.
+'''
+
+import importlib
+import importlib.util
+import pkgutil
+from typing import Callable, Optional
+
+from base_classes.scenario import Scenario
+
+
+# Creates a scenario. Scenario classes are scenario factories.
+# Called like so:
+#
+# scenario = factory(ansi_terminal = ansi_terminal, rng = rng, output = output)
+ScenarioFactory = Callable[..., Scenario]
+
+
+def scenario_class_name(module_name: str) -> str:
+    ''' Returns the name of a scenario module's class. e.g. BowAndBlink for bow_and_blink. '''
+    return ''.join(word.capitalize() for word in module_name.split('_'))
+
+
+class ScenarioRegistry:
+    '''
+    Scenario registry.
+    Each scenario is registered as an import target, 'module:attribute', and imported on first use.
+    The scenarios are kept in order of registration,
+    so a seed chooses the same scenario, as long as the same scenarios are registered.
+    Scenarios that are registered as chosen by name only are never chosen by a seed.
+    '''
+
+
+    def __init__(self):
+        # Import targets, keyed by scenario name, in order of registration.
+        self.targets: dict[str, str] = {}
+
+        # Names of the scenarios that seeds never choose.
+        self.chosen_by_name_only: set[str] = set()
+
+        # Scenario factories that have been imported, keyed by scenario name.
+        self.factories: dict[str, ScenarioFactory] = {}
+
+
+    def register(self, name: str, target: str, chosen_by_seed: bool = True) -> None:
+        '''
+        Registers the scenario that the import target names, such as 'scenarios.horde:Horde'.
+        If chosen_by_seed is False, the scenario can only be chosen by name.
+        If a scenario is already registered under the name, it is kept.
+        '''
+        if name in self.targets:
+            return
+        self.targets[name] = target
+        if not chosen_by_seed:
+            self.chosen_by_name_only.add(name)
+
+
+    def names(self) -> list[str]:
+        ''' Returns the names of the registered scenarios, in order of registration. '''
+        return list(self.targets)
+
+
+    def seeded_names(self) -> list[str]:
+        ''' Returns the names of the scenarios that seeds choose from, in order of registration. '''
+        return [name for name in self.targets if name not in self.chosen_by_name_only]
+
+
+    def factory(self, name: str) -> ScenarioFactory:
+        '''
+        Returns the factory of the named scenario, importing its module if it is not yet imported.
+        Raises a KeyError if no scenario is registered under the name.
+        '''
+        factory: Optional[ScenarioFactory] = self.factories.get(name)
+        if factory is None:
+            module_name, _, attribute = self.targets[name].partition(':')
+            factory = getattr(importlib.import_module(module_name), attribute)
+            self.factories[name] = factory
+        return factory
+
+
+    def create(self, name: str, **kwargs) -> Scenario:
+        ''' Creates the named scenario, with the given keyword arguments. '''
+        return self.factory(name)(**kwargs)
+
+
+    def discover_package(self, package: str) -> None:
+        '''
+        Registers the scenario of each module in the package's directory, without importing them.
+        Each module is registered under its own name, with the class named after the module.
+        e.g. The module horde.py is registered as 'horde', and must define a Horde scenario class.
+        Newly found scenarios are registered in order of module name.
+        '''
+        for module_info in pkgutil.iter_modules(
+            importlib.util.find_spec(package).submodule_search_locations
+        ):
+            if not module_info.ispkg:
+                self.register(
+                    module_info.name,
+                    f'{package}.{module_info.name}:{scenario_class_name(module_info.name)}',
+                )
+
+
+    def discover_entry_points(self, group: str) -> None:
+        '''
+        Registers the scenarios that installed packages declare under the entry point group.
+        Newly found scenarios are registered in order of entry point name.
+        '''
+        # The metadata module takes longer to import than a scenario,
+        # so it is only imported if installed scenarios are discovered.
+        from importlib.metadata import EntryPoint, entry_points
+
+        installed: list[EntryPoint] = sorted(
+            entry_points(group = group), key = lambda entry_point: entry_point.name
+        )
+        for entry_point in installed:
+            self.register(entry_point.name, entry_point.value)
@@ -3,38 +3,83 @@ Simple bow scenario.
 You can shoot the monster with your bow.
 '''
 
-from random import randint
+from collections import OrderedDict
+from random import Random
 from typing import Optional
 
-from base_classes.scenario import Command, CommandFunction, Scenario
+from base_classes.dungeon import RoomContents
+from base_classes.scenario import (
+    Command, CommandFunction, CommandTable, GameEnding, GameOutcome, Scenario, create_command_table
+)
 from character_set import UNICODE_DUNGEON_DRAWING_CHARACTER_SET
 from components.grid_dungeon import GridDungeon
 from components.hold_position import HoldPosition
 from components.quit import Quit
 from components.roaming_monster import RoamingMonster
 from components.teleport_rune import TeleportRune
+from output_sink import OutputSink
+
+
+# Number of command tables kept by each game. The least recently used table is dropped first.
+# A 7x5 dungeon has 140 states that command tables depend on, so small dungeons keep them all.
+COMMAND_TABLE_CACHE_SIZE: int = 256
 
 
 class BowAndBlink(Scenario):
     ''' Simple bow scenario.'''
 
-    def __init__(self) -> None:
-        self.dungeon: GridDungeon = GridDungeon(UNICODE_DUNGEON_DRAWING_CHARACTER_SET, 7, 5, 0)
+    def __init__(
+        self,
+        ansi_terminal: bool = False,
+        dungeon_width: int = 7,
+        dungeon_height: int = 5,
+        monster_health: Optional[int] = None,
+        rng: Optional[Random] = None,
+        dungeon: Optional[GridDungeon] = None,
+        output: Optional[OutputSink] = None,
+    ) -> None:
+        '''
+        The dungeon size and the monster's health may be given for simulations.
+        By default, the monster's health is random.
+        All of the game's randomness comes from the given random number generator, if any.
+        If a dungeon is given, such as a loaded one, the game is played in it instead of a new one.
+        The game's text is written to the given output sink, or if none, to standard output.
+        '''
+        super().__init__(output)
+        self.rng: Random = rng if rng else Random()
+        self.dungeon: GridDungeon = dungeon if dungeon else GridDungeon(
+            UNICODE_DUNGEON_DRAWING_CHARACTER_SET,
+            dungeon_width,
+            dungeon_height,
+            0,
+            ansi_terminal = ansi_terminal,
+            rng = self.rng,
+            output = self.output,
+        )
         self.dungeon.set_room_contents_function(self.room_contents)
         self.monster: RoamingMonster = RoamingMonster(
-            self.dungeon, self.dungeon.number_of_rooms - 1, randint(3, 5)
+            self.dungeon,
+            self.dungeon.number_of_rooms - 1,
+            self.rng.randint(3, 5) if monster_health is None else monster_health,
+            rng = self.rng,
+            output = self.output,
         )
-        self.teleport: TeleportRune = TeleportRune(self.dungeon)
-        self.hold_position: HoldPosition = HoldPosition()
-        self.quit: Quit = Quit()
+        self.teleport: TeleportRune = TeleportRune(self.dungeon, self.output)
+        self.hold_position: HoldPosition = HoldPosition(self.output)
+        self.quit: Quit = Quit(self.output)
+
+        # The command tables, keyed by the state that the commands depend on, packed into an int.
+        # That state is the player's room, whether the rune is placed, and the monster's visibility.
+        # Each table is built when its state is reached, if it is not cached. See command_table().
+        self.command_tables: OrderedDict[int, CommandTable] = OrderedDict()
 
 
     def description(self) -> None:
         ''' Describe the scenario. '''
         self.dungeon.description()
         self.monster.description()
-        print('- You have a bow. You can shoot the monster if you can see it.')
-        print('  If you shoot the monster enough times, you will win.')
+        self.output.write_line('- You have a bow. You can shoot the monster if you can see it.')
+        self.output.write_line('  If you shoot the monster enough times, you will win.')
         self.teleport.description()
 
 
@@ -49,8 +94,8 @@ class BowAndBlink(Scenario):
         commands.extend(self.hold_position.commands())
 
         # Can the player see the monster?
-        visible_rooms: list[int] = self.dungeon.rooms_visible_from_room(self.dungeon.player_room)
-        if self.monster.monster_room in visible_rooms:
+        player_room: int = self.dungeon.player_room
+        if self.dungeon.is_room_visible_from_room(player_room, self.monster.monster_room):
             commands.extend([Command(
                 invocation_text = 'F',
                 menu_text = '(F)ire bow',
@@ -62,6 +107,31 @@ class BowAndBlink(Scenario):
         return commands
 
 
+    def command_table(self) -> CommandTable:
+        '''
+        Returns a dispatch table of the commands available to the player.
+        The tables are keyed by the player's room, shifted left,
+        then a bit for whether the rune is unplaced, then a bit for whether the monster is visible.
+        Only the most recently used tables are kept. See COMMAND_TABLE_CACHE_SIZE.
+        '''
+        player_room: int = self.dungeon.player_room
+        command_table_key: int = (
+            player_room << 2 |
+            (self.teleport.teleport_room is None) << 1 |
+            self.dungeon.is_room_visible_from_room(player_room, self.monster.monster_room)
+        )
+        command_table: Optional[CommandTable] = self.command_tables.get(command_table_key)
+        if command_table is not None:
+            self.command_tables.move_to_end(command_table_key)
+            return command_table
+
+        command_table = create_command_table(self.commands())
+        self.command_tables[command_table_key] = command_table
+        if len(self.command_tables) > COMMAND_TABLE_CACHE_SIZE:
+            self.command_tables.popitem(last = False)
+        return command_table
+
+
     def post_player_turn(self) -> bool:
         ''' Runs after the command function is run. '''
         return self.monster.post_player_turn()
@@ -72,23 +142,36 @@ class BowAndBlink(Scenario):
         self.dungeon.game_over()
 
 
-    def room_contents(self, room: int) -> Optional[str]:
-        ''' Returns the given room's contents. Single character string. '''
-        contents = self.monster.room_contents(room)
-        if not contents:
-            contents = self.dungeon.room_contents(room)
-        if not contents:
-            contents = self.teleport.room_contents(room)
-        return contents
+    def game_ending(self) -> GameEnding:
+        ''' Returns how and why the game ended. '''
+        if not self.monster.monster_health:
+            return GameEnding(
+                outcome = GameOutcome.WIN, reason = 'The player defeated the monster.'
+            )
+        if self.monster.monster_room == self.dungeon.player_room:
+            return GameEnding(outcome = GameOutcome.LOSS, reason = 'The monster caught the player.')
+        return super().game_ending()
+
+
+    def room_contents(self) -> RoomContents:
+        '''
+        Returns the contents of the rooms.
+        The monster is shown over the player, and the player over the rune.
+        '''
+        room_contents: RoomContents = {}
+        self.monster.add_room_contents(room_contents)
+        self.dungeon.add_room_contents(room_contents)
+        self.teleport.add_room_contents(room_contents)
+        return room_contents
 
 
     _fire_bow_command: CommandFunction
     def _fire_bow_command(self) -> bool:
         ''' Function for the "Fire Bow" command. '''
-        print('You fire your bow.')
+        self.output.write_line('You fire your bow.')
         self.monster.monster_health = self.monster.monster_health - 1
         if self.monster.monster_health:
-            print('You shot the monster, but it is not enough.')
+            self.output.write_line('You shot the monster, but it is not enough.')
             return True
-        print('You shot and defeated the monster. You win.')
+        self.output.write_line('You shot and defeated the monster. You win.')
         return False
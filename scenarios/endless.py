@@ -0,0 +1,171 @@
+'''
+Endless scenario.
+Escape a monster horde through an endless dungeon.
+'''
+
+from random import Random
+from typing import Optional
+
+from base_classes.dungeon import RoomContents, VisibleRooms
+from base_classes.scenario import Command, CommandFunction, GameEnding, GameOutcome, Scenario
+from character_set import UNICODE_DUNGEON_DRAWING_CHARACTER_SET
+from components.chunked_grid_dungeon import ChunkedGridDungeon
+from components.hold_position import HoldPosition
+from components.monster_horde import HordeMonster, MonsterHorde
+from components.quit import Quit
+from output_sink import OutputSink
+
+
+class Endless(Scenario):
+    ''' Endless scenario. '''
+
+    def __init__(
+        self,
+        ansi_terminal: bool = False,
+        number_of_monsters: int = 8,
+        monster_health: int = 1,
+        escape_distance: int = 40,
+        chunk_size: int = 16,
+        cache_size: int = 64,
+        spill_directory: Optional[str] = None,
+        rng: Optional[Random] = None,
+        output: Optional[OutputSink] = None,
+    ) -> None:
+        '''
+        The horde, the distance to escape and the chunks may be given for simulations.
+        All of the game's randomness comes from the given random number generator, if any.
+        The game's text is written to the given output sink, or if none, to standard output.
+        '''
+        super().__init__(output)
+        self.rng: Random = rng if rng else Random()
+        self.dungeon: ChunkedGridDungeon = ChunkedGridDungeon(
+            UNICODE_DUNGEON_DRAWING_CHARACTER_SET,
+            chunk_size = chunk_size,
+            cache_size = cache_size,
+            spill_directory = spill_directory,
+            ansi_terminal = ansi_terminal,
+            rng = self.rng,
+            output = self.output,
+        )
+        self.dungeon.set_room_contents_function(self.room_contents)
+        self.start_room: int = self.dungeon.player_room
+        self.escape_distance: int = escape_distance
+
+        # The monsters start near the player, but out of the player's sight.
+        visible_rooms: VisibleRooms = self.dungeon.rooms_visible_from_room(self.start_room)
+        self.horde: MonsterHorde = MonsterHorde(
+            self.dungeon,
+            [
+                self._random_nearby_room_out_of_sight(visible_rooms)
+                for _ in range(number_of_monsters)
+            ],
+            monster_health,
+            rng = self.rng,
+            output = self.output,
+        )
+        self.hold_position: HoldPosition = HoldPosition(self.output)
+        self.quit: Quit = Quit(self.output)
+
+
+    def description(self) -> None:
+        ''' Describe the scenario. '''
+        self.dungeon.description()
+        self.horde.description()
+        self.output.write_line(
+            '- You have a bow. You can shoot the nearest monster that you can see.'
+        )
+        self.output.write_line(
+            f'  Escape {self.escape_distance} rooms away from where you start, to win.'
+        )
+
+
+    def display(self) -> None:
+        ''' Display the game. '''
+        self.dungeon.display()
+        self.output.write_line(
+            f'Rooms left to escape: {self.escape_distance - self._distance_from_start()}'
+        )
+
+
+    def commands(self) -> list[Command]:
+        ''' Returns a list of commands available to the player. '''
+        commands: list[Command] = self.dungeon.commands()
+        commands.extend(self.hold_position.commands())
+        visible_rooms: VisibleRooms = self.dungeon.rooms_visible_from_room(self.dungeon.player_room)
+        if self.horde.visible_monster_rooms(visible_rooms):
+            commands.append(Command(
+                invocation_text = 'F',
+                menu_text = '(F)ire bow',
+                function = self._fire_bow_command,
+            ))
+        commands.extend(self.quit.commands())
+        return commands
+
+
+    def post_player_turn(self) -> bool:
+        ''' Runs after the command function is run. '''
+        if not self.horde.post_player_turn():
+            return False
+        if self._distance_from_start() >= self.escape_distance:
+            self.output.write_line('You escaped the horde. You win.')
+            return False
+        return True
+
+
+    def game_over(self) -> None:
+        ''' The game is over. '''
+        self.dungeon.game_over()
+
+
+    def game_ending(self) -> GameEnding:
+        ''' Returns how and why the game ended. '''
+        if self.dungeon.player_room in self.horde.monsters_per_room:
+            return GameEnding(outcome = GameOutcome.LOSS, reason = 'A monster caught the player.')
+        if not self.horde.monsters_per_room:
+            return GameEnding(outcome = GameOutcome.WIN, reason = 'The player defeated the horde.')
+        if self._distance_from_start() >= self.escape_distance:
+            return GameEnding(outcome = GameOutcome.WIN, reason = 'The player escaped the horde.')
+        return super().game_ending()
+
+
+    def room_contents(self) -> RoomContents:
+        '''
+        Returns the contents of the rooms.
+        The monsters are shown over the player.
+        '''
+        room_contents: RoomContents = {}
+        self.horde.add_room_contents(room_contents)
+        self.dungeon.add_room_contents(room_contents)
+        return room_contents
+
+
+    def _distance_from_start(self) -> int:
+        ''' Returns how far the player is from the start, in rooms, as the crow flies. '''
+        return self.dungeon.rooms_apart(self.dungeon.player_room, self.start_room)
+
+
+    def _random_nearby_room_out_of_sight(self, visible_rooms: VisibleRooms) -> int:
+        ''' Returns a random room, within the escape distance of the start, that is not visible. '''
+        while True:
+            x: int = self.rng.randint(-self.escape_distance // 2, self.escape_distance // 2)
+            y: int = self.rng.randint(-self.escape_distance // 2, self.escape_distance // 2)
+            room: int = self.start_room + x + y * self.dungeon.dungeon_width
+            if room not in visible_rooms:
+                return room
+
+
+    _fire_bow_command: CommandFunction
+    def _fire_bow_command(self) -> bool:
+        ''' Function for the "Fire Bow" command. '''
+        self.output.write_line('You fire your bow.')
+        monster: HordeMonster = self.horde.nearest_visible_monster()
+        monster.health = monster.health - 1
+        if monster.health:
+            self.output.write_line('You shot a monster, but it is not enough.')
+            return True
+        self.horde.remove_monster(monster)
+        if self.horde.monsters_per_room:
+            self.output.write_line('You shot and defeated a monster.')
+            return True
+        self.output.write_line('You shot and defeated the last monster. You win.')
+        return False
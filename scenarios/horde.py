@@ -0,0 +1,173 @@
+'''
+Horde scenario.
+Survive a horde of monsters with your bow.
+'''
+
+from random import Random
+from typing import Optional
+
+from base_classes.dungeon import RoomContents, VisibleRooms
+from base_classes.scenario import Command, CommandFunction, GameEnding, GameOutcome, Scenario
+from character_set import UNICODE_DUNGEON_DRAWING_CHARACTER_SET
+from components.grid_dungeon import GridDungeon
+from components.hold_position import HoldPosition
+from components.monster_horde import HordeMonster, MonsterHorde
+from components.quit import Quit
+from output_sink import OutputSink
+
+
+class Horde(Scenario):
+    ''' Horde scenario. '''
+
+    def __init__(
+        self,
+        ansi_terminal: bool = False,
+        dungeon_width: int = 15,
+        dungeon_height: int = 9,
+        number_of_monsters: int = 8,
+        monster_health: int = 1,
+        turns_to_survive: int = 50,
+        rng: Optional[Random] = None,
+        output: Optional[OutputSink] = None,
+    ) -> None:
+        '''
+        The dungeon size, the horde and the number of turns to survive may be given for simulations.
+        All of the game's randomness comes from the given random number generator, if any.
+        The game's text is written to the given output sink, or if none, to standard output.
+        Raises a ValueError if every room of the dungeon is visible from the player's start.
+        '''
+        super().__init__(output)
+        self.rng: Random = rng if rng else Random()
+        self.dungeon: GridDungeon = GridDungeon(
+            UNICODE_DUNGEON_DRAWING_CHARACTER_SET,
+            dungeon_width,
+            dungeon_height,
+            0,
+            ansi_terminal = ansi_terminal,
+            rng = self.rng,
+            output = self.output,
+        )
+        self.dungeon.set_room_contents_function(self.room_contents)
+
+        # The monsters start out of the player's sight.
+        rooms_out_of_sight: list[int] = self._rooms_out_of_sight()
+        self.horde: MonsterHorde = MonsterHorde(
+            self.dungeon,
+            [self.rng.choice(rooms_out_of_sight) for _ in range(number_of_monsters)],
+            monster_health,
+            rng = self.rng,
+            output = self.output,
+        )
+        self.hold_position: HoldPosition = HoldPosition(self.output)
+        self.quit: Quit = Quit(self.output)
+        self.turns_to_survive: int = turns_to_survive
+        self.turns_survived: int = 0
+
+
+    def description(self) -> None:
+        ''' Describe the scenario. '''
+        self.dungeon.description()
+        self.horde.description()
+        self.output.write_line(
+            '- You have a bow. You can shoot the nearest monster that you can see.'
+        )
+        self.output.write_line(
+            f'  Survive for {self.turns_to_survive} turns, or defeat the horde, to win.'
+        )
+
+
+    def display(self) -> None:
+        ''' Display the game. '''
+        self.dungeon.display()
+        self.output.write_line(
+            f'Turns left to survive: {self.turns_to_survive - self.turns_survived}'
+        )
+
+
+    def commands(self) -> list[Command]:
+        ''' Returns a list of commands available to the player. '''
+        commands: list[Command] = self.dungeon.commands()
+        commands.extend(self.hold_position.commands())
+        if self._is_monster_visible():
+            commands.append(Command(
+                invocation_text = 'F',
+                menu_text = '(F)ire bow',
+                function = self._fire_bow_command,
+            ))
+        commands.extend(self.quit.commands())
+        return commands
+
+
+    def post_player_turn(self) -> bool:
+        ''' Runs after the command function is run. '''
+        if not self.horde.post_player_turn():
+            return False
+        self.turns_survived = self.turns_survived + 1
+        if self.turns_survived >= self.turns_to_survive:
+            self.output.write_line('You survived the horde. You win.')
+            return False
+        return True
+
+
+    def game_over(self) -> None:
+        ''' The game is over. '''
+        self.dungeon.game_over()
+
+
+    def game_ending(self) -> GameEnding:
+        ''' Returns how and why the game ended. '''
+        if self.dungeon.player_room in self.horde.monsters_per_room:
+            return GameEnding(outcome = GameOutcome.LOSS, reason = 'A monster caught the player.')
+        if not self.horde.monsters_per_room:
+            return GameEnding(outcome = GameOutcome.WIN, reason = 'The player defeated the horde.')
+        if self.turns_survived >= self.turns_to_survive:
+            return GameEnding(outcome = GameOutcome.WIN, reason = 'The player survived the horde.')
+        return super().game_ending()
+
+
+    def room_contents(self) -> RoomContents:
+        '''
+        Returns the contents of the rooms.
+        The monsters are shown over the player.
+        '''
+        room_contents: RoomContents = {}
+        self.horde.add_room_contents(room_contents)
+        self.dungeon.add_room_contents(room_contents)
+        return room_contents
+
+
+    def _is_monster_visible(self) -> bool:
+        ''' Returns True if the player can see a monster. '''
+        visible_rooms: VisibleRooms = self.dungeon.rooms_visible_from_room(self.dungeon.player_room)
+        return bool(self.horde.visible_monster_rooms(visible_rooms))
+
+
+    def _rooms_out_of_sight(self) -> list[int]:
+        '''
+        Returns the rooms that are not visible from the player's room.
+        Raises a ValueError if there are none, such as in a dungeon that is a single corridor.
+        '''
+        visible_rooms: VisibleRooms = self.dungeon.rooms_visible_from_room(self.dungeon.player_room)
+        rooms_out_of_sight: list[int] = [
+            room for room in range(self.dungeon.number_of_rooms) if room not in visible_rooms
+        ]
+        if not rooms_out_of_sight:
+            raise ValueError('Every room of the dungeon is visible from the start.')
+        return rooms_out_of_sight
+
+
+    _fire_bow_command: CommandFunction
+    def _fire_bow_command(self) -> bool:
+        ''' Function for the "Fire Bow" command. '''
+        self.output.write_line('You fire your bow.')
+        monster: HordeMonster = self.horde.nearest_visible_monster()
+        monster.health = monster.health - 1
+        if monster.health:
+            self.output.write_line('You shot a monster, but it is not enough.')
+            return True
+        self.horde.remove_monster(monster)
+        if self.horde.monsters_per_room:
+            self.output.write_line('You shot and defeated a monster.')
+            return True
+        self.output.write_line('You shot and defeated the last monster. You win.')
+        return False
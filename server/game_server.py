@@ -0,0 +1,303 @@
+'''
+Game server.
+Hosts a game per connection, for telnet style clients, on one asyncio event loop.
+
+Usage: python -m server.game_server --port 2323
+'''
+
+import asyncio
+import gc
+import sys
+import time
+from argparse import ArgumentParser, Namespace
+from random import Random
+from types import BuiltinFunctionType, FunctionType, ModuleType
+from typing import Optional, TextIO
+
+from base_classes.scenario import Scenario
+from game_loop import play_turns
+from output_sink import BufferedSink, OutputSink
+from simulation.replay import create_scenario
+
+
+# The number of lines of the players' terminals, unless given.
+DEFAULT_TERMINAL_LINES: int = 24
+
+# Number of connections that may wait to be accepted.
+# Thousands of players may connect at once, such as when the server restarts.
+LISTEN_BACKLOG: int = 4096
+
+# Objects of these types are not counted as a session's memory.
+# Classes, modules and functions are shared by all the sessions.
+# Output sinks refer to the connection, and through it, to the whole event loop.
+UNCOUNTED_TYPES: tuple[type, ...] = (
+    type, ModuleType, FunctionType, BuiltinFunctionType, OutputSink
+)
+
+
+def object_graph_size(root: object) -> int:
+    '''
+    Returns the number of bytes used by the object, and all the objects that it refers to.
+    Objects of the uncounted types, and what they refer to, are not counted.
+    '''
+    size: int = 0
+    seen: set[int] = set()
+    objects: list[object] = [root]
+    while objects:
+        referent: object = objects.pop()
+        if id(referent) in seen or isinstance(referent, UNCOUNTED_TYPES):
+            continue
+        seen.add(id(referent))
+        size = size + sys.getsizeof(referent)
+        objects.extend(gc.get_referents(referent))
+    return size
+
+
+class ConnectionSink(BufferedSink):
+    '''
+    Holds a session's text, and sends it to the connection when flushed, with telnet line endings.
+    The text is queued on the connection with a single write. The session drains the connection.
+    The player's terminal is the given number of lines, not the server's own terminal.
+    '''
+
+
+    def __init__(self, writer: asyncio.StreamWriter, terminal_lines: int = DEFAULT_TERMINAL_LINES):
+        super().__init__()
+        self.writer: asyncio.StreamWriter = writer
+        self.lines: int = terminal_lines
+
+
+    def terminal_lines(self) -> Optional[int]:
+        ''' Returns the number of lines of the player's terminal. '''
+        return self.lines
+
+
+    def _send(self, text: str) -> None:
+        ''' Queue the text on the connection. '''
+        self.writer.write(text.replace('\n', '\r\n').encode())
+
+
+class GameSession:
+    '''
+    A game played over one connection.
+    The game's text is held by the session's connection sink,
+    and sent whenever the session waits for the player's command.
+    '''
+
+
+    def __init__(
+        self,
+        session_id: int,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        seed: int,
+        ansi_terminal: bool = False,
+        idle_timeout: Optional[float] = None,
+        terminal_lines: int = DEFAULT_TERMINAL_LINES,
+    ):
+        self.session_id: int = session_id
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+        self.seed: int = seed
+        self.ansi_terminal: bool = ansi_terminal
+        self.idle_timeout: Optional[float] = idle_timeout
+        self.output: ConnectionSink = ConnectionSink(writer, terminal_lines)
+        self.scenario: Optional[Scenario] = None
+        self.turns: int = 0
+
+
+    async def run(self) -> None:
+        '''
+        Plays the session's game, to the end.
+        The connection is closed however the session ends.
+        '''
+        try:
+            self.output.write_line('Welcome to two-minute dungeon')
+            self.scenario = create_scenario(
+                self.seed, ansi_terminal = self.ansi_terminal, output = self.output
+            )
+            self.scenario.description()
+            self.turns = await play_turns(self.scenario, self.read_command)
+            self.scenario.game_over()
+            self.output.write_line('Thank you for playing.')
+            try:
+                self.output.flush()
+                await self.writer.drain()
+            except ConnectionError:
+                pass
+        finally:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+    async def read_command(self, prompt: str) -> Optional[str]:
+        '''
+        Sends the turn's text and the prompt, and waits for the player's command.
+        Returns None if the connection closed or the player was idle for too long.
+        '''
+        self.output.write(prompt)
+        try:
+            self.output.flush()
+            await self.writer.drain()
+            line: bytes = await asyncio.wait_for(self.reader.readline(), self.idle_timeout)
+        except (ConnectionError, asyncio.TimeoutError):
+            line = b''
+        if not line:
+            return None
+        return line.decode(errors = 'replace').strip()
+
+
+    def memory_used(self) -> int:
+        ''' Returns the number of bytes used by the session's game. '''
+        return object_graph_size(self.scenario) if self.scenario else 0
+
+
+class GameServer:
+    ''' Hosts a game session per connection. '''
+
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 2323,
+        seed: Optional[int] = None,
+        ansi_terminal: bool = False,
+        idle_timeout: Optional[float] = None,
+        log_file: Optional[TextIO] = None,
+        terminal_lines: int = DEFAULT_TERMINAL_LINES,
+    ):
+        '''
+        If a seed is given, the sessions' games are seeded from it, in order of connection.
+        The server logs to the given log file, or if none, to standard output.
+        On ANSI terminals, the players' terminals are taken to be the given number of lines.
+        '''
+        self.host: str = host
+        self.port: int = port
+        self.rng: Random = Random(seed)
+        self.ansi_terminal: bool = ansi_terminal
+        self.idle_timeout: Optional[float] = idle_timeout
+        self.terminal_lines: int = terminal_lines
+        self.log_file: TextIO = log_file if log_file else sys.stdout
+        self.sessions: dict[int, GameSession] = {}
+        self.sessions_started: int = 0
+        self.turns_played: int = 0
+
+
+    async def start(self) -> asyncio.Server:
+        ''' Starts listening, and returns the listening server. '''
+        server: asyncio.Server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, backlog = LISTEN_BACKLOG
+        )
+        self.port = server.sockets[0].getsockname()[1]  # The given port may have been 0.
+        return server
+
+
+    async def serve_forever(self, report_interval: Optional[float] = None) -> None:
+        ''' Serves the sessions, and if a report interval is given, reports on them that often. '''
+        server: asyncio.Server = await self.start()
+        self.log(f'Listening on {self.host} port {self.port}.')
+        async with server:
+            if report_interval:
+                while True:
+                    await asyncio.sleep(report_interval)
+                    for line in self.report():
+                        self.log(line)
+            else:
+                await server.serve_forever()
+
+
+    def report(self) -> list[str]:
+        ''' Returns the lines of a report on the sessions, and their memory. '''
+        memory: list[int] = [session.memory_used() for session in self.sessions.values()]
+        lines: list[str] = [
+            f'Sessions: {len(self.sessions)} open, {self.sessions_started} started. '
+            f'Turns played: {self.turns_played}.'
+        ]
+        if memory:
+            lines.append(
+                f'Session memory: '
+                f'total {sum(memory) / 1024:.1f} KB, '
+                f'mean {sum(memory) / len(memory) / 1024:.1f} KB, '
+                f'max {max(memory) / 1024:.1f} KB'
+            )
+        return lines
+
+
+    def log(self, text: str) -> None:
+        ''' Log the text to the server's log file. '''
+        print(text, file = self.log_file, flush = True)
+
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        ''' Play a session with the new connection. '''
+        self.sessions_started = self.sessions_started + 1
+        session: GameSession = GameSession(
+            self.sessions_started,
+            reader,
+            writer,
+            self.rng.getrandbits(64),
+            ansi_terminal = self.ansi_terminal,
+            idle_timeout = self.idle_timeout,
+            terminal_lines = self.terminal_lines,
+        )
+        self.sessions[session.session_id] = session
+        start_time: float = time.perf_counter()
+        try:
+            await session.run()
+        finally:
+            memory: int = session.memory_used()
+            del self.sessions[session.session_id]
+            self.turns_played = self.turns_played + session.turns
+        self.log(
+            f'Session {session.session_id} ended after {session.turns} turns '
+            f'in {time.perf_counter() - start_time:.1f} seconds, using {memory / 1024:.1f} KB.'
+        )
+
+
+def main() -> None:
+    ''' Runs the game server. '''
+    argument_parser: ArgumentParser = ArgumentParser(
+        description = 'Two-minute dungeon game server.'
+    )
+    argument_parser.add_argument('--host', default = '127.0.0.1', help = 'address to listen on')
+    argument_parser.add_argument('--port', type = int, default = 2323, help = 'port to listen on')
+    argument_parser.add_argument('--seed', type = int, help = "seed the sessions' games")
+    argument_parser.add_argument(
+        '--ansi', action = 'store_true',
+        help = "keep the dungeon at the top of the players' ANSI terminals"
+    )
+    argument_parser.add_argument(
+        '--rows', type = int, default = DEFAULT_TERMINAL_LINES,
+        help = "the number of lines of the players' ANSI terminals"
+    )
+    argument_parser.add_argument(
+        '--idle-timeout', type = float,
+        help = 'end sessions that wait this many seconds for a command'
+    )
+    argument_parser.add_argument(
+        '--report-interval', type = float, default = 60.0,
+        help = 'report on the sessions, and their memory, every this many seconds'
+    )
+    arguments: Namespace = argument_parser.parse_args()
+
+    game_server: GameServer = GameServer(
+        arguments.host,
+        arguments.port,
+        seed = arguments.seed,
+        ansi_terminal = arguments.ansi,
+        idle_timeout = arguments.idle_timeout,
+        terminal_lines = arguments.rows,
+    )
+    try:
+        asyncio.run(game_server.serve_forever(arguments.report_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+'''
+Game server load test.
+Runs a game server, and many telnet style clients, over localhost, in one process.
+Some clients play random commands, the rest connect and stay idle.
+
+Usage: python -m server.load_test --sessions 2000 --active 200 --turns 50
+'''
+
+import asyncio
+import io
+import re
+import time
+from argparse import ArgumentParser, Namespace
+from dataclasses import dataclass
+from random import Random
+
+from server.game_server import GameServer
+
+
+# The commands in a menu of commands. e.g. '(N)orth'
+MENU_COMMAND: re.Pattern = re.compile(r'\((\w)\)')
+
+PROMPT: bytes = b'Command? '
+
+
+@dataclass
+class LoadTestSettings:
+    ''' Settings of a load test. '''
+    sessions: int      # Number of sessions to open.
+    active: int        # Number of the sessions that play. The rest stay idle.
+    turns: int         # Number of commands each active session enters, before quitting.
+    seed: int = 0      # Seed of the server's games and the clients' commands.
+
+
+async def play_client(port: int, turns: int, rng: Random) -> int:
+    '''
+    Plays a session with random commands, then quits.
+    Returns the number of commands entered.
+    '''
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    commands_entered: int = 0
+    try:
+        while commands_entered < turns:
+            text: str = (await reader.readuntil(PROMPT)).decode()
+            menu: str = text[text.rindex('Commands: '):]
+            choices: list[str] = [
+                choice.lower() for choice in MENU_COMMAND.findall(menu) if choice.lower() != 'q'
+            ]
+            writer.write(f'{rng.choice(choices) if choices else "q"}\r\n'.encode())
+            commands_entered = commands_entered + 1
+        await reader.readuntil(PROMPT)
+        writer.write(b'q\r\n')
+        await reader.read()
+    except asyncio.IncompleteReadError:
+        pass  # The game ended.
+    writer.close()
+    return commands_entered
+
+
+async def open_idle_client(port: int) -> asyncio.StreamWriter:
+    ''' Opens a session, and waits for its first prompt. '''
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    await reader.readuntil(PROMPT)
+    return writer
+
+
+async def run_load_test(settings: LoadTestSettings) -> None:
+    ''' Runs the load test, and prints the results. '''
+    # The server's log is kept in memory, and not printed.
+    game_server: GameServer = GameServer(port = 0, seed = settings.seed, log_file = io.StringIO())
+    server: asyncio.Server = await game_server.start()
+    rng: Random = Random(settings.seed)
+
+    start_time: float = time.perf_counter()
+    idle_writers: list[asyncio.StreamWriter] = await asyncio.gather(*[
+        open_idle_client(game_server.port) for _ in range(settings.sessions - settings.active)
+    ])
+    print(
+        f'Opened {len(idle_writers)} idle sessions '
+        f'in {time.perf_counter() - start_time:.2f} seconds.'
+    )
+    for line in game_server.report():
+        print(line)
+
+    start_time = time.perf_counter()
+    commands_entered: int = sum(await asyncio.gather(*[
+        play_client(game_server.port, settings.turns, Random(rng.getrandbits(64)))
+        for _ in range(settings.active)
+    ]))
+    elapsed_time: float = time.perf_counter() - start_time
+    print(
+        f'{settings.active} active sessions entered {commands_entered} commands '
+        f'in {elapsed_time:.2f} seconds, {commands_entered / elapsed_time:.0f} commands per second.'
+    )
+    for line in game_server.report():
+        print(line)
+
+    # Hang up the idle sessions, and wait for their games to end.
+    for writer in idle_writers:
+        writer.close()
+    while game_server.sessions:
+        await asyncio.sleep(0.1)
+    server.close()
+    await server.wait_closed()
+
+
+def main() -> None:
+    ''' Runs the load test. '''
+    argument_parser: ArgumentParser = ArgumentParser(description = 'Game server load test.')
+    argument_parser.add_argument(
+        '--sessions', type = int, default = 2000, help = 'sessions to open'
+    )
+    argument_parser.add_argument(
+        '--active', type = int, default = 200, help = 'sessions that play'
+    )
+    argument_parser.add_argument(
+        '--turns', type = int, default = 50, help = 'commands entered by each active session'
+    )
+    argument_parser.add_argument('--seed', type = int, default = 0, help = 'seed of the test')
+    arguments: Namespace = argument_parser.parse_args()
+
+    asyncio.run(run_load_test(LoadTestSettings(
+        sessions = arguments.sessions,
+        active = min(arguments.active, arguments.sessions),
+        turns = arguments.turns,
+        seed = arguments.seed,
+    )))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,25 @@
 ''' Game settings. '''
 
-from base_classes.scenario import Scenario
-from scenarios.bow_and_blink import BowAndBlink
+from scenario_registry import ScenarioRegistry
 
 
-scenario_list: list[Scenario] = [
-    BowAndBlink,
-]
+# Installed packages may declare scenarios under this entry point group.
+SCENARIO_ENTRY_POINT_GROUP: str = 'two_minute_dungeon.scenarios'
+
+# Discover the scenarios of installed packages?
+# Reading the installed packages' metadata adds about 40 ms to every start.
+discover_installed_scenarios: bool = False
+
+# The scenarios, in the order that seeds choose them from.
+# Scenario modules are only imported when their scenario is created.
+scenario_registry: ScenarioRegistry = ScenarioRegistry()
+scenario_registry.register('bow_and_blink', 'scenarios.bow_and_blink:BowAndBlink')
+
+# These scenarios are only played when chosen by name, so seeds still choose the same games.
+scenario_registry.register('horde', 'scenarios.horde:Horde', chosen_by_seed = False)
+scenario_registry.register('endless', 'scenarios.endless:Endless', chosen_by_seed = False)
+
+# Other scenarios are added after these, so seeds still choose the same scenarios.
+scenario_registry.discover_package('scenarios')
+if discover_installed_scenarios:
+    scenario_registry.discover_entry_points(SCENARIO_ENTRY_POINT_GROUP)
@@ -0,0 +1,236 @@
+'''
+Monte Carlo batch runner.
+Plays many headless BowAndBlink games across worker processes, and summarizes the results.
+
+Usage: python -m simulation.batch --games 1000000 --policy rune-kiter
+'''
+
+from argparse import ArgumentParser, Namespace
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from math import sqrt
+from os import cpu_count
+from random import Random
+from typing import Optional
+
+from base_classes.scenario import GameOutcome
+from character_set import UNICODE_DUNGEON_DRAWING_CHARACTER_SET
+from components.grid_dungeon import GridDungeon
+from output_sink import NullSink, OutputSink
+from scenarios.bow_and_blink import BowAndBlink
+from simulation.engine import GameResult, PlayerPolicy, run_game
+from simulation.policies import POLICIES
+
+
+# Number of games played by each worker task.
+GAMES_PER_TASK: int = 10000
+
+# z-score of the 95% confidence interval.
+CONFIDENCE_Z: float = 1.96
+
+
+@dataclass
+class BatchSettings:
+    ''' Settings of a batch of games. '''
+    policy: str                     # Name of the player policy. See POLICIES.
+    games: int                      # Number of games to play.
+    dungeon_width: int = 7
+    dungeon_height: int = 5
+    monster_health: Optional[int] = None  # None for the scenario's random health.
+    max_turns: Optional[int] = 1000       # Games are stopped after this many turns.
+    seed: int = 0                         # Seed of the whole batch.
+    mazes: int = 0                        # Mazes shared by each task's games. 0 for one per game.
+
+
+@dataclass
+class BatchTally:
+    ''' Counts of game results. '''
+    games: int = 0
+    outcomes: Counter = field(default_factory = Counter)  # Games per GameOutcome.
+    turns: Counter = field(default_factory = Counter)     # Games per number of turns.
+
+
+    def add(self, other: 'BatchTally') -> None:
+        ''' Adds the other tally to this one. '''
+        self.games = self.games + other.games
+        self.outcomes.update(other.outcomes)
+        self.turns.update(other.turns)
+
+
+    def win_rate(self) -> float:
+        ''' Returns the fraction of games won. '''
+        return self.outcomes[GameOutcome.WIN] / self.games if self.games else 0.0
+
+
+    def win_rate_confidence_interval(self) -> tuple[float, float]:
+        ''' Returns the 95% Wilson score confidence interval of the win rate. '''
+        if not self.games:
+            return (0.0, 1.0)
+        rate: float = self.win_rate()
+        z_squared_per_game: float = CONFIDENCE_Z * CONFIDENCE_Z / self.games
+        center: float = (rate + z_squared_per_game / 2) / (1 + z_squared_per_game)
+        half_width: float = (
+            CONFIDENCE_Z *
+            sqrt(rate * (1 - rate) / self.games + z_squared_per_game / (4 * self.games)) /
+            (1 + z_squared_per_game)
+        )
+        return (center - half_width, center + half_width)
+
+
+    def mean_turns(self) -> float:
+        ''' Returns the mean number of turns per game. '''
+        if not self.games:
+            return 0.0
+        return sum(turns * games for turns, games in self.turns.items()) / self.games
+
+
+def play_games(settings: BatchSettings, games: int, seed: int) -> BatchTally:
+    '''
+    Plays the given number of games, and returns their tally.
+    All of the games' randomness comes from one random number generator, seeded with the given seed.
+    If the settings ask for shared mazes, the mazes are carved and indexed once,
+    and each game is played in one of them, chosen at random.
+    Games that share a maze are not independent. See print_summary().
+    '''
+    rng: Random = Random(seed)
+    policy: PlayerPolicy = POLICIES[settings.policy](rng = rng)
+    tally: BatchTally = BatchTally()
+    output: OutputSink = NullSink()
+    mazes: list[GridDungeon] = [
+        GridDungeon(
+            UNICODE_DUNGEON_DRAWING_CHARACTER_SET,
+            settings.dungeon_width,
+            settings.dungeon_height,
+            0,
+            rng = rng,
+        )
+        for _ in range(min(settings.mazes, games))
+    ]
+    for _ in range(games):
+        dungeon: Optional[GridDungeon] = None
+        if mazes:
+            maze: GridDungeon = rng.choice(mazes)
+            dungeon = GridDungeon(
+                UNICODE_DUNGEON_DRAWING_CHARACTER_SET,
+                settings.dungeon_width,
+                settings.dungeon_height,
+                0,
+                rng = rng,
+                rooms = maze.rooms,
+                corridor_lengths = maze.corridor_lengths,
+                output = output,
+            )
+        scenario: BowAndBlink = BowAndBlink(
+            dungeon_width = settings.dungeon_width,
+            dungeon_height = settings.dungeon_height,
+            monster_health = settings.monster_health,
+            rng = rng,
+            dungeon = dungeon,
+            output = output,
+        )
+        result: GameResult = run_game(scenario, policy, settings.max_turns)
+        tally.games = tally.games + 1
+        tally.outcomes[result.outcome] += 1
+        tally.turns[result.turns] += 1
+    return tally
+
+
+def run_batch(settings: BatchSettings, workers: Optional[int] = None) -> BatchTally:
+    '''
+    Plays a batch of games across worker processes, and returns their combined tally.
+    The games are split into tasks, each with its own seed derived from the batch seed,
+    so a batch is reproducible whatever the number of workers.
+    '''
+    seeds: Random = Random(settings.seed)
+    tasks: list[tuple[int, int]] = []
+    for first_game in range(0, settings.games, GAMES_PER_TASK):
+        tasks.append((min(GAMES_PER_TASK, settings.games - first_game), seeds.getrandbits(64)))
+
+    tally: BatchTally = BatchTally()
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        futures = [executor.submit(play_games, settings, games, seed) for games, seed in tasks]
+        for future in futures:
+            tally.add(future.result())
+    return tally
+
+
+def turns_histogram(tally: BatchTally, buckets: int = 20, width: int = 50) -> list[str]:
+    ''' Returns the lines of a text histogram of the number of turns per game. '''
+    if not tally.turns:
+        return []
+    most_turns: int = max(tally.turns)
+    bucket_size: int = max(1, -(-(most_turns + 1) // buckets))
+    bucket_games: Counter = Counter()
+    for turns, games in tally.turns.items():
+        bucket_games[turns // bucket_size] += games
+    most_games: int = max(bucket_games.values())
+    lines: list[str] = []
+    for bucket in range(most_turns // bucket_size + 1):
+        games: int = bucket_games[bucket]
+        first_turn: int = bucket * bucket_size
+        last_turn: int = first_turn + bucket_size - 1
+        bar: str = '#' * round(width * games / most_games)
+        lines.append(f'{first_turn:6}-{last_turn:<6} {games:10} {bar}')
+    return lines
+
+
+def print_summary(settings: BatchSettings, tally: BatchTally) -> None:
+    ''' Prints a summary of the batch. '''
+    low, high = tally.win_rate_confidence_interval()
+    monster_health: str = (
+        'random' if settings.monster_health is None else str(settings.monster_health)
+    )
+    print(
+        f'Policy: {settings.policy}, '
+        f'Dungeon: {settings.dungeon_width}x{settings.dungeon_height}, '
+        f'Monster health: {monster_health}'
+    )
+    print(f'Games: {tally.games}')
+    if settings.mazes:
+        print(
+            f'The games of each task shared {settings.mazes} mazes, so they are not independent. '
+            f'The confidence interval is too narrow.'
+        )
+    for outcome in GameOutcome:
+        print(f'{outcome.value.capitalize()}: {tally.outcomes[outcome]}')
+    print(f'Win rate: {tally.win_rate():.4f} (95% confidence interval {low:.4f} to {high:.4f})')
+    print(f'Mean turns: {tally.mean_turns():.2f}')
+    print('Turns per game:')
+    for line in turns_histogram(tally):
+        print(line)
+
+
+def main() -> None:
+    ''' Batch runner program. '''
+    argument_parser: ArgumentParser = ArgumentParser(description = 'Play many headless games.')
+    argument_parser.add_argument('--games', type = int, default = 100000)
+    argument_parser.add_argument('--policy', choices = list(POLICIES), default = 'random')
+    argument_parser.add_argument('--width', type = int, default = 7)
+    argument_parser.add_argument('--height', type = int, default = 5)
+    argument_parser.add_argument('--monster-health', type = int, default = None)
+    argument_parser.add_argument('--max-turns', type = int, default = 1000)
+    argument_parser.add_argument('--seed', type = int, default = 0)
+    argument_parser.add_argument(
+        '--mazes', type = int, default = 0,
+        help = 'share this many mazes between the games of each task, which makes the games '
+        'not independent, or 0 to carve one maze per game'
+    )
+    argument_parser.add_argument('--workers', type = int, default = cpu_count())
+    arguments: Namespace = argument_parser.parse_args()
+
+    settings: BatchSettings = BatchSettings(
+        policy = arguments.policy,
+        games = arguments.games,
+        dungeon_width = arguments.width,
+        dungeon_height = arguments.height,
+        monster_health = arguments.monster_health,
+        max_turns = arguments.max_turns,
+        seed = arguments.seed,
+        mazes = arguments.mazes,
+    )
+    print_summary(settings, run_batch(settings, arguments.workers))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+'''
+Player policies.
+Bots that choose the player's commands in headless games.
+'''
+
+from random import Random
+from typing import Optional
+
+from base_classes.scenario import Command, CommandTable, Scenario
+from simulation.engine import PlayerPolicy
+
+
+# Command table keys of the commands that the policies recognize.
+FIRE_BOW: str = 'f'
+HOLD_POSITION: str = 'h'
+QUIT: str = 'q'
+TELEPORT_RUNE: str = 't'
+
+# Command table keys of the commands that do not move the player.
+NOT_MOVES: frozenset[str] = frozenset([FIRE_BOW, HOLD_POSITION, QUIT, TELEPORT_RUNE])
+
+
+def random_move(command_table: CommandTable, rng: Random) -> Command:
+    '''
+    Returns a random command that moves the player.
+    If the player cannot move, then returns the hold position command.
+    '''
+    moves: list[Command] = [
+        command
+        for key, command in command_table.commands.items()
+        if key not in NOT_MOVES
+    ]
+    return rng.choice(moves) if moves else command_table.commands[HOLD_POSITION]
+
+
+class RandomPolicy(PlayerPolicy):
+    ''' Chooses any command, except quitting, at random. '''
+
+
+    def choose_command(self, scenario: Scenario, command_table: CommandTable) -> Command:
+        ''' Returns a random command. '''
+        return self.rng.choice([
+            command for key, command in command_table.commands.items() if key != QUIT
+        ])
+
+
+class GreedyShooterPolicy(PlayerPolicy):
+    ''' Fires the bow whenever the monster is visible. Otherwise, moves at random. '''
+
+
+    def choose_command(self, scenario: Scenario, command_table: CommandTable) -> Command:
+        ''' Returns the fire bow command if possible, otherwise a random move. '''
+        fire_bow: Optional[Command] = command_table.commands.get(FIRE_BOW)
+        return fire_bow if fire_bow else random_move(command_table, self.rng)
+
+
+class RuneKiterPolicy(PlayerPolicy):
+    '''
+    Kites the monster with the teleport rune.
+    Places the rune while the monster is out of sight.
+    Fires the bow while the monster is visible, unless the monster is about to catch the player,
+    in which case the player teleports back to the rune.
+    Works with scenarios that have a grid dungeon, a monster and a teleport rune,
+    such as BowAndBlink.
+    '''
+
+
+    def choose_command(self, scenario: Scenario, command_table: CommandTable) -> Command:
+        ''' Returns the command that keeps the player out of the monster's reach. '''
+        fire_bow: Optional[Command] = command_table.commands.get(FIRE_BOW)
+        teleport_rune: Command = command_table.commands[TELEPORT_RUNE]
+        is_rune_placed: bool = scenario.teleport.teleport_room is not None
+
+        if fire_bow:
+            is_final_shot: bool = scenario.monster.monster_health == 1
+            if is_final_shot or not is_rune_placed or self._monster_distance(scenario) > 1:
+                return fire_bow
+            return teleport_rune
+
+        if not is_rune_placed:
+            return teleport_rune
+        return random_move(command_table, self.rng)
+
+
+    def _monster_distance(self, scenario: Scenario) -> int:
+        ''' Returns the number of rooms between the player and the visible monster. '''
+        player_y, player_x = divmod(scenario.dungeon.player_room, scenario.dungeon.dungeon_width)
+        monster_y, monster_x = divmod(scenario.monster.monster_room, scenario.dungeon.dungeon_width)
+        return abs(monster_x - player_x) + abs(monster_y - player_y)
+
+
+# Player policies, by name.
+POLICIES: dict[str, type[PlayerPolicy]] = {
+    'random': RandomPolicy,
+    'greedy-shooter': GreedyShooterPolicy,
+    'rune-kiter': RuneKiterPolicy,
+}
@@ -0,0 +1,130 @@
+'''
+Command replay logs.
+Records the seed of a game and the commands the player entered, and replays them headless.
+Used to reproduce bug reports, and as a deterministic performance workload.
+
+A replay log is a text file. The first line names the format and its version,
+the second line is the seed, and every other line is one command the player entered.
+'''
+
+from dataclasses import dataclass
+from random import Random
+from typing import Optional, TextIO
+
+from base_classes.scenario import Command, CommandTable, Scenario
+from output_sink import NullSink, OutputSink
+from settings import scenario_registry
+from simulation.engine import GameResult, PlayerPolicy, run_game
+
+
+REPLAY_LOG_HEADER: str = 'two-minute dungeon replay log, version 1'
+
+
+@dataclass
+class ReplayLog:
+    ''' A recorded game. '''
+    seed: int               # Seed of the game's random number generator.
+    invocations: list[str]  # The commands the player entered, in order, as entered.
+
+
+def create_scenario(
+    seed: Optional[int],
+    ansi_terminal: bool = False,
+    output: Optional[OutputSink] = None,
+    scenario_name: Optional[str] = None,
+) -> Scenario:
+    '''
+    Creates the game that the given seed plays. If there is no seed, the game is random.
+    If a scenario name is given, that scenario is played, otherwise the seed chooses one.
+    Only the chosen scenario's modules are imported.
+    The game's text is written to the given output sink, or if none, to standard output.
+    '''
+    rng: Random = Random(seed)
+    if scenario_name is None:
+        scenario_name = rng.choice(scenario_registry.seeded_names())
+    return scenario_registry.create(
+        scenario_name,
+        ansi_terminal = ansi_terminal,
+        rng = rng,
+        output = output,
+    )
+
+
+def read_replay_log(path: str) -> ReplayLog:
+    '''
+    Reads the replay log in the given file.
+    Raises a ValueError if the file is not a replay log.
+    '''
+    with open(path, encoding = 'utf-8') as log_file:
+        lines: list[str] = log_file.read().split('\n')
+    if lines[0] != REPLAY_LOG_HEADER or len(lines) < 2 or not lines[1].startswith('seed '):
+        raise ValueError(f'{path} is not a two-minute dungeon replay log.')
+
+    # Every command line ends with a new line, so the last line of a complete log is empty.
+    return ReplayLog(seed = int(lines[1].removeprefix('seed ')), invocations = lines[2:-1])
+
+
+class ReplayRecorder:
+    '''
+    Records a game into a replay log.
+    The log is only appended to, and flushed after every command, so it survives a crash.
+    '''
+
+
+    def __init__(self, path: str, seed: int):
+        self.log_file: TextIO = open(path, 'w', encoding = 'utf-8')
+        self.log_file.write(f'{REPLAY_LOG_HEADER}\nseed {seed}\n')
+        self.log_file.flush()
+
+
+    def record(self, invocation_text: str) -> None:
+        ''' Appends the command the player entered to the log. '''
+        self.log_file.write(f'{invocation_text}\n')
+        self.log_file.flush()
+
+
+    def close(self) -> None:
+        ''' Closes the log. '''
+        self.log_file.close()
+
+
+class ReplayPolicy(PlayerPolicy):
+    '''
+    Chooses the recorded commands, in order.
+    Entries that were not valid commands when entered are skipped, as the game skipped them.
+    '''
+
+
+    def __init__(self, invocations: list[str]):
+        super().__init__()
+        self.invocations: list[str] = invocations
+        self.next_invocation: int = 0
+
+
+    def choose_command(self, scenario: Scenario, command_table: CommandTable) -> Optional[Command]:
+        ''' Returns the next recorded command, or None if there are none left. '''
+        while self.next_invocation < len(self.invocations):
+            invocation_text: str = self.invocations[self.next_invocation]
+            self.next_invocation = self.next_invocation + 1
+            command: Optional[Command] = command_table.commands.get(invocation_text)
+            if command:
+                return command
+        return None
+
+
+def replay_game(
+    replay_log: ReplayLog,
+    stop_at_turn: Optional[int] = None,
+    output: Optional[OutputSink] = None,
+) -> tuple[Scenario, GameResult]:
+    '''
+    Replays the recorded game, at full speed, without displaying it.
+    If stop_at_turn is given, the replay stops after that many turns.
+    The game's text is written to the given output sink, or if none, discarded.
+    Returns the scenario, in the state where the replay stopped, and the result.
+    '''
+    scenario: Scenario = create_scenario(
+        replay_log.seed, output = output if output else NullSink()
+    )
+    result: GameResult = run_game(scenario, ReplayPolicy(replay_log.invocations), stop_at_turn)
+    return scenario, result
@@ -0,0 +1,246 @@
+'''
+Game snapshots.
+Saves and loads BowAndBlink games in a compact, versioned, binary format.
+
+A snapshot is, in order, all little-endian:
+- The header: the magic bytes, and the format version.
+- The dungeon: its width, height and the player's room.
+- The East doors, then the South doors, one bit per room, in room order.
+  The North and West doors are the South and East doors of the neighboring rooms.
+- The line of sight index: its array type code, then the corridor lengths in each direction.
+- The monster: its room, health, where it last saw the player, and its visits to each room.
+- The teleportation rune's room.
+- The random number generator's state.
+Snapshots are loaded with a single memory map, and the dungeon is not carved or indexed again.
+'''
+
+import mmap
+import os
+import struct
+from array import array
+from collections import Counter
+from random import Random
+from typing import BinaryIO, Optional
+
+from character_set import UNICODE_DUNGEON_DRAWING_CHARACTER_SET
+from components.grid_dungeon import GRID_DIRECTION_DOOR, GridDirection, GridDungeon
+from output_sink import OutputSink
+from scenarios.bow_and_blink import BowAndBlink
+
+
+SNAPSHOT_MAGIC: bytes = b'2MDS'
+SNAPSHOT_VERSION: int = 1
+
+HEADER: struct.Struct = struct.Struct('<4sH')          # Magic bytes, format version.
+DUNGEON: struct.Struct = struct.Struct('<III')         # Width, height, player's room.
+INDEX: struct.Struct = struct.Struct('<c')             # Corridor length array type code.
+MONSTER: struct.Struct = struct.Struct('<IIqI')        # Room, health, last sighting, rooms visited.
+TELEPORT_RUNE: struct.Struct = struct.Struct('<q')     # Rune's room.
+RANDOM_STATE: struct.Struct = struct.Struct('<B?dI')   # Version, has gauss, gauss, state length.
+
+# Rooms that are not set are stored as this.
+NO_ROOM: int = -1
+
+# Translation tables, from a room's door mask to an ASCII binary digit of one of its doors.
+EAST_DOOR_DIGITS: bytes = bytes(
+    ord('1') if door_mask & GRID_DIRECTION_DOOR[GridDirection.EAST] else ord('0')
+    for door_mask in range(256)
+)
+SOUTH_DOOR_DIGITS: bytes = bytes(
+    ord('1') if door_mask & GRID_DIRECTION_DOOR[GridDirection.SOUTH] else ord('0')
+    for door_mask in range(256)
+)
+
+# Translation table, from ASCII binary digits to bytes of 0 or 1.
+BINARY_DIGIT_VALUES: bytes = bytes.maketrans(b'01', b'\x00\x01')
+
+
+class SnapshotReader:
+    ''' Reads the parts of a snapshot, in order. '''
+
+
+    def __init__(self, snapshot: mmap.mmap):
+        self.snapshot: mmap.mmap = snapshot
+        self.offset: int = 0
+
+
+    def unpack(self, structure: struct.Struct) -> tuple:
+        ''' Reads and unpacks a structure. '''
+        values: tuple = structure.unpack_from(self.snapshot, self.offset)
+        self.offset = self.offset + structure.size
+        return values
+
+
+    def read(self, size: int) -> bytes:
+        ''' Reads the given number of bytes. '''
+        data: bytes = self.snapshot[self.offset:self.offset + size]
+        if len(data) != size:
+            raise ValueError('The snapshot is truncated.')
+        self.offset = self.offset + size
+        return data
+
+
+    def read_array(self, typecode: str, length: int) -> array:
+        ''' Reads an array of the given type code and length. '''
+        values: array = array(typecode)
+        values.frombytes(self.read(values.itemsize * length))
+        return values
+
+
+def pack_doors(rooms: bytearray, door_digits: bytes) -> bytes:
+    '''
+    Returns one of each room's doors, packed as one bit per room.
+    The rooms' digits are read as one binary number, with the first room as the lowest bit.
+    '''
+    doors: int = int(rooms.translate(door_digits)[::-1], 2)
+    return doors.to_bytes((len(rooms) + 7) // 8, 'little')
+
+
+def unpack_doors(data: bytes, number_of_rooms: int) -> int:
+    '''
+    Returns one of each room's doors, unpacked as one byte, of 0 or 1, per room.
+    The bytes are returned as one number, with the first room as the lowest byte.
+    '''
+    doors: int = int.from_bytes(data, 'little')
+    digits: bytes = format(doors, f'0{number_of_rooms}b').encode()[::-1]
+    return int.from_bytes(digits.translate(BINARY_DIGIT_VALUES), 'little')
+
+
+def save_bow_and_blink(scenario: BowAndBlink, path: str) -> None:
+    ''' Saves the BowAndBlink game to the given file. '''
+    dungeon: GridDungeon = scenario.dungeon
+    with open(path, 'wb') as snapshot:
+        snapshot.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+        snapshot.write(DUNGEON.pack(
+            dungeon.dungeon_width, dungeon.dungeon_height, dungeon.player_room
+        ))
+        snapshot.write(pack_doors(dungeon.rooms, EAST_DOOR_DIGITS))
+        snapshot.write(pack_doors(dungeon.rooms, SOUTH_DOOR_DIGITS))
+        _write_index(snapshot, dungeon)
+
+        visited_rooms: list[int] = list(scenario.monster.visits_per_room)
+        snapshot.write(MONSTER.pack(
+            scenario.monster.monster_room,
+            scenario.monster.monster_health,
+            _stored_room(scenario.monster.monster_last_saw_player_in_room),
+            len(visited_rooms),
+        ))
+        snapshot.write(array('I', visited_rooms).tobytes())
+        snapshot.write(array(
+            'I', [scenario.monster.visits_per_room[room] for room in visited_rooms]
+        ).tobytes())
+
+        snapshot.write(TELEPORT_RUNE.pack(_stored_room(scenario.teleport.teleport_room)))
+
+        random_state_version, random_state, gauss_next = scenario.rng.getstate()
+        snapshot.write(RANDOM_STATE.pack(
+            random_state_version, gauss_next is not None, gauss_next or 0.0, len(random_state)
+        ))
+        snapshot.write(array('I', random_state).tobytes())
+
+
+def load_bow_and_blink(
+    path: str, ansi_terminal: bool = False, output: Optional[OutputSink] = None
+) -> BowAndBlink:
+    '''
+    Loads a BowAndBlink game from the given file.
+    The game's text is written to the given output sink, or if none, to standard output.
+    Raises a ValueError if the file is not a snapshot of a supported version.
+    '''
+    with open(path, 'rb') as snapshot_file:
+        # An empty file cannot be mapped, so files too short for a header are rejected first.
+        if os.fstat(snapshot_file.fileno()).st_size < HEADER.size:
+            raise ValueError(f'{path} is not a two-minute dungeon snapshot.')
+        snapshot: mmap.mmap = mmap.mmap(snapshot_file.fileno(), 0, access = mmap.ACCESS_READ)
+    with snapshot:
+        reader: SnapshotReader = SnapshotReader(snapshot)
+        magic, version = reader.unpack(HEADER)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f'{path} is not a two-minute dungeon snapshot.')
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f'{path} is a version {version} snapshot, which is not supported.')
+
+        dungeon_width, dungeon_height, player_room = reader.unpack(DUNGEON)
+        number_of_rooms: int = dungeon_width * dungeon_height
+        packed_doors_size: int = (number_of_rooms + 7) // 8
+        east_doors: int = unpack_doors(reader.read(packed_doors_size), number_of_rooms)
+        south_doors: int = unpack_doors(reader.read(packed_doors_size), number_of_rooms)
+
+        # Each room's North door is the South door of the room to the North,
+        # and its West door is the East door of the room to the West.
+        door_masks: int = (
+            (south_doors << 8 * dungeon_width) * GRID_DIRECTION_DOOR[GridDirection.NORTH] +
+            south_doors * GRID_DIRECTION_DOOR[GridDirection.SOUTH] +
+            east_doors * GRID_DIRECTION_DOOR[GridDirection.EAST] +
+            (east_doors << 8) * GRID_DIRECTION_DOOR[GridDirection.WEST]
+        )
+        rooms: bytearray = bytearray(door_masks.to_bytes(number_of_rooms, 'little'))
+
+        typecode: str = reader.unpack(INDEX)[0].decode()
+        corridor_lengths: list[array] = [
+            reader.read_array(typecode, number_of_rooms) for _ in GridDirection
+        ]
+
+        monster_room, monster_health, last_saw_player_in_room, number_of_visited_rooms = (
+            reader.unpack(MONSTER)
+        )
+        visited_rooms: array = reader.read_array('I', number_of_visited_rooms)
+        visits: array = reader.read_array('I', number_of_visited_rooms)
+
+        teleport_room: int = reader.unpack(TELEPORT_RUNE)[0]
+
+        random_state_version, has_gauss_next, gauss_next, random_state_length = (
+            reader.unpack(RANDOM_STATE)
+        )
+        random_state: array = reader.read_array('I', random_state_length)
+
+    rng: Random = Random()
+    dungeon: GridDungeon = GridDungeon(
+        UNICODE_DUNGEON_DRAWING_CHARACTER_SET,
+        dungeon_width,
+        dungeon_height,
+        player_room,
+        ansi_terminal = ansi_terminal,
+        rng = rng,
+        rooms = rooms,
+        corridor_lengths = corridor_lengths,
+        output = output,
+    )
+    scenario: BowAndBlink = BowAndBlink(
+        ansi_terminal = ansi_terminal,
+        monster_health = monster_health,
+        rng = rng,
+        dungeon = dungeon,
+        output = dungeon.output,
+    )
+    scenario.monster.monster_room = monster_room
+    scenario.monster.monster_last_saw_player_in_room = _loaded_room(last_saw_player_in_room)
+    scenario.monster.visits_per_room = Counter(dict(zip(visited_rooms, visits)))
+    scenario.teleport.teleport_room = _loaded_room(teleport_room)
+    rng.setstate((
+        random_state_version, tuple(random_state), gauss_next if has_gauss_next else None
+    ))
+    return scenario
+
+
+def _write_index(snapshot: BinaryIO, dungeon: GridDungeon) -> None:
+    ''' Write the dungeon's line of sight index, in the smallest array type that holds it. '''
+    longest_corridor: int = max(
+        max(corridor_lengths, default = 0) for corridor_lengths in dungeon.corridor_lengths
+    )
+    typecode: str = next(
+        typecode for typecode in 'BHI' if longest_corridor < 1 << 8 * array(typecode).itemsize
+    )
+    snapshot.write(INDEX.pack(typecode.encode()))
+    for corridor_lengths in dungeon.corridor_lengths:
+        snapshot.write(array(typecode, corridor_lengths).tobytes())
+
+
+def _stored_room(room: Optional[int]) -> int:
+    ''' Returns how the room, which may not be set, is stored. '''
+    return NO_ROOM if room is None else room
+
+
+def _loaded_room(room: int) -> Optional[int]:
+    ''' Returns the stored room, or None if it was not set. '''
+    return None if room == NO_ROOM else room
@@ -1,10 +1,20 @@
 ''' Two minute dungeon. '''
 
-from random import choice
+import time
+from argparse import ArgumentParser, Namespace
+from cProfile import Profile
+from random import Random
+from typing import Optional
 
-from base_classes.scenario import Command, Scenario
+from base_classes.scenario import GameOutcome, Scenario
 
-from settings import scenario_list
+from game_loop import play_turns, run_without_event_loop
+from output_sink import BufferedSink
+from profiling import TurnProfiler
+from settings import scenario_registry
+from simulation.replay import (
+    ReplayLog, ReplayRecorder, create_scenario, read_replay_log, replay_game
+)
 
 
 SCRIPT_VERSION = '1.0.0'
@@ -12,32 +22,147 @@ SCRIPT_VERSION = '1.0.0'
 
 def main() -> None:
     ''' Main game program. '''
-    print(f'Welcome to two-minute dungeon - Version {SCRIPT_VERSION}')
+    argument_parser: ArgumentParser = ArgumentParser(description = 'Quick solo dungeon crawl game.')
+    argument_parser.add_argument(
+        '--ansi', action = 'store_true',
+        help = 'keep the dungeon at the top of an ANSI terminal, and redraw only what changes'
+    )
+    argument_parser.add_argument(
+        '--seed', type = int,
+        help = 'seed the random number generator, to replay the same game'
+    )
+    argument_parser.add_argument(
+        '--scenario', choices = scenario_registry.names(),
+        help = 'play this scenario, instead of the one the seed chooses'
+    )
+    argument_parser.add_argument(
+        '--save', metavar = 'FILE',
+        help = 'if you quit a BowAndBlink game, save it to the file, to resume it later'
+    )
+    argument_parser.add_argument(
+        '--load', metavar = 'FILE',
+        help = 'resume the BowAndBlink game saved in the file'
+    )
+    argument_parser.add_argument(
+        '--record', metavar = 'FILE',
+        help = 'record the seed and every command you enter into a replay log file'
+    )
+    argument_parser.add_argument(
+        '--replay', metavar = 'FILE',
+        help = 'replay the game recorded in the replay log file, without displaying it'
+    )
+    argument_parser.add_argument(
+        '--turn', type = int,
+        help = 'with --replay, stop the replay after this many turns, and display that turn'
+    )
+    argument_parser.add_argument(
+        '--profile', action = 'store_true',
+        help = 'time each phase of each turn, and summarize the timings at the end of the game'
+    )
+    argument_parser.add_argument(
+        '--cprofile', metavar = 'FILE',
+        help = 'profile the game with cProfile, and dump the statistics to the file'
+    )
+    arguments: Namespace = argument_parser.parse_args()
+    if arguments.record and arguments.load:
+        argument_parser.error('a loaded game cannot be recorded')
+    if arguments.scenario and (arguments.load or arguments.replay):
+        argument_parser.error('a loaded or replayed game plays its own scenario')
+    if arguments.scenario and arguments.record:
+        argument_parser.error('a chosen scenario cannot be recorded, as replay logs hold seeds')
+
+    # The game's text is held, and written once per turn, before the player's command is read.
+    output: BufferedSink = BufferedSink()
+    output.write_line(f'Welcome to two-minute dungeon - Version {SCRIPT_VERSION}')
+
+    if arguments.replay:
+        output.flush()
+        replay(arguments.replay, arguments.turn)
+        return
+
+    recorder: Optional[ReplayRecorder] = None
+    if arguments.load:
+        # Snapshots import the BowAndBlink scenario, so they are only imported when used.
+        from snapshots import load_bow_and_blink
+        scenario: Scenario = load_bow_and_blink(
+            arguments.load, ansi_terminal = arguments.ansi, output = output
+        )
+    else:
+        # A recorded game needs a seed to be replayed.
+        seed: Optional[int] = arguments.seed
+        if arguments.record:
+            if seed is None:
+                seed = Random().getrandbits(64)
+            recorder = ReplayRecorder(arguments.record, seed)
+        scenario = create_scenario(
+            seed,
+            ansi_terminal = arguments.ansi,
+            output = output,
+            scenario_name = arguments.scenario,
+        )
+    if arguments.profile:
+        TurnProfiler().instrument(scenario)
+    profile: Optional[Profile] = Profile() if arguments.cprofile else None
+    if profile:
+        profile.enable()
 
-    scenario: Scenario = choice(scenario_list)()
     scenario.description()
 
-    while True:
-        scenario.display()
-        commands: list[Command] = scenario.commands()
-        if not commands:
-            break
-        command_menu: str = ', '.join([command.menu_text for command in commands])
-        print(f'Commands: {command_menu}')
-        user_choice: str = input('Command? ').lower()
-        if user_choice not in [command.invocation_text.lower() for command in commands]:
-            print('Invalid command.')
-            continue
-        command: Command = [
-            command
-            for command in commands
-            if command.invocation_text.lower() == user_choice
-        ][0]
-        if not command.function() or not scenario.post_player_turn():
-            break
+    async def read_command(prompt: str) -> Optional[str]:
+        ''' Writes the turn's text, then reads the player's command, and records it. '''
+        output.flush()
+        try:
+            user_choice: str = input(prompt).lower()
+        except EOFError:
+            return None
+        if recorder:
+            recorder.record(user_choice)
+        return user_choice
+
+    # Commands are read from the terminal synchronously, so the turn loop never suspends.
+    run_without_event_loop(play_turns(scenario, read_command))
+
+    # If the player quit, the game can be resumed later.
+    if arguments.save and scenario.game_ending().outcome == GameOutcome.QUIT:
+        from scenarios.bow_and_blink import BowAndBlink
+        from snapshots import save_bow_and_blink
+        if isinstance(scenario, BowAndBlink):
+            save_bow_and_blink(scenario, arguments.save)
+            output.write_line(f'Your game is saved to {arguments.save}.')
+        else:
+            output.write_line('Only BowAndBlink games can be saved.')
 
     scenario.game_over()
-    print('Thank you for playing.')
+    if profile:
+        profile.disable()
+        profile.dump_stats(arguments.cprofile)
+    if recorder:
+        recorder.close()
+    output.write_line('Thank you for playing.')
+    output.flush()
+
+
+def replay(path: str, turn: Optional[int]) -> None:
+    '''
+    Replay the game recorded in the replay log file, at full speed, without displaying it.
+    If a turn is given, stop after that many turns, and display only that turn.
+    '''
+    replay_log: ReplayLog = read_replay_log(path)
+
+    # If a turn will be displayed, the game's text is held, and discarded before that turn.
+    # Otherwise, the game's text is discarded as it is written.
+    output: BufferedSink = BufferedSink()
+    start_time: float = time.perf_counter()
+    scenario, result = replay_game(replay_log, turn, output if turn is not None else None)
+    elapsed_time: float = time.perf_counter() - start_time
+
+    if turn is not None:
+        output.discard()
+        scenario.display()
+    output.write_line(
+        f'Replayed {result.turns} turns in {elapsed_time:.3f} seconds. {result.reason}'
+    )
+    output.flush()
 
 
 if __name__== "__main__":